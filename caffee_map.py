@@ -1,14 +1,119 @@
+import argparse
+import numpy as np
 import pandas as pd
 import os
 import sys
 
+from map_grid import MAP_BUNDLE, MAP_CSV, build_bundle, save_bundle
+from map_manifest import changed_files, load_manifest, record_files, save_manifest
+from map_report import add_report_arguments, report
 
-def load_data_files():
-    required_files = {
-        'area_map': 'data/area_map.csv',
-        'area_struct': 'data/area_struct.csv', 
-        'area_category': 'data/area_category.csv'
-    }
+
+CHUNK_SIZE = 1_000_000  # 스트리밍 모드에서 한 번에 읽는 최대 행 수
+
+# 스트리밍 모드에서 사용할 컬럼별 dtype (좌표는 int32, 플래그와 번호는 int8)
+AREA_MAP_DTYPES = {'x': 'int32', 'y': 'int32', 'ConstructionSite': 'int8'}
+AREA_STRUCT_DTYPES = {'x': 'int32', 'y': 'int32', 'category': 'int8', 'area': 'int8'}
+
+INPUT_FILES = {
+    'area_map': 'data/area_map.csv',
+    'area_struct': 'data/area_struct.csv',
+    'area_category': 'data/area_category.csv'
+}
+# 출력 형식에 영향을 주는 코드도 입력처럼 취급하여, 코드가 바뀌면 다시 병합
+STAGE1_SOURCES = ('caffee_map.py', 'map_grid.py')
+
+# 가능한 cell id 수가 행 수의 이 배수 이하이면 cell id를 배열 인덱스로 바로 사용해 조인
+DENSE_JOIN_FACTOR = 4
+
+
+def iter_csv_chunks(path, dtypes, chunksize=CHUNK_SIZE):
+    """
+    CSV를 chunksize 행씩 읽으면서 조각마다 검증하고, dtypes의 컬럼만 작은 dtype의 numpy 배열로 줄여 돌려줍니다.
+
+    정수가 아닌 값(1.5 등)이나 숫자가 아닌 값은 잘라내거나 버리지 않고 ValueError를 발생시킵니다.
+
+    Yields:
+        {컬럼: (값 배열, 결측치 mask - 결측치가 없으면 None)}
+    """
+    filename = os.path.basename(path)
+
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=lambda col: col in dtypes):
+        # 필수 컬럼 확인
+        missing_cols = [col for col in dtypes if col not in chunk.columns]
+        if missing_cols:
+            raise ValueError(f'{filename}의 필수 columns이 누락되었습니다. 누락된 columns: {missing_cols}')
+
+        reduced = {}
+        for col, dtype in dtypes.items():
+            values = chunk[col]
+            numbers = pd.to_numeric(values, errors='coerce')
+            invalid = numbers.isnull() & values.notnull()
+            if invalid.any():
+                raise ValueError(f'{filename}의 {col}에 숫자가 아닌 값이 있습니다: {values[invalid].iloc[0]!r}')
+
+            mask = numbers.isnull().to_numpy()
+            valid = numbers[~mask]
+            fractional = valid % 1 != 0
+            if fractional.any():
+                raise ValueError(f'{filename}의 {col}에 정수가 아닌 값이 있습니다: {valid[fractional].iloc[0]}')
+            info = np.iinfo(dtype)
+            if not valid.empty and (valid.min() < info.min or valid.max() > info.max):
+                raise ValueError(f'{filename}의 {col} 값이 {dtype} 범위를 벗어났습니다.')
+
+            reduced[col] = (numbers.fillna(0).to_numpy().astype(dtype), mask if mask.any() else None)
+
+        yield reduced
+
+
+def read_csv_in_chunks(path, dtypes, chunksize=CHUNK_SIZE):
+    """
+    iter_csv_chunks로 줄인 조각들을 컬럼별로 이어 붙여 DataFrame을 만듭니다.
+
+    한 번에 파싱하는 양은 chunksize 행으로 제한되고 조각마다 필요한 컬럼만 작은 dtype으로 남기지만,
+    결과는 여전히 전체 행을 담습니다. 다음 단계가 모든 행을 area로 정렬해 한 파일로 저장하므로
+    메모리 사용량은 행 수에 비례합니다. (줄어드는 것은 문자열 파싱과 int64 컬럼에 드는 양)
+    결측치가 있는 컬럼은 nullable 정수형(Int32, Int8)으로 저장합니다.
+    """
+    pieces = {col: [] for col in dtypes}
+    masks = {col: [] for col in dtypes}
+    for chunk in iter_csv_chunks(path, dtypes, chunksize):
+        for col, (values, mask) in chunk.items():
+            pieces[col].append(values)
+            masks[col].append((len(values), mask))
+
+    columns = {}
+    for col, dtype in dtypes.items():
+        parts = pieces.pop(col)
+        values = np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+        del parts
+
+        # 좌표 범위가 작으면 int16으로 한 번 더 줄임
+        if col in ('x', 'y') and len(values):
+            small = np.iinfo('int16')
+            if values.min() >= small.min and values.max() <= small.max:
+                values = values.astype('int16')
+
+        chunk_masks = masks.pop(col)
+        if any(mask is not None for _, mask in chunk_masks):
+            mask = np.concatenate([np.zeros(length, dtype=bool) if mask is None else mask
+                                   for length, mask in chunk_masks])
+            columns[col] = pd.arrays.IntegerArray(values, mask)
+        else:
+            columns[col] = values
+
+    return pd.DataFrame(columns, copy=False)
+
+
+def load_data_files(streaming=False, chunksize=CHUNK_SIZE):
+    """
+    세 개의 입력 CSV를 읽고 검증합니다.
+
+    streaming=True이면 area_map.csv와 area_struct.csv를 chunksize 행씩 나누어 읽고
+    필요한 컬럼만 작은 dtype(int16/int32 좌표, int8 플래그)으로 줄여서 메모리 사용량을 줄입니다.
+    (전체 행은 여전히 메모리에 올라감 - read_csv_in_chunks 참고)
+    """
+    required_files = INPUT_FILES
     
     # 모든 필수 파일이 존재하는지 확인
     missing_files = []
@@ -24,8 +129,11 @@ def load_data_files():
     
     try:
         # area_map.csv 로드
-        print('area_map.csv 로딩 중...')
-        area_map_df = pd.read_csv('data/area_map.csv')
+        report.info('area_map.csv 로딩 중...')
+        if streaming:
+            area_map_df = read_csv_in_chunks('data/area_map.csv', AREA_MAP_DTYPES, chunksize)
+        else:
+            area_map_df = pd.read_csv('data/area_map.csv')
         
         # 빈 데이터 확인
         if area_map_df.empty:
@@ -41,17 +149,18 @@ def load_data_files():
         # 중요한 컬럼에서 누락된 값 확인
         null_counts_map = area_map_df[required_columns_map].isnull().sum()
         if null_counts_map.any():
-            print(f'경고: area_map.csv에 결측치 있습니다:')
-            for col, count in null_counts_map.items():
-                if count > 0:
-                    print(f'{col}: {count}개 누락')
+            missing = ', '.join(f'{col}: {count}개 누락' for col, count in null_counts_map.items() if count > 0)
+            report.warn(f'경고: area_map.csv에 결측치 있습니다: {missing}')
         
-        print(area_map_df,'\n')
+        report.frame('area_map', area_map_df)
 
         
         # area_struct.csv 로드 
-        print('area_struct.csv 로딩 중...')
-        area_struct_df = pd.read_csv('data/area_struct.csv')
+        report.info('area_struct.csv 로딩 중...')
+        if streaming:
+            area_struct_df = read_csv_in_chunks('data/area_struct.csv', AREA_STRUCT_DTYPES, chunksize)
+        else:
+            area_struct_df = pd.read_csv('data/area_struct.csv')
         
         # area_struct.csv 구조 검증
         required_columns_struct = ['x', 'y', 'category', 'area']
@@ -66,16 +175,14 @@ def load_data_files():
         # 중요한 컬럼에서 누락된 값 확인
         null_counts_struct = area_struct_df[required_columns_struct].isnull().sum()
         if null_counts_struct.any():
-            print(f'경고: area_struct.csv에 누락된 값이 있습니다:')
-            for col, count in null_counts_struct.items():
-                if count > 0:
-                    print(f'{col}: {count}개 누락')
+            missing = ', '.join(f'{col}: {count}개 누락' for col, count in null_counts_struct.items() if count > 0)
+            report.warn(f'경고: area_struct.csv에 누락된 값이 있습니다: {missing}')
         
-        print(area_struct_df,'\n')
+        report.frame('area_struct', area_struct_df)
 
         
         # area_category.csv 로드
-        print('area_category.csv 로딩 중...')
+        report.info('area_category.csv 로딩 중...')
         area_category_df = pd.read_csv('data/area_category.csv')
         
         required_columns_category = ['category', 'struct']
@@ -94,29 +201,13 @@ def load_data_files():
         # 중요한 컬럼에서 누락된 값 확인
         null_counts_category = area_category_df[required_columns_category].isnull().sum()
         if null_counts_category.any():
-            print(f'경고: area_category.csv에 누락된 값이 있습니다:')
-            for col, count in null_counts_category.items():
-                if count > 0:
-                    print(f'{col}: {count}개 누락')
+            missing = ', '.join(f'{col}: {count}개 누락' for col, count in null_counts_category.items() if count > 0)
+            report.warn(f'경고: area_category.csv에 누락된 값이 있습니다: {missing}')
                     
-        print(area_category_df,'\n')
-
-        # 1부 끝
+        report.frame('area_category', area_category_df)
 
-        # 2부 시작
-        map_coords = set(zip(area_map_df['x'], area_map_df['y']))
-        struct_coords = set(zip(area_struct_df['x'], area_struct_df['y']))
-        
-        if map_coords != struct_coords:
-            missing_in_struct = map_coords - struct_coords
-            missing_in_map = struct_coords - map_coords
-            
-            if missing_in_struct:
-                print(f'경고: area_struct.csv에서 누락된 좌표 {len(missing_in_struct)}개')
-            if missing_in_map:
-                print(f'경고: area_map.csv에서 누락된 좌표 {len(missing_in_map)}개')
-        
-        print('데이터 로딩 완료\n=============')
+        # 좌표 불일치 확인은 merge_all_datasets의 cell id 조인에서 한 번에 수행
+        report.info('데이터 로딩 완료\n=============')
 
         return area_map_df, area_struct_df, area_category_df
         
@@ -150,7 +241,7 @@ def clean_category_data(area_category_df):
             # 누락된 구조물 이름 처리
             missing_struct = area_category_df['struct'].isnull().sum()
             if missing_struct > 0:
-                print(f'경고: {missing_struct}개의 구조물 이름이 누락되어 기본값으로 대체합니다.')
+                report.warn(f'경고: {missing_struct}개의 구조물 이름이 누락되어 기본값으로 대체합니다.')
                 area_category_df['struct'] = area_category_df['struct'].fillna('Unknown')
 
         else:
@@ -163,8 +254,12 @@ def clean_category_data(area_category_df):
         raise
 
 
-def convert_struct_ids_to_names(area_struct_df, area_category_df):
-    """area_category 매핑을 사용하여 구조물 카테고리 ID를 이름으로 변환합니다."""
+def convert_struct_ids_to_names(area_struct_df, area_category_df, categorical=False):
+    """
+    area_category 매핑을 사용하여 구조물 카테고리 ID를 이름으로 변환합니다.
+
+    categorical=True이면 struct 컬럼을 문자열 대신 범주형(category)으로 저장합니다.
+    """
     try:
         # 먼저 카테고리 데이터를 정리
         area_category_df = clean_category_data(area_category_df)
@@ -172,7 +267,7 @@ def convert_struct_ids_to_names(area_struct_df, area_category_df):
         # area_struct_df에서 누락된 카테고리 값 확인
         missing_categories = area_struct_df['category'].isnull().sum()
         if missing_categories > 0:
-            print(f'경고: {missing_categories}개의 카테고리 값이 누락되어 0으로 대체합니다.')
+            report.warn(f'경고: {missing_categories}개의 카테고리 값이 누락되어 0으로 대체합니다.')
             area_struct_df['category'] = area_struct_df['category'].fillna(0)
         
         # area_category의 매핑을 사용하여 category를 struct 이름으로 덮어쓰기
@@ -183,8 +278,11 @@ def convert_struct_ids_to_names(area_struct_df, area_category_df):
         area_struct_df.loc[area_struct_df['category'] == 0, 'struct'] = 'Empty'
         
         area_struct_df = area_struct_df.drop(columns=['category'])
+
+        if categorical:
+            area_struct_df['struct'] = area_struct_df['struct'].astype('category')
         
-        print(area_struct_df)
+        report.frame('area_struct_with_names', area_struct_df)
 
         return area_struct_df
         
@@ -193,37 +291,135 @@ def convert_struct_ids_to_names(area_struct_df, area_category_df):
         raise
 
 
+def coordinate_cell_ids(left_df, right_df):
+    """
+    두 데이터의 (x, y) 좌표를 공통 기준의 정수 cell id로 변환합니다.
+
+    cell id = (x - x_min) * 세로 칸 수 + (y - y_min) 이므로 cell id 순서는 (x, y) 사전순과 같습니다.
+
+    Returns:
+        (left_ids, right_ids, x_min, y_min, span, total) - total은 가능한 cell id 개수
+    """
+    xs = [df['x'].to_numpy(dtype=np.int64) for df in (left_df, right_df)]
+    ys = [df['y'].to_numpy(dtype=np.int64) for df in (left_df, right_df)]
+    x_min = min(x.min() for x in xs)
+    y_min = min(y.min() for y in ys)
+    span = max(y.max() for y in ys) - y_min + 1
+    total = (max(x.max() for x in xs) - x_min + 1) * span
+    left_ids, right_ids = ((x - x_min) * span + (y - y_min) for x, y in zip(xs, ys))
+    return left_ids, right_ids, x_min, y_min, span, total
+
+
+def _join_rows(ids_list, total):
+    """
+    cell id 배열들을 합집합 순서로 맞춥니다.
+
+    좌표가 빽빽하면(지도는 보통 직사각형) 정렬이나 해시 없이 cell id를 배열 인덱스로 바로 쓰고,
+    드문드문하면 정렬 + searchsorted를 사용합니다.
+
+    Returns:
+        (cell_ids, takes, duplicated)
+          - cell_ids: 정렬된 합집합 cell id
+          - takes: 각 입력에 대해 결과 행 -> 입력 행 번호 (없으면 -1)
+          - duplicated: 한 입력 안에 같은 좌표가 두 번 이상 있으면 True
+    """
+    rows = sum(len(ids) for ids in ids_list)
+    if total <= DENSE_JOIN_FACTOR * rows:
+        counts = [np.bincount(ids, minlength=total) for ids in ids_list]
+        duplicated = any(count.max() > 1 for count in counts)
+        cell_ids = np.flatnonzero(np.logical_or.reduce([count > 0 for count in counts]))
+        takes = []
+        for ids in ids_list:
+            index = np.full(total, -1, dtype=np.int64)
+            index[ids] = np.arange(len(ids))
+            takes.append(index[cell_ids])
+        return cell_ids, takes, duplicated
+
+    duplicated = False
+    for ids in ids_list:
+        ordered = np.sort(ids)
+        duplicated |= bool((ordered[1:] == ordered[:-1]).any())
+    cell_ids = np.sort(np.concatenate(ids_list))
+    cell_ids = cell_ids[np.concatenate(([True], cell_ids[1:] != cell_ids[:-1]))]
+    takes = []
+    for ids in ids_list:
+        take = np.full(len(cell_ids), -1, dtype=np.int64)
+        take[np.searchsorted(cell_ids, ids)] = np.arange(len(ids))
+        takes.append(take)
+    return cell_ids, takes, duplicated
+
+
+def _aligned_column(column, take):
+    """take 위치의 값을 모읍니다. take가 -1인 곳은 merge(how='outer')처럼 결측치가 됩니다."""
+    if (take >= 0).all():
+        return column.array.take(take)
+    return column.array.take(take, allow_fill=True)
+
+
+def _merge_fallback(area_map_df, area_struct_with_names_df):
+    """pd.merge(how='outer') 후 area로 안정 정렬합니다."""
+    complete_df = pd.merge(area_map_df, area_struct_with_names_df, on=['x', 'y'], how='outer')
+    return _merged(complete_df.sort_values(by='area', kind='stable').reset_index(drop=True))
+
+
+def _merged(complete_df):
+    """병합 결과를 검증하고 요약을 출력합니다."""
+    if complete_df.empty:
+        raise ValueError('병합 결과가 비어있습니다.')
+
+    report.info('area 기준 오름차순 정렬')
+    report.info(f'데이터 병합 완료: 총 개수 {len(complete_df)}개의 통합 데이터 생성\n=============')
+    return complete_df
+
+
 def merge_all_datasets(area_map_df, area_struct_with_names_df):
-    """오류 처리와 함께 모든 데이터셋을 단일 DataFrame으로 병합합니다."""
+    """
+    오류 처리와 함께 모든 데이터셋을 단일 DataFrame으로 병합합니다.
+
+    두 데이터를 정수 cell id로 맞춘 뒤, area 순서(같은 area 안에서는 (x, y) 순서)로
+    각 컬럼을 한 번씩만 모아서 만듭니다. 결과는 pd.merge(how='outer') 후 area로 안정 정렬한 것과 같습니다.
+    """
     try:
-        # 병합 전 좌표 불일치 확인
-        map_coords = set(zip(area_map_df['x'], area_map_df['y']))
-        struct_coords = set(zip(area_struct_with_names_df['x'], area_struct_with_names_df['y']))
+        value_columns = [[col for col in df.columns if col not in ('x', 'y')]
+                         for df in (area_map_df, area_struct_with_names_df)]
+        keys_missing = any(df[['x', 'y']].isnull().any().any() for df in (area_map_df, area_struct_with_names_df))
+        if keys_missing or area_map_df.empty or area_struct_with_names_df.empty \
+                or set(value_columns[0]) & set(value_columns[1]):
+            # 좌표 결측치, 빈 데이터, 같은 이름의 컬럼은 cell id로 맞출 수 없으므로 기존 방식으로 병합
+            return _merge_fallback(area_map_df, area_struct_with_names_df)
 
-        map_only = map_coords - struct_coords  
-        struct_only = struct_coords - map_coords
-        
+        map_ids, struct_ids, x_min, y_min, span, total = coordinate_cell_ids(area_map_df, area_struct_with_names_df)
+        cell_ids, takes, duplicated = _join_rows([map_ids, struct_ids], total)
+        if duplicated:
+            # 중복 좌표는 행 곱이 생기므로 기존 방식으로 병합
+            report.warn('경고: 중복 좌표가 있어 일반 병합을 사용합니다.')
+            return _merge_fallback(area_map_df, area_struct_with_names_df)
+
+        map_only = int(((takes[0] >= 0) & (takes[1] < 0)).sum())
+        struct_only = int(((takes[1] >= 0) & (takes[0] < 0)).sum())
         if map_only:
-            print(f'경고: area_map.csv에만 있는 좌표 {len(map_only)}개가 병합에서 제외됩니다.')
+            report.warn(f'경고: area_map.csv에만 있는 좌표 {map_only}개는 구조물 정보가 결측치로 채워집니다.')
         if struct_only:
-            print(f'경고: area_struct.csv에만 있는 좌표 {len(struct_only)}개가 병합에서 제외됩니다.')
-        
-        # area_map을 area_struct (구조물 이름 포함)와 병합
-        complete_df = pd.merge(
-            area_map_df,
-            area_struct_with_names_df,
-            on=['x', 'y'],
-            how='outer'
-        )      
-        # 병합 결과 검증
-        if complete_df.empty:
-            raise ValueError('병합 결과가 비어있습니다.')
-            
-        
-        complete_df = complete_df.sort_values(by='area', ascending=True).reset_index(drop=True)
-        print('area 기준 오름차순 정렬')
-        print(f'데이터 병합 완료: 총 개수 {len(complete_df)}개의 통합 데이터 생성\n=============')
-        return complete_df
+            report.warn(f'경고: area_struct.csv에만 있는 좌표 {struct_only}개는 공사장 정보가 결측치로 채워집니다.')
+
+        # area 오름차순 안정 정렬 (결측치는 마지막)
+        area_source = 0 if 'area' in value_columns[0] else 1
+        source_df = (area_map_df, area_struct_with_names_df)[area_source]
+        area = pd.Series(_aligned_column(source_df['area'], takes[area_source]))
+        order = np.argsort(area.to_numpy(dtype=float, na_value=np.nan), kind='stable')
+
+        cell_ids = cell_ids[order]
+        key_dtype = np.result_type(area_map_df['x'].dtype, area_struct_with_names_df['x'].dtype)
+        columns = {
+            'x': (cell_ids // span + x_min).astype(key_dtype),
+            'y': (cell_ids % span + y_min).astype(key_dtype),
+        }
+        for df, names, take in zip((area_map_df, area_struct_with_names_df), value_columns, takes):
+            take = take[order]
+            for name in names:
+                columns[name] = _aligned_column(df[name], take)
+
+        return _merged(pd.DataFrame(columns))
         
     except Exception as e:
         print(f'데이터셋 병합 중 오류 발생: {e}')
@@ -239,7 +435,7 @@ def filter_area_1_data(complete_df):
             
         # area 1 데이터가 존재하는지 확인
         if len(complete_df[complete_df['area'] == 1]) == 0:
-            print('경고: area 1 데이터가 없습니다.')
+            report.warn('경고: area 1 데이터가 없습니다.')
             return pd.DataFrame()  
             
         # area 1 데이터만 필터링
@@ -251,7 +447,7 @@ def filter_area_1_data(complete_df):
         # 깔끔한 출력을 위해 인덱스 재설정
         area_1_df = area_1_df.reset_index(drop=True)
         
-        print(f'area 1 데이터 필터링 완료')
+        report.info(f'area 1 데이터 필터링 완료')
         
         return area_1_df
         
@@ -260,49 +456,123 @@ def filter_area_1_data(complete_df):
         raise
 
 
-def analyze_data():
-    """Stage 메인 함수입니다."""
+def stage1_inputs():
+    """매니페스트에 기록할 Stage 1 입력 파일 경로들"""
+    return list(INPUT_FILES.values()) + [path for path in STAGE1_SOURCES if os.path.exists(path)]
+
+
+def reuse_previous_output(bundle=False):
+    """
+    매니페스트와 비교하여 이전 Stage 1 결과를 그대로 쓸 수 있는지 확인합니다.
+
+    입력과 통합 CSV가 기록과 같으면 병합을 건너뛰고, 번들만 없거나 바뀌었으면
+    CSV에서 번들만 다시 만듭니다.
+
+    Returns:
+        이전 결과를 쓸 수 있으면 True, 전체를 다시 실행해야 하면 False
+    """
+    manifest = load_manifest()
+    if manifest is None:
+        return False
+
+    inputs = stage1_inputs()
+    changed = changed_files(manifest['inputs'], inputs) + changed_files(manifest['outputs'], [MAP_CSV])
+    if changed:
+        report.info(f'변경된 파일: {", ".join(changed)}')
+        return False
+
+    outputs = [MAP_CSV]
+    if bundle:
+        outputs.append(MAP_BUNDLE)
+        if changed_files(manifest['outputs'], [MAP_BUNDLE]):
+            report.info('입력은 그대로이므로 통합 CSV에서 격자 번들만 다시 만듭니다.')
+            save_bundle(pd.read_csv(MAP_CSV), MAP_BUNDLE)
+            report.info(f'격자 번들이 "{MAP_BUNDLE}"에 저장되었습니다.')
+
+    save_manifest(record_files(inputs, manifest['inputs']),
+                  dict(manifest['outputs'], **record_files(outputs, manifest['outputs'])))
+    return True
+
+
+def analyze_data(streaming=False, chunksize=CHUNK_SIZE, bundle=False, return_bundle=False, force=False):
+    """
+    Stage 메인 함수입니다.
+
+    streaming: 입력 CSV를 나누어 읽고 작은 dtype 사용
+    bundle: CSV와 함께 Stage 2/3이 바로 읽을 수 있는 .npz 격자 번들도 저장
+    return_bundle: True면 (area_1_result, (grid, rows))를 반환 (run_pipeline에서 다음 Stage로 전달)
+                   bundle도 켜져 있으면 번들 저장에 쓴 격자를 그대로 돌려줌
+    force: 매니페스트상 변경이 없어도 다시 실행
+
+    입력이 지난 실행과 같아 작업을 건너뛰면 None(return_bundle이면 (None, None))을 반환합니다.
+    """
     try:        
-        print('=== Stage 1: 데이터 분석 시작 ===')
-        print('데이터 파일 로딩 시도...')
-        area_map_df, area_struct_df, area_category_df = load_data_files()
-        
-        print('구조물 ID 이름으로 변환 시도...')
-        area_struct_with_names = convert_struct_ids_to_names(area_struct_df, area_category_df)
-        print('구조물 ID 이름 변환 완료 \n=============')
-        
-        print('데이터셋 병합 시도...')
-        complete_df = merge_all_datasets(area_map_df, area_struct_with_names)
-        
-        output_filename = 'data/complete_map_data.csv' # 저장할 파일 경로 및 이름
-        complete_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
-        print(f'통합 지도 데이터가 "{output_filename}"에 저장되었습니다.')
+        report.stage('stage1')
+        report.info('=== Stage 1: 데이터 분석 시작 ===')
+        if not force and reuse_previous_output(bundle):
+            report.info(f'입력 파일이 바뀌지 않아 기존 "{MAP_CSV}"을(를) 그대로 사용합니다. (--force로 다시 실행)')
+            report.count('stage1_skipped', True)
+            return (None, None) if return_bundle else None
+
+        report.info('데이터 파일 로딩 시도...')
+        with report.timed('stage1.load'):
+            area_map_df, area_struct_df, area_category_df = load_data_files(streaming, chunksize)
+        
+        report.info('구조물 ID 이름으로 변환 시도...')
+        with report.timed('stage1.convert'):
+            area_struct_with_names = convert_struct_ids_to_names(area_struct_df, area_category_df,
+                                                                 categorical=streaming)
+        report.info('구조물 ID 이름 변환 완료 \n=============')
+        
+        report.info('데이터셋 병합 시도...')
+        with report.timed('stage1.merge'):
+            complete_df = merge_all_datasets(area_map_df, area_struct_with_names)
+        
+        output_filename = MAP_CSV # 저장할 파일 경로 및 이름
+        with report.timed('stage1.save'):
+            complete_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+            report.info(f'통합 지도 데이터가 "{output_filename}"에 저장되었습니다.')
+            outputs = [output_filename]
+
+            map_bundle = None
+            if bundle:
+                map_bundle = save_bundle(complete_df, MAP_BUNDLE)
+                report.info(f'격자 번들이 "{MAP_BUNDLE}"에 저장되었습니다.')
+                outputs.append(MAP_BUNDLE)
+
+        try:
+            save_manifest(record_files(stage1_inputs()), record_files(outputs))
+        except OSError as e:
+            report.warn(f'경고: 매니페스트 저장 실패: {e}')
 
 
         # 전체 데이터 개요 표시
-        print('\n전체 데이터: area 기준 정렬')
-        print(complete_df)
+        report.frame('complete', complete_df, '\n전체 데이터: area 기준 정렬')
 
 
 
         area_1_result = filter_area_1_data(complete_df)
         
         if area_1_result.empty:
-            print('area 1 데이터가 없습니다.')
+            report.info('area 1 데이터가 없습니다.')
         
         # 분석 결과 표시
-        print('\narea 1 분석 결과')
-        print(f'area 1 총 데이터 수: {len(area_1_result)}')
+        report.info('\narea 1 분석 결과')
+        report.info(f'area 1 총 데이터 수: {len(area_1_result)}')
         
         if 'ConstructionSite' in area_1_result.columns:
             construction_count = area_1_result['ConstructionSite'].sum()
-            print('\narea 1 공사장 분포:')
-            print(f'공사장: {construction_count}개')
-            print(f'비공사장: {len(area_1_result) - construction_count}개')
-        
-        print('\narea 1 데이터:')
-        print(area_1_result)
+            report.count('area_1_construction', construction_count)
+            report.info('\narea 1 공사장 분포:')
+            report.info(f'공사장: {construction_count}개')
+            report.info(f'비공사장: {len(area_1_result) - construction_count}개')
         
+        report.frame('area_1', area_1_result, '\narea 1 데이터:')
+
+        if return_bundle:
+            if map_bundle is None:
+                map_bundle = build_bundle(complete_df)
+            return area_1_result, map_bundle
         return area_1_result
         
     except Exception as e:
@@ -311,27 +581,47 @@ def analyze_data():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stage 1: 데이터 분석')
+    parser.add_argument('--stream', action='store_true',
+                        help='입력 CSV를 나누어 읽고 작은 dtype으로 저장 (대용량 파일용)')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'스트리밍 모드에서 한 번에 읽는 행 수 (기본값: {CHUNK_SIZE})')
+    parser.add_argument('--bundle', action='store_true',
+                        help=f'Stage 2/3용 격자 번들({MAP_BUNDLE})도 함께 저장')
+    parser.add_argument('--force', action='store_true',
+                        help='입력 파일이 바뀌지 않았어도 다시 분석')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
     try:
         # 데이터 분석 실행
-        result_df = analyze_data()
-        
-        if not result_df.empty:
-            print('\n=== 분석 완료 ===')
-            print('area 1 데이터 분석에 성공하였습니다.')
+        result_df = analyze_data(streaming=args.stream, chunksize=args.chunksize,
+                                 bundle=args.bundle, force=args.force)
+        
+        if result_df is None:
+            report.info('\n=== 분석 생략 (변경 없음) ===')
+        elif not result_df.empty:
+            report.info('\n=== 분석 완료 ===')
+            report.info('area 1 데이터 분석에 성공하였습니다.')
 
             # 구조물 종류별 요약 통계 리포트
             if 'struct' in result_df.columns:
-                print('\n=== 구조물 종류별 요약 통계 리포트 ===')
+                report.info('\n=== 구조물 종류별 요약 통계 리포트 ===')
                 struct_counts = result_df['struct'].value_counts().sort_index()
+                struct_counts = struct_counts[struct_counts > 0]  # 범주형이면 없는 종류도 0으로 나옴
                 total = struct_counts.sum()
+                report.count('area_1_structs', struct_counts.to_dict())
                 for struct_name, count in struct_counts.items():
                     percent = (count / total) * 100 if total > 0 else 0
-                    print(f'  - {struct_name}: {count}개 ({percent:.1f}%)')
+                    report.info(f'  - {struct_name}: {count}개 ({percent:.1f}%)')
             else:
-                print('구조물 통계 정보를 찾을 수 없습니다.')
+                report.info('구조물 통계 정보를 찾을 수 없습니다.')
         else:
-            print('\n=== 분석 완료 (데이터 없음) ===')
-            print('area 1 데이터가 존재하지 않습니다.')
+            report.info('\n=== 분석 완료 (데이터 없음) ===')
+            report.info('area 1 데이터가 존재하지 않습니다.')
+
+        report.write(args.report)
 
     except KeyboardInterrupt:
         print('\n\n사용자에 의해 중단되었습니다.')
@@ -0,0 +1,204 @@
+"""
+여러 경로 이미지 일괄 렌더링
+
+visualize_path_on_map은 경로 이미지마다 지도 전체(격자선, 구조물)를 다시 그립니다.
+일괄 모드에서는 바뀌지 않는 지도를 map_raster로 한 번만 그려 .map_cache에 .npy로 저장하고,
+작업 프로세스들이 이를 memory-map으로 불러 경로만 덧그려 경로마다 PNG 하나씩 저장합니다.
+
+경로 목록 CSV는 start_x, start_y, goal_x, goal_y 열을 가지며,
+주지 않으면 내 집에서 각 반달곰 커피까지의 경로를 그립니다.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from PIL import Image
+
+from map_cache import CACHE_DIR, evict_stale
+from map_direct_save import ENGINES, bfs_path, find_key_locations, find_route, prepare_engine
+from map_grid import MAP_BUNDLE, MAP_CSV, bundle_is_fresh, load_bundle
+from map_path_io import write_paths
+from map_raster import cell_kinds, default_pixels_per_cell, draw_legend, draw_path, path_legend, render_map
+from map_report import add_report_arguments, report
+
+
+ROUTES_DIR = 'routes'
+
+# 작업 프로세스마다 한 번만 받는 지도 정보 (_init_worker에서 설정)
+_worker = {}
+
+
+def base_raster_path(grid, pixels_per_cell, cache_dir=CACHE_DIR):
+    """지도 래스터 캐시 파일 경로 (칸 종류와 칸당 픽셀 수로 키를 정함)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([grid.x_min, grid.y_min, grid.width, grid.height, pixels_per_cell],
+                           dtype=np.int64).tobytes())
+    digest.update(cell_kinds(grid).tobytes())
+    return os.path.join(cache_dir, f'{digest.hexdigest()}.base.npy')
+
+
+def cached_base_raster(grid, pixels_per_cell, cache_dir=CACHE_DIR):
+    """
+    지도 래스터를 캐시에서 찾고, 없으면 그려서 저장합니다.
+
+    Returns:
+        캐시 파일 경로 (작업 프로세스가 memory-map으로 읽음)
+    """
+    path = base_raster_path(grid, pixels_per_cell, cache_dir)
+    if os.path.exists(path):
+        report.info('캐시된 지도 래스터를 사용합니다.')
+        os.utime(path, None)  # 최근 사용 시각 갱신 (eviction 기준)
+        return path
+
+    image = render_map(grid, pixels_per_cell)
+    os.makedirs(cache_dir, exist_ok=True)
+    # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.save(f, image)
+    os.replace(tmp_path, path)
+    evict_stale(cache_dir, keep=os.path.basename(path).split('.', 1)[0])
+    return path
+
+
+def _init_worker(base_path, grid, pixels_per_cell):
+    _worker['base'] = np.load(base_path, mmap_mode='r')
+    _worker['grid'] = grid
+    _worker['pixels_per_cell'] = pixels_per_cell
+
+
+def _render_route(task):
+    """지도 래스터 복사본에 경로 하나를 그려 저장합니다."""
+    path, target, filename = task
+    image = np.array(_worker['base'])
+    draw_path(image, _worker['grid'], path, _worker['pixels_per_cell'])
+    image = draw_legend(image, path_legend(path, target))
+    tmp_path = f'{filename}.{os.getpid()}.tmp'
+    Image.fromarray(image).save(tmp_path, format='PNG')
+    os.replace(tmp_path, filename)
+    return filename
+
+
+def render_routes(grid, routes, out_dir=ROUTES_DIR, workers=None, pixels_per_cell=None):
+    """
+    경로들을 지도 위에 그려 경로마다 PNG 하나씩 저장합니다.
+
+    Arguments:
+        routes: (path, target) 리스트 - path는 좌표 리스트, target은 범례에 표시할 목표 좌표
+        workers: 작업 프로세스 수 (None이면 CPU 수)
+
+    Returns:
+        저장한 파일 이름 리스트 (routes 순서)
+    """
+    if not routes:
+        return []
+    workers = min(workers or os.cpu_count() or 1, len(routes))
+    if pixels_per_cell is None:
+        pixels_per_cell = default_pixels_per_cell(grid)
+
+    with report.timed('batch.base'):
+        base_path = cached_base_raster(grid, pixels_per_cell)
+
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [(path, target, os.path.join(out_dir, f'route_{i:04d}.png'))
+             for i, (path, target) in enumerate(routes)]
+
+    with report.timed('batch.render'):
+        initargs = (base_path, grid, pixels_per_cell)
+        if workers == 1:
+            _init_worker(*initargs)
+            return [_render_route(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+            return list(executor.map(_render_route, tasks))
+
+
+def read_route_list(filename):
+    """경로 목록 CSV를 ((start_x, start_y), (goal_x, goal_y)) 리스트로 읽습니다."""
+    df = pd.read_csv(filename)
+    missing = {'start_x', 'start_y', 'goal_x', 'goal_y'} - set(df.columns)
+    if missing:
+        raise ValueError(f'오류: 경로 목록 "{filename}"에 {sorted(missing)} 열이 없습니다.')
+    return [((int(sx), int(sy)), (int(gx), int(gy)))
+            for sx, sy, gx, gy in df[['start_x', 'start_y', 'goal_x', 'goal_y']].itertuples(index=False)]
+
+
+def main(route_file=None, out_dir=ROUTES_DIR, engine='bfs', workers=None, paths_file=None):
+    """
+    경로 목록(없으면 내 집 -> 각 반달곰 커피)의 경로를 찾아 일괄로 그립니다.
+
+    paths_file: 찾은 경로들을 함께 저장할 경로 파일 (형식은 확장자로 정함, map_path_io 참고)
+    """
+    report.stage('batch')
+    report.info('=== 경로 이미지 일괄 렌더링 ===')
+
+    with report.timed('batch.load'):
+        bundle, complete_df = None, None
+        if bundle_is_fresh(MAP_BUNDLE, MAP_CSV):
+            bundle = load_bundle(MAP_BUNDLE)
+        elif os.path.exists(MAP_CSV):
+            complete_df = pd.read_csv(MAP_CSV)
+        else:
+            print(f'오류: 지도 통합 데이터 "{MAP_CSV}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
+            sys.exit(1)
+        home_loc, cafes_loc, grid = find_key_locations(complete_df, bundle)
+
+    pairs = read_route_list(route_file) if route_file else [(home_loc, cafe) for cafe in cafes_loc]
+    report.info(f'경로 {len(pairs)}개를 찾는 중...')
+
+    routes = []
+    with report.timed('batch.search'):
+        # JumpTable, HierarchicalMap, CostTable은 배치 전체에서 한 번만 만듦
+        prepared = prepare_engine(grid, engine)
+        for start, goal in pairs:
+            if engine == 'bfs':
+                # 목표가 경로마다 다르므로 거리장을 만들어 캐시에 두지 않고 목표에서 멈추는 BFS 사용
+                # (경로마다 지도 크기 배열을 잡거나 탐색 로그를 남기지 않는 bfs_path)
+                path, target = bfs_path(start, [goal], grid)
+            else:
+                path, target = find_route(start, [goal], grid, engine, **prepared)
+            if path is None:
+                report.warn(f'경고: {start} -> {goal} 경로를 찾을 수 없어 건너뜁니다.')
+                continue
+            routes.append((path, target))
+
+    if paths_file:
+        count = write_paths(paths_file, (path for path, _ in routes))
+        report.info(f'경로 {count}개를 {paths_file} 파일로 저장했습니다.')
+
+    filenames = render_routes(grid, routes, out_dir, workers)
+    report.count('routes', len(filenames))
+    report.info(f'경로 이미지 {len(filenames)}개를 "{out_dir}" 폴더에 저장했습니다.')
+    return filenames
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='여러 경로 이미지 일괄 렌더링')
+    parser.add_argument('--routes', metavar='CSV',
+                        help='start_x,start_y,goal_x,goal_y 열을 가진 경로 목록 (기본값: 내 집 -> 각 반달곰 커피)')
+    parser.add_argument('--out-dir', default=ROUTES_DIR,
+                        help=f'경로 이미지를 저장할 폴더 (기본값: {ROUTES_DIR})')
+    parser.add_argument('--engine', choices=ENGINES, default='bfs',
+                        help='경로 탐색 엔진 (기본값: bfs)')
+    parser.add_argument('--workers', type=int,
+                        help='경로를 나누어 그릴 작업 프로세스 수 (기본값: CPU 수)')
+    parser.add_argument('--paths', metavar='FILE',
+                        help='찾은 경로들을 저장할 파일 (.csv, .rle, .bin)')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
+    try:
+        main(args.routes, args.out_dir, args.engine, args.workers, args.paths)
+        report.write(args.report)
+
+    except KeyboardInterrupt:
+        print('\n\n사용자에 의해 중단되었습니다.')
+        sys.exit(1)
+    except Exception as e:
+        print(f'\n프로그램 실행 중 오류 발생: {e}')
+        sys.exit(1)
@@ -0,0 +1,231 @@
+"""
+Stage 1~3 벤치마크
+
+map_synth로 만든 합성 지도에서 각 단계의 주요 함수 실행 시간을 재고 JSON으로 저장합니다.
+이전 결과 파일을 --compare로 주면 함수별로 비교하여, threshold배 이상 느려진 항목이 있으면
+종료 코드 1로 끝나므로 라이브러리 업그레이드 전후의 성능 회귀를 확인할 수 있습니다.
+
+측정 항목:
+    load_data_files, convert_struct_ids_to_names, merge_all_datasets (Stage 1)
+    extract_key_locations (격자 만들기), bfs_shortest_path, astar_algorithm (Stage 3)
+        - astar_algorithm은 매번 거리장 캐시를 지워 휴리스틱 계산(역방향 BFS)까지 포함하고,
+          astar_algorithm_prebuilt_field는 미리 만든 거리장을 넘겨 A* 탐색만 잽니다.
+    draw_structures, save_map (Stage 2, --render-limit보다 큰 지도는 건너뜀)
+
+각 함수는 합성 데이터가 있는 임시 폴더를 현재 폴더로 하여 실행합니다. (입력/출력 경로가 상대 경로이므로)
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from caffee_map import convert_struct_ids_to_names, load_data_files, merge_all_datasets
+from map_cache import CACHE_DIR
+from map_cafe_field import NearestCafeField
+from map_direct_save import bfs_shortest_path
+from map_direct_save_astar import astar_algorithm
+from map_draw import draw_structures, save_map, setup_map_figure
+from map_grid import extract_key_locations
+from map_report import report
+from map_synth import parse_size, write_map_files
+
+
+BENCH_VERSION = 1
+DEFAULT_SIZES = ('15', '100', '500')
+RENDER_LIMIT = 30  # 이보다 큰 지도는 matplotlib 그림이 너무 커서 Stage 2 측정을 건너뜀
+NOISE_FLOOR = 0.01  # 이보다 짧은 측정은 비교에서 회귀로 보지 않음 (초)
+
+
+def measure(function, repeat, prepare=None):
+    """
+    function을 repeat번 실행하여 시간을 잽니다.
+
+    prepare가 있으면 매번 실행 전에 호출하여 그 반환값(인자 튜플)으로 function을 호출하며,
+    prepare 시간은 측정에 포함하지 않습니다.
+
+    Returns:
+        ({'best', 'median', 'runs'}, 마지막 실행 결과)
+    """
+    seconds = []
+    result = None
+    for _ in range(repeat):
+        args = prepare() if prepare else ()
+        started = time.perf_counter()
+        result = function(*args)
+        seconds.append(time.perf_counter() - started)
+    return {'best': round(min(seconds), 6), 'median': round(statistics.median(seconds), 6),
+            'runs': len(seconds)}, result
+
+
+def run_case(width, height, density, cafes, seed, repeat, render_limit=RENDER_LIMIT):
+    """합성 지도 하나에서 모든 항목을 측정합니다."""
+    case = {'width': width, 'height': height, 'density': density, 'cafes': cafes, 'seed': seed}
+    timings = {}
+    workdir = tempfile.mkdtemp(prefix='map_bench_')
+    cwd = os.getcwd()
+
+    try:
+        started = time.perf_counter()
+        write_map_files(os.path.join(workdir, 'data'), width, height, density, cafes, seed=seed)
+        case['generate_seconds'] = round(time.perf_counter() - started, 6)
+        os.chdir(workdir)
+
+        # Stage 1
+        timings['load_data_files'], (area_map_df, area_struct_df, area_category_df) = measure(load_data_files, repeat)
+        timings['convert_struct_ids_to_names'], struct_df = measure(
+            convert_struct_ids_to_names, repeat, lambda: (area_struct_df.copy(), area_category_df.copy()))
+        timings['merge_all_datasets'], complete_df = measure(merge_all_datasets, repeat,
+                                                             lambda: (area_map_df, struct_df))
+        case['rows'] = len(complete_df)
+
+        # Stage 3
+        timings['extract_key_locations'], (home, cafe_positions, _, grid) = measure(
+            extract_key_locations, repeat, lambda: (complete_df,))
+        timings['bfs_shortest_path'], (path, _) = measure(bfs_shortest_path, repeat,
+                                                          lambda: (home, cafe_positions, grid))
+
+        def cold_astar():
+            # 휴리스틱 거리장이 .map_cache에 남아 있으면 두 번째 실행부터 역방향 BFS가 빠지므로 매번 지움
+            shutil.rmtree(os.path.join(workdir, CACHE_DIR), ignore_errors=True)
+            return home, cafe_positions, grid
+
+        timings['astar_algorithm'], (astar_path, _) = measure(astar_algorithm, repeat, cold_astar)
+        # 거리장을 미리 만들어 넘긴 경우 (휴리스틱 계산 제외, A* 탐색만)
+        field = NearestCafeField.build(grid, cafe_positions)
+        timings['astar_algorithm_prebuilt_field'], _ = measure(astar_algorithm, repeat,
+                                                               lambda: (home, cafe_positions, grid, field))
+        case['path_length'] = len(path) if path else None
+        case['astar_path_length'] = len(astar_path) if astar_path else None
+
+        # Stage 2 (그림 크기가 지도 크기에 비례하므로 작은 지도만)
+        if max(width, height) <= render_limit:
+            figures = []
+
+            def new_axes():
+                fig, ax, _ = setup_map_figure(complete_df, grid)
+                figures.append(fig)
+                return ax, complete_df, grid
+
+            timings['draw_structures'], _ = measure(draw_structures, repeat, new_axes)
+            timings['save_map'], _ = measure(save_map, repeat, lambda: (figures[-1], 'map.png'))
+            for fig in figures:
+                plt.close(fig)
+
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    case['timings'] = timings
+    return case
+
+
+def case_key(case):
+    return f'{case["width"]}x{case["height"]}-d{case["density"]}-c{case["cafes"]}-s{case["seed"]}'
+
+
+def environment():
+    """결과 비교에 필요한 실행 환경 정보"""
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'matplotlib': matplotlib.__version__}
+
+
+def compare_results(previous, current, threshold):
+    """
+    같은 지도, 같은 항목의 best 시간을 비교합니다.
+
+    Returns:
+        (이름, 이전 초, 현재 초, 배율, 회귀 여부) 리스트
+    """
+    old_cases = {case_key(case): case for case in previous.get('cases', [])}
+    rows = []
+    for case in current['cases']:
+        old = old_cases.get(case_key(case))
+        if old is None:
+            continue
+        for name, timing in case['timings'].items():
+            old_timing = old['timings'].get(name)
+            if old_timing is None:
+                continue
+            before, after = old_timing['best'], timing['best']
+            ratio = after / before if before > 0 else float('inf')
+            regressed = ratio > threshold and after > NOISE_FLOOR
+            rows.append((f'{case_key(case)} {name}', before, after, ratio, regressed))
+    return rows
+
+
+def run_benchmarks(sizes, density=0.2, cafes=2, seed=0, repeat=3, render_limit=RENDER_LIMIT):
+    """여러 크기의 합성 지도를 차례로 측정한 결과 딕셔너리를 만듭니다."""
+    # 측정하는 함수들의 진행 메시지와 DataFrame 출력 비용을 빼기 위해 출력을 끔
+    verbosity = report.verbosity
+    report.set_verbosity('quiet')
+    try:
+        cases = []
+        for width, height in sizes:
+            print(f'{width}x{height} 측정 중...', flush=True)
+            cases.append(run_case(width, height, density, cafes, seed, repeat, render_limit))
+    finally:
+        report.set_verbosity(verbosity)
+    return {'version': BENCH_VERSION, 'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'environment': environment(), 'cases': cases}
+
+
+def print_results(results):
+    for case in results['cases']:
+        print(f'\n[{case_key(case)}] {case["rows"]}행, 경로 길이 {case["path_length"]}')
+        for name, timing in case['timings'].items():
+            print(f'  {name:<30} best {timing["best"]:.4f}초  median {timing["median"]:.4f}초')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stage 1~3 벤치마크 (합성 지도)')
+    parser.add_argument('--sizes', nargs='+', type=parse_size, default=[parse_size(s) for s in DEFAULT_SIZES],
+                        help=f'지도 크기들 (예: 15 500 800x600, 기본값: {" ".join(DEFAULT_SIZES)})')
+    parser.add_argument('--density', type=float, default=0.2, help='공사장 비율 (기본값: 0.2)')
+    parser.add_argument('--cafes', type=int, default=2, help='반달곰 커피 개수 (기본값: 2)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 seed (기본값: 0)')
+    parser.add_argument('--repeat', type=int, default=3, help='항목별 반복 횟수, 가장 빠른 값을 비교 (기본값: 3)')
+    parser.add_argument('--render-limit', type=int, default=RENDER_LIMIT,
+                        help=f'Stage 2(그림) 측정을 할 최대 지도 한 변 크기 (기본값: {RENDER_LIMIT})')
+    parser.add_argument('--output', default='bench_results.json', help='결과 JSON 경로 (기본값: bench_results.json)')
+    parser.add_argument('--compare', metavar='JSON', help='비교할 이전 결과 JSON')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='이전보다 이 배율 이상 느려지면 회귀로 판단 (기본값: 1.25)')
+    args = parser.parse_args()
+
+    try:
+        results = run_benchmarks(args.sizes, args.density, args.cafes, args.seed, args.repeat, args.render_limit)
+        print_results(results)
+
+        tmp_path = f'{args.output}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, args.output)
+        print(f'\n결과가 {args.output} 파일로 저장되었습니다.')
+
+        if args.compare:
+            with open(args.compare, encoding='utf-8') as f:
+                previous = json.load(f)
+            rows = compare_results(previous, results, args.threshold)
+            print(f'\n=== {args.compare} 과(와) 비교 ===')
+            for name, before, after, ratio, regressed in rows:
+                mark = '  <-- 회귀' if regressed else ''
+                print(f'  {name:<50} {before:.4f}초 -> {after:.4f}초 ({ratio:.2f}배){mark}')
+            if any(row[4] for row in rows):
+                print(f'\n{args.threshold}배 이상 느려진 항목이 있습니다.')
+                sys.exit(1)
+
+    except KeyboardInterrupt:
+        print('\n\n사용자에 의해 중단되었습니다.')
+        sys.exit(1)
@@ -0,0 +1,120 @@
+"""
+거리장 디스크 캐시
+
+compute_heuristic_map / NearestCafeField의 결과를 지도 내용 해시를 키로 하여 .npy 파일로 저장합니다.
+지도가 바뀌지 않았다면 다음 실행에서 BFS를 건너뛰고 저장된 배열을 memory-map으로 바로 불러옵니다.
+"""
+
+import hashlib
+import os
+import time
+
+import numpy as np
+
+from map_cafe_field import NearestCafeField
+from map_report import report
+
+
+CACHE_DIR = '.map_cache'
+MAX_ENTRIES = 8  # 보관할 최대 지도 수 (오래 사용하지 않은 것부터 삭제)
+FIELD_ARRAYS = ('dist', 'label', 'step')
+
+
+def map_digest(grid, targets):
+    """거리장 계산에 쓰이는 지도 내용(크기, 이동 가능 여부, 목표 좌표)의 해시를 반환합니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.array([grid.x_min, grid.y_min, grid.width, grid.height], dtype=np.int64).tobytes())
+    digest.update(grid.passable.view(np.uint8).tobytes())
+    digest.update(np.array([(int(x), int(y)) for x, y in targets], dtype=np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def _entry_path(cache_dir, key, name):
+    return os.path.join(cache_dir, f'{key}.{name}.npy')
+
+
+def load_field(grid, targets, cache_dir=CACHE_DIR):
+    """캐시된 거리장을 memory-map으로 불러옵니다. 캐시가 없으면 None을 반환합니다."""
+    key = map_digest(grid, targets)
+    paths = [_entry_path(cache_dir, key, name) for name in FIELD_ARRAYS]
+    if not all(os.path.exists(path) for path in paths):
+        return None
+
+    try:
+        arrays = [np.load(path, mmap_mode='r') for path in paths]
+    except (OSError, ValueError) as e:
+        report.warn(f'경고: 거리장 캐시를 읽을 수 없어 다시 계산합니다: {e}')
+        return None
+
+    if any(array.shape != (grid.size,) for array in arrays):
+        return None
+
+    # 최근 사용 시각 갱신 (eviction 기준)
+    now = time.time()
+    for path in paths:
+        os.utime(path, (now, now))
+
+    return NearestCafeField(grid, targets, *arrays)
+
+
+def save_field(field, cache_dir=CACHE_DIR, max_entries=MAX_ENTRIES):
+    """거리장을 캐시에 저장하고 오래된 항목을 정리합니다."""
+    key = map_digest(field.grid, field.cafes)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    for name in FIELD_ARRAYS:
+        path = _entry_path(cache_dir, key, name)
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, getattr(field, name))
+        os.replace(tmp_path, path)
+
+    evict_stale(cache_dir, keep=key, max_entries=max_entries)
+    return key
+
+
+def evict_stale(cache_dir=CACHE_DIR, keep=None, max_entries=MAX_ENTRIES):
+    """최근에 사용한 max_entries개 지도만 남기고 나머지 캐시 파일을 삭제합니다."""
+    if not os.path.isdir(cache_dir):
+        return []
+
+    last_used = {}
+    for filename in os.listdir(cache_dir):
+        path = os.path.join(cache_dir, filename)
+        key = filename.split('.', 1)[0]
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        last_used[key] = max(last_used.get(key, 0), mtime)
+
+    ordered = sorted(last_used, key=last_used.get, reverse=True)
+    if keep in ordered:
+        ordered.remove(keep)
+        ordered.insert(0, keep)
+    stale = set(ordered[max_entries:])
+
+    for filename in os.listdir(cache_dir):
+        if filename.split('.', 1)[0] in stale:
+            try:
+                os.remove(os.path.join(cache_dir, filename))
+            except OSError:
+                pass
+
+    return sorted(stale)
+
+
+def cached_field(grid, targets, cache_dir=CACHE_DIR, max_entries=MAX_ENTRIES):
+    """캐시에 있으면 불러오고, 없으면 거리장을 계산하여 캐시에 저장합니다."""
+    field = load_field(grid, targets, cache_dir)
+    if field is not None:
+        report.info('캐시된 거리장을 불러왔습니다.')
+        return field
+
+    field = NearestCafeField.build(grid, targets)
+    try:
+        save_field(field, cache_dir, max_entries)
+    except OSError as e:
+        report.warn(f'경고: 거리장 캐시 저장 실패: {e}')
+    return field
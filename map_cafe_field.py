@@ -0,0 +1,139 @@
+"""
+가장 가까운 반달곰 커피 거리장 (nearest cafe field)
+
+모든 BandalgomCoffee에서 동시에 역방향 BFS를 한 번 수행하여, 이동 가능한 모든 칸에 대해
+가장 가까운 카페까지의 거리, 그 카페의 번호(Voronoi label), 카페 쪽으로 한 칸 이동하는 방향을
+저장합니다. 이후 임의 지점의 "가장 가까운 카페" 경로는 탐색 없이 경로 길이만큼만 따라가면 됩니다.
+"""
+
+import numpy as np
+
+from map_grid import STRUCT_CODES
+
+
+class NearestCafeField:
+    """
+    cell id로 색인된 가장 가까운 카페 정보
+
+    Attributes:
+        grid: 기준 지도 격자 (map_grid.Grid)
+        cafes: 카페 좌표 리스트 (label은 이 리스트의 인덱스)
+        dist: 가장 가까운 카페까지의 거리 (int32, 도달 불가 -1)
+        label: 가장 가까운 카페 번호 (int32, 도달 불가 -1)
+        step: 카페 쪽 다음 칸 방향, grid.offsets의 인덱스 (int8, 카페 또는 도달 불가 -1)
+    """
+
+    def __init__(self, grid, cafes, dist, label, step):
+        self.grid = grid
+        self.cafes = list(cafes)
+        self.dist = dist
+        self.label = label
+        self.step = step
+
+    @classmethod
+    def build(cls, grid, cafe_positions):
+        """모든 카페에서 출발하는 다중 시작점 BFS로 거리장을 만듭니다."""
+        cafes = [(int(x), int(y)) for x, y in cafe_positions]
+
+        dist = np.full(grid.size, -1, dtype=np.int32)
+        label = np.full(grid.size, -1, dtype=np.int32)
+        step = np.full(grid.size, -1, dtype=np.int8)
+        visited = ~grid.passable
+
+        # 지도 밖이나 공사장 위의 카페는 시작점에서 제외
+        seeds, seed_labels = [], []
+        for cafe_id, (x, y) in enumerate(cafes):
+            cell = grid.cell_id(x, y)
+            if cell >= 0 and not visited[cell]:
+                visited[cell] = True
+                seeds.append(cell)
+                seed_labels.append(cafe_id)
+
+        frontier = np.array(seeds, dtype=np.int64)
+        dist[frontier] = 0
+        label[frontier] = seed_labels
+
+        # BFS를 한 단계(같은 거리)씩 배열 연산으로 확장
+        offsets = np.array(grid.offsets, dtype=np.int64)
+        # offsets[k]로 이동해 온 칸에서 되돌아가는 방향은 offsets[k ^ 1]
+        back_steps = np.arange(len(offsets), dtype=np.int8) ^ 1
+        level = 0
+        while frontier.size:
+            level += 1
+            candidates = (offsets[:, None] + frontier[None, :]).ravel()
+            sources = np.tile(frontier, len(offsets))
+            backs = np.repeat(back_steps, frontier.size)
+
+            unvisited = ~visited[candidates]
+            candidates = candidates[unvisited]
+            # 여러 칸에서 동시에 도달한 칸은 처음 나온 부모 하나만 사용
+            candidates, first = np.unique(candidates, return_index=True)
+            sources = sources[unvisited][first]
+            backs = backs[unvisited][first]
+
+            visited[candidates] = True
+            dist[candidates] = level
+            label[candidates] = label[sources]
+            step[candidates] = backs
+            frontier = candidates
+
+        return cls(grid, cafes, dist, label, step)
+
+    def _entry(self, pos):
+        """
+        좌표에서 거리장으로 들어가는 첫 칸과 전체 거리를 반환합니다.
+
+        bfs_shortest_path처럼 공사장 위에서도 출발할 수 있도록, 시작 칸이 통과 불가이면
+        가장 가까운 이동 가능한 이웃 칸을 거쳐 갑니다. 도달할 수 없으면 (-1, -1).
+        """
+        cell = self.grid.cell_id(*pos)
+        if cell < 0:
+            return -1, -1
+        if self.dist[cell] >= 0:
+            return cell, int(self.dist[cell])
+
+        reachable = [nb for nb in self.grid.neighbors(cell) if self.dist[nb] >= 0]
+        if not reachable:
+            return -1, -1
+        entry = min(reachable, key=lambda nb: self.dist[nb])
+        return entry, int(self.dist[entry]) + 1
+
+    def nearest(self, pos):
+        """좌표에서 가장 가까운 카페 좌표와 거리를 반환합니다. 도달할 수 없으면 (None, None)."""
+        cell, distance = self._entry(pos)
+        if cell < 0:
+            return None, None
+        return self.cafes[self.label[cell]], distance
+
+    def route(self, start_pos):
+        """
+        저장된 방향을 따라 가장 가까운 카페까지의 경로를 복원합니다.
+
+        Returns:
+            (path, target) - bfs_shortest_path와 같은 형식, 도달할 수 없으면 (None, None)
+        """
+        grid = self.grid
+        cell, _ = self._entry(start_pos)
+        if cell < 0:
+            return None, None
+
+        offsets = grid.offsets
+        step = memoryview(self.step)
+        path = [grid.coord(cell)]
+        if path[0] != tuple(start_pos):
+            path.insert(0, (int(start_pos[0]), int(start_pos[1])))
+        while step[cell] >= 0:
+            cell += offsets[step[cell]]
+            path.append(grid.coord(cell))
+
+        return path, self.cafes[self.label[cell]]
+
+
+def routes_from_structures(field, struct_names=('Apartment', 'Building', 'MyHome')):
+    """지정한 구조물들 각각에서 가장 가까운 카페까지의 경로를 {좌표: (path, target)}로 반환합니다."""
+    grid = field.grid
+    codes = [STRUCT_CODES[name] for name in struct_names]
+    cells = np.flatnonzero(np.isin(grid.struct, codes))
+    xs, ys = grid.coords(cells)
+
+    return {pos: field.route(pos) for pos in zip(xs.tolist(), ys.tolist())}
@@ -1,147 +1,210 @@
 """
 Stage 3: 최단 경로 찾기
+
+경로만 필요한 짧은 실행에서는 import 시간이 대부분을 차지하므로, matplotlib(map_draw)과 Pillow는
+지도를 그릴 때, pandas는 DataFrame이 주어졌을 때만 사용합니다. 지도 CSV는 map_grid.read_map_csv로 읽습니다.
 """
 
-import pandas as pd
+import argparse
 import os
-import matplotlib
-matplotlib.use('Agg')  # 반드시 plt, patches 등 import 전에 실행
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 from collections import deque
 import sys
-# map_draw.py의 지도 그리기 함수들을 import
-from map_draw import setup_map_figure, draw_structures, add_legend
-
-
-def find_key_locations(complete_df):
-    """집과 반달곰 커피의 위치를 찾습니다."""
-    valid_positions = set(zip(complete_df['x'], complete_df['y']))
+import numpy as np
+from map_grid import (Grid, MAP_BUNDLE, MAP_CSV, bundle_is_fresh, extract_bundle_locations,
+                      extract_key_locations, load_bundle, read_map_csv)
+from map_cache import cached_field
+from map_jps import JumpTable, jump_point_search
+from map_hpa import HierarchicalMap, hpa_search
+from map_weighted import CostTable, cell_costs, weighted_shortest_path
+from map_path_io import CSV_FIELDS, PATH_FORMATS, PathWriter, path_rows
+from map_raster import RENDERERS
+from map_report import add_report_arguments, report
+
+
+ENGINES = ('bfs', 'jps', 'hpa', 'dial', 'dial-astar')  # find_route에서 선택 가능한 탐색 엔진
+WEIGHTED_ENGINES = ('dial', 'dial-astar')  # 칸별 이동 비용을 사용하는 엔진
+
+
+def find_key_locations(complete_df, bundle=None):
+    """집과 반달곰 커피의 위치를 찾고 지도 격자를 만듭니다. (bundle: load_bundle 결과가 있으면 사용)"""
+    # 집, 카페, 공사장(지나갈 수 없는 곳), 이동 가능한 칸을 한 번에 추출
+    if bundle is not None:
+        home_pos, cafe_positions, _, grid = extract_bundle_locations(*bundle)
+    else:
+        home_pos, cafe_positions, _, grid = extract_key_locations(complete_df)
     
-    # MyHome 위치 찾기
-    home_locations = complete_df[complete_df['struct'] == 'MyHome']
-    if home_locations.empty:
+    # MyHome 위치 확인
+    if home_pos is None:
         print('오류: MyHome 위치를 찾을 수 없습니다.')
         sys.exit(1)
     
-    home_pos = (home_locations.iloc[0]['x'], home_locations.iloc[0]['y'])
-    
-    # BandalgomCoffee 위치들 찾기
-    cafe_locations = complete_df[complete_df['struct'] == 'BandalgomCoffee']
-    if cafe_locations.empty:
+    # BandalgomCoffee 위치들 확인
+    if not cafe_positions:
         print('오류: BandalgomCoffee 위치를 찾을 수 없습니다.')
         sys.exit(1)
     
-    cafe_positions = [(row['x'], row['y']) for _, row in cafe_locations.iterrows()]
-    
-    # 공사장 위치들 찾기 (지나갈 수 없는 곳)
-    construction_sites = set()
-    for _, row in complete_df.iterrows():
-        if row['ConstructionSite'] == 1:
-            construction_sites.add((row['x'], row['y']))
-    
-    return home_pos, cafe_positions, construction_sites, valid_positions
+    return home_pos, cafe_positions, grid
 
 
-def bfs_shortest_path(start_pos, target_positions, valid_positions, construction_sites):
+def bfs_shortest_path(start_pos, target_positions, grid):
     """
     BFS 알고리즘
 
     Arguments:
         start_pos: 시작 좌표 (x, y)
         target_positions: 도착 후보 좌표 리스트
-        valid_positions: 이동 가능한 좌표 집합
-        construction_sites: 공사장 좌표 집합 (통과 불가)
+        grid: 지도 격자 (map_grid.Grid, 공사장은 통과 불가)
 
     Returns:
         (path, target)
           - path: 시작점부터 목표까지의 좌표 리스트
           - target: 실제 도달한 목표 좌표
     """
-    targets = set(target_positions)
-    queue = deque([start_pos])
-    visited = {start_pos}
-    parent = {}
-    directions = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+    start = grid.cell_id(*start_pos)
+    if start < 0:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    targets = {grid.cell_id(*pos) for pos in target_positions}
+    queue = deque([start])
+    visited = grid.new_visited()  # 공사장과 지도 밖은 이미 방문한 것으로 취급
+    visited[start] = 1
+    parents = np.full(grid.size, -1, dtype=np.int32)
+    parent = memoryview(parents)
+    offsets = grid.offsets
+    track = report.instrumenting
+    max_queue = 1
 
     # BFS 탐색: 가장 먼저 만나는 목표 지점을 반환
     found_target = None
     while queue:
+        if track and len(queue) > max_queue:
+            max_queue = len(queue)
         current = queue.popleft()
         if current in targets:
             found_target = current
             break
 
-        x, y = current
-        for dx, dy in directions:
-            neighbor = (x + dx, y + dy)
-            if (neighbor in valid_positions
-                    and neighbor not in visited
-                    and neighbor not in construction_sites):
-                visited.add(neighbor)
+        for offset in offsets:
+            neighbor = current + offset
+            if not visited[neighbor]:
+                visited[neighbor] = 1
                 parent[neighbor] = current
                 queue.append(neighbor)
 
+    if track:
+        # 넣은 칸 = 시작점 + 부모가 기록된 칸, 꺼낸 칸 = 넣은 칸 - 남은 칸
+        pushes = 1 + int(np.count_nonzero(parents >= 0))
+        report.search('bfs', expanded=pushes - len(queue), pushes=pushes, max_queue=max_queue)
+
     # 경로 복원
     if found_target is not None:
         path = []
         node = found_target
-        while node != start_pos:
-            path.append(node)
+        while node != start:
+            path.append(grid.coord(node))
             node = parent[node]
-        path.append(start_pos)
+        path.append(grid.coord(start))
         path.reverse()
-        print(f'최단 경로 발견! 길이: {len(path)} 단계')
-        return path, found_target
+        report.info(f'최단 경로 발견! 길이: {len(path)} 단계')
+        return path, grid.coord(found_target)
 
-    print('경로를 찾을 수 없습니다.')
+    report.info('경로를 찾을 수 없습니다.')
     return None, None
 
 
-def save_path(path, goal, filename='home_to_cafe.csv'):
-    """경로를 CSV 파일로 저장합니다."""
+def bfs_path(start_pos, target_positions, grid):
+    """
+    bfs_shortest_path와 같은 경로를 출력이나 탐색 통계 없이 찾습니다.
 
-    try:
-        data = []
+    방문 표시와 부모를 지도 크기의 배열 대신 dict에 두므로, 목표가 가까우면 지도가 커도
+    호출마다 지도 크기만큼 메모리를 잡지 않습니다. (서버 질의, tour 구간 경로처럼 여러 번 부르는 곳용)
+
+    Returns:
+        (path, target) - bfs_shortest_path와 같은 형식
+    """
+    start = grid.cell_id(*start_pos)
+    if start < 0:
+        return None, None
+
+    targets = {grid.cell_id(*pos) for pos in target_positions}
+    passable = memoryview(grid.passable)
+    offsets = grid.offsets
+    parent = {start: -1}  # 방문한 칸 -> 부모 칸
+    queue = deque([start])
+    while queue:
+        current = queue.popleft()
+        if current in targets:
+            path = []
+            node = current
+            while node >= 0:
+                path.append(grid.coord(node))
+                node = parent[node]
+            path.reverse()
+            return path, grid.coord(current)
+
+        for offset in offsets:
+            neighbor = current + offset
+            if passable[neighbor] and neighbor not in parent:
+                parent[neighbor] = current
+                queue.append(neighbor)
 
-        for i,(x,y) in enumerate(path):
-            if i == 0:
-                t = 'Start'
-            elif (i == len(path) - 1):
-                t = 'End'
-            else:
-                t = 'Path'
+    return None, None
 
-            data.append({'step':i+1,'x':x,'y':y,'type':t})
 
+def save_path(path, goal, filename='home_to_cafe.csv', stops=()):
+    """
+    경로를 파일로 저장합니다.
+
+    형식은 확장자로 정합니다. (.csv: step,x,y,type / .rle, .bin: 압축 형식, map_path_io 참고)
+    stops: 여러 카페를 들르는 tour의 경유지 path 인덱스 (csv에서 type이 Stop)
 
-        df = pd.DataFrame(data)
+    Returns:
+        저장한 경로의 행 목록 [{'step', 'x', 'y', 'type'}, ...] (형식과 관계없이 csv와 같은 내용)
+    """
 
-        df.to_csv(filename, index=False, encoding='utf-8-sig')
+    try:
+        with PathWriter(filename) as writer:
+            writer.write(path, stops)
 
-        print(f'경로가 {filename} 파일로 저장되었습니다.')
+        report.info(f'경로가 {filename} 파일로 저장되었습니다.')
 
-        return df
+        return [dict(zip(CSV_FIELDS, row)) for row in path_rows(path, stops)]
         
     except Exception as e:
         print(f'CSV 저장 중 오류 발생: {e}')
         sys.exit(1)
 
 
-def visualize_path_on_map(complete_df, path, target_cafe,filename='map_final.png'):
-    """경로를 지도에 빨간색 선으로 표시하고 저장합니다."""
+def visualize_path_on_map(complete_df, path, target_cafe,filename='map_final.png', grid=None, renderer='patches',
+                          stops=()):
+    """
+    경로를 지도에 빨간색 선으로 표시하고 저장합니다. (grid가 있으면 complete_df 대신 사용)
+
+    stops: 여러 카페를 들르는 tour의 경유지 path 인덱스 (초록색 점과 방문 순서 번호로 표시)
+    """
     try:
-        print('최종 지도 시각화 시작...')
+        report.info('최종 지도 시각화 시작...')
 
         if not path or len(path) < 2:
-            print('경로가 존재하지 않으므로 시각화를 건너뜁니다.')
+            report.info('경로가 존재하지 않으므로 시각화를 건너뜁니다.')
             return
         
-        # map_draw.py의 setup_map_figure 함수 사용
-        _, ax, _ = setup_map_figure(complete_df)
-        
-        # map_draw.py의 draw_structures 함수 사용
-        draw_structures(ax, complete_df)
+        if renderer == 'raster':
+            # matplotlib 없이 지도와 경로를 NumPy 배열로 그려 바로 저장
+            from map_raster import save_raster
+
+            save_raster(grid if grid is not None else Grid.from_dataframe(complete_df),
+                        filename, path=path, target=target_cafe, stops=stops)
+            report.info(f'최종 지도가 {filename} 파일로 저장되었습니다.')
+            return
+
+        # map_draw.py의 draw_base_map 함수 사용 (figure 설정 + 구조물 그리기)
+        # matplotlib은 import 시간이 길어 실제로 그릴 때만 import
+        import matplotlib.pyplot as plt
+        from map_draw import add_legend, draw_base_map
+
+        _, ax, _, _ = draw_base_map(complete_df, grid, renderer)
         
         # 경로를 빨간색 선으로 그리기
         if path and len(path) > 1:
@@ -164,13 +227,24 @@ def visualize_path_on_map(complete_df, path, target_cafe,filename='map_final.png
             ax.plot(end_x, end_y, 'ro', markersize=8, markerfacecolor='orange',
                    markeredgecolor='darkorange', label=f'Goal {target_cafe}')
 
+            # tour의 중간 경유지 (방문 순서 번호)
+            stop_points = [path[i] for i in stops if 0 < i < len(path) - 1]
+            if stop_points:
+                ax.plot([pos[0] for pos in stop_points], [pos[1] for pos in stop_points], 'o',
+                        markersize=8, markerfacecolor='limegreen', markeredgecolor='darkgreen',
+                        linestyle='none', label=f'Cafe Stops ({len(stop_points)})')
+                for order, (x, y) in enumerate(stop_points, start=1):
+                    ax.annotate(str(order), (x, y), xytext=(6, 6), textcoords='offset points',
+                                fontsize=12, fontweight='bold', color='darkgreen')
+
         
         # 범례 추가 (기존 범례에 경로 정보 추가)
         add_legend(ax)
         ax.legend(loc='upper left', fontsize=10)
         
         # 제목 수정 (경로 정보 포함)
-        ax.set_title(f'Shortest Path from MyHome to BandalgomCoffee\nPath Length: {len(path) if path else 0} steps', 
+        title = 'Cafe Tour from MyHome' if stops else 'Shortest Path from MyHome to BandalgomCoffee'
+        ax.set_title(f'{title}\nPath Length: {len(path) if path else 0} steps', 
                     fontsize=16, fontweight='bold')
         
         # 이미지 저장
@@ -178,49 +252,209 @@ def visualize_path_on_map(complete_df, path, target_cafe,filename='map_final.png
         plt.savefig(filename, dpi=300, bbox_inches='tight')
         plt.close()
         
-        print(f'최종 지도가 {filename} 파일로 저장되었습니다.')
+        report.info(f'최종 지도가 {filename} 파일로 저장되었습니다.')
                 
     except Exception as e:
         print(f'지도 시각화 중 오류 발생: {e}')
         sys.exit(1)
 
 
-def main():
-    """메인 실행 함수"""
+def prepare_engine(grid, engine):
+    """
+    같은 지도에서 find_route를 여러 번 부를 때 쓰도록 엔진의 전처리 결과를 한 번만 만듭니다.
 
-    print('=== Stage 3: 최단 경로 찾기 시작 ===')
-    
-# 1. 데이터 로딩
-    print('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
-    path = 'data/complete_map_data.csv'
-    if not os.path.exists(path):
-        raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
+    Returns:
+        find_route에 키워드 인자로 넘길 dict - 예) find_route(start, goals, grid, 'jps', **prepared)
+    """
+    if engine == 'jps':
+        return {'table': JumpTable.build(grid)}
+    if engine == 'hpa':
+        return {'hmap': HierarchicalMap.build(grid)}
+    if engine in WEIGHTED_ENGINES:
+        return {'costs': CostTable.build(grid)}
+    return {}
+
+
+def find_route(home_loc, cafes_loc, grid, engine='bfs', costs=None, table=None, hmap=None):
+    """
+    선택한 탐색 엔진으로 집에서 가장 가까운 카페까지의 경로를 찾습니다.
+
+    engine:
+        'bfs' - BFS 거리장 (처음 실행할 때 캐시에 저장하고, 다음 실행부터는 BFS 생략)
+        'jps' - Jump Point Search (장애물이 드문 지도에서 확장 노드 수가 크게 줄어듦)
+        'hpa' - 계층적 탐색 HPA* (매우 큰 지도용, 최단 경로에 가까운 경로)
+        'dial' - 칸별 이동 비용(costs)의 합이 가장 작은 경로 (bucket queue Dijkstra)
+        'dial-astar' - 'dial'과 같은 결과를 역방향 BFS 거리장 휴리스틱으로 더 적게 확장하여 찾음
+    costs: map_weighted.cell_costs로 만든 비용 배열 또는 CostTable (weighted 엔진 전용, None이면 모든 칸 비용 1)
+    table, hmap: 미리 만든 JumpTable(jps), HierarchicalMap(hpa) - 없으면 새로 계산 (prepare_engine 참고)
+    """
+    if engine in WEIGHTED_ENGINES:
+        if costs is None:
+            costs = cell_costs(grid)
+        return weighted_shortest_path(home_loc, cafes_loc, grid, costs, use_heuristic=engine == 'dial-astar')
+
+    if engine == 'jps':
+        return jump_point_search(home_loc, cafes_loc, grid, table)
 
-    complete_df = pd.read_csv(path)
+    if engine == 'hpa':
+        return hpa_search(home_loc, cafes_loc, grid, hmap)
 
-    if complete_df.empty:
-        raise ValueError(f'오류: 통합된 지도 데이터 파일 "{path}"이(가) 비어있습니다.')
+    if engine != 'bfs':
+        raise ValueError(f'알 수 없는 탐색 엔진입니다: {engine}')
+
+    # 거리장을 한 번 만들어 캐시에 저장해 두면 같은 지도에서는 다음 실행부터 BFS를 생략
+    field = cached_field(grid, cafes_loc)
+    path, target_cafe = field.route(home_loc)
+    if path is not None:
+        report.info(f'최단 경로 발견! 길이: {len(path)} 단계')
+    else:
+        report.info('경로를 찾을 수 없습니다.')
+    return path, target_cafe
+
+
+def parse_area_cost(text):
+    """'AREA=COST' 형식의 옵션 값을 (area, cost)로 변환합니다."""
+    area, _, cost = text.partition('=')
+    try:
+        return int(area), int(cost)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'AREA=COST 형식이어야 합니다: {text}')
+
+
+def parse_position(text):
+    """'X,Y' 형식의 옵션 값을 (x, y)로 변환합니다."""
+    x, _, y = text.partition(',')
+    try:
+        return int(x), int(y)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'X,Y 형식이어야 합니다: {text}')
+
+
+def main(engine='bfs', bundle=None, renderer='patches', area_costs=None, near_construction=0, render=True,
+         path_format='csv', tour=False, tour_cafes=None, return_home=False, workers=None):
+    """
+    메인 실행 함수
+
+    bundle: 같은 프로세스에서 Stage 1이 만든 (grid, rows) - 있으면 파일을 읽지 않음
+    renderer: 지도 그리기 방식 (map_raster.RENDERERS)
+    area_costs, near_construction: weighted 엔진의 칸별 비용 (map_weighted.cell_costs 참고)
+    render: False이면 경로 CSV만 저장하고 지도 그림(map_final.png)은 만들지 않음
+    path_format: 경로 파일 형식 (map_path_io.PATH_FORMATS, home_to_cafe.<형식>으로 저장)
+    tour: True이면 가장 가까운 카페 하나 대신 모든 카페(tour_cafes가 있으면 그 카페들)를 들르는 경로를 찾아
+          cafe_tour.<형식>, map_tour.png로 저장 (return_home: 내 집으로 돌아옴, workers: 거리 행렬 작업 프로세스 수)
+    """
+
+    report.stage('stage3')
+    report.info('=== Stage 3: 최단 경로 찾기 시작 ===')
+    
+# 1. 데이터 로딩
+    report.info('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
+    with report.timed('stage3.load'):
+        path = MAP_CSV
+        complete_df = None
+
+        if bundle is not None:
+            report.info(f'로드된 지도 통합 데이터: {len(bundle[1])}개')
+        elif bundle_is_fresh(MAP_BUNDLE, path):
+            # Stage 1이 저장한 격자 번들이 있으면 CSV 파싱 생략
+            bundle = load_bundle(MAP_BUNDLE)
+            report.info(f'격자 번들 "{MAP_BUNDLE}"을(를) 사용합니다.')
+            report.info(f'로드된 지도 통합 데이터: {len(bundle[1])}개')
+        else:
+            if not os.path.exists(path):
+                raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
+
+            # pandas 없이 격자 번들과 같은 형식으로 읽음 (빈 파일이면 ValueError)
+            bundle = read_map_csv(path)
         
-    print(f'로드된 지도 통합 데이터: {len(complete_df)}개')  
+            report.info(f'로드된 지도 통합 데이터: {len(bundle[1])}개')  
     
     # 2. 핵심 위치 찾기
-    home_loc, cafes_loc, blocked_loc,valid_positions = find_key_locations(complete_df)
+    home_loc, cafes_loc, grid = find_key_locations(complete_df, bundle)
+
+    if tour or tour_cafes:
+        # 3~5. 여러 카페를 들르는 경로 (map_tour가 이 모듈을 import하므로 여기서 import)
+        from map_tour import plan_tour
+
+        if engine != 'bfs' or area_costs or near_construction:
+            report.warn('경고: 여러 카페를 들르는 경로는 bfs 거리로만 계획합니다. (탐색 엔진/이동 비용 옵션 무시)')
+        with report.timed('stage3.search'):
+            try:
+                path, stops, _ = plan_tour(grid, home_loc, tour_cafes or cafes_loc, return_home, workers)
+            except ValueError as e:
+                print(f'오류: {e}')
+                sys.exit(1)
+        if path is None:
+            print('집에서 들를 수 있는 반달곰 커피가 없습니다.')
+            sys.exit(1)
+        report.count('path_length', len(path))
+
+        save_path(path, path[-1], f'cafe_tour.{path_format}', stops)
+        if render:
+            with report.timed('stage3.render'):
+                visualize_path_on_map(complete_df, path, path[-1], 'map_tour.png', grid, renderer, stops)
+        else:
+            report.info('--no-render: 지도 시각화를 건너뜁니다.')
+
+        report.info('=' * 60)
+        report.info('Stage 3 완료!')
+        return
     
-    # 3. 최단 경로 탐색 (BFS 알고리즘)
-    path, target_cafe = bfs_shortest_path(home_loc, cafes_loc, valid_positions, blocked_loc)
+    # 3. 최단 경로 탐색
+    with report.timed('stage3.search'):
+        costs = None
+        if engine in WEIGHTED_ENGINES:
+            costs = cell_costs(grid, area_costs, near_construction)
+        elif area_costs or near_construction:
+            report.warn(f'경고: {engine} 엔진은 이동 비용을 사용하지 않습니다. (dial, dial-astar에서만 사용)')
+        path, target_cafe = find_route(home_loc, cafes_loc, grid, engine, costs)
+    report.count('engine', engine)
     
     if path is None:
         print('집에서 반달곰 커피까지의 경로를 찾을 수 없습니다.')
         sys.exit(1)
+    report.count('path_length', len(path))
     
-    # 4. 경로를 CSV 파일로 저장
-    save_path(path, target_cafe)
+    # 4. 경로를 파일로 저장
+    save_path(path, target_cafe, f'home_to_cafe.{path_format}')
     
     # 5. 경로가 표시된 지도 시각화 및 저장
-    visualize_path_on_map(complete_df, path, target_cafe)
+    if render:
+        with report.timed('stage3.render'):
+            visualize_path_on_map(complete_df, path, target_cafe, grid=grid, renderer=renderer)
+    else:
+        report.info('--no-render: 지도 시각화를 건너뜁니다.')
     
-    print('=' * 60)
-    print('Stage 3 완료!')
+    report.info('=' * 60)
+    report.info('Stage 3 완료!')
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Stage 3: 최단 경로 찾기')
+    parser.add_argument('--engine', choices=ENGINES, default='bfs',
+                        help='경로 탐색 엔진 (기본값: bfs)')
+    parser.add_argument('--renderer', choices=RENDERERS, default='patches',
+                        help='지도 그리기 방식 (collection: 구조물 종류마다 한 번에 그림, 큰 지도용)')
+    parser.add_argument('--area-cost', action='append', type=parse_area_cost, default=[], metavar='AREA=COST',
+                        help='dial 엔진에서 해당 area 칸의 이동 비용 (여러 번 지정 가능, 기본 비용 1)')
+    parser.add_argument('--near-construction-cost', type=int, default=0, metavar='COST',
+                        help='dial 엔진에서 공사장과 맞닿은 칸에 더할 이동 비용')
+    parser.add_argument('--path-format', choices=PATH_FORMATS, default='csv',
+                        help='경로 파일 형식 (csv: step,x,y,type / rle: 시작점 + 이동 run / bin: int32 배열, 기본값: csv)')
+    parser.add_argument('--no-render', dest='render', action='store_false',
+                        help='경로 CSV만 저장하고 지도 그림은 만들지 않음 (matplotlib을 import하지 않음)')
+    parser.add_argument('--tour', action='store_true',
+                        help='모든 반달곰 커피를 들르는 가장 짧은 순서의 경로 (cafe_tour.csv, map_tour.png)')
+    parser.add_argument('--tour-cafe', action='append', type=parse_position, metavar='X,Y',
+                        help='--tour에서 들를 카페 좌표 (여러 번 지정 가능, 기본값: 모든 반달곰 커피)')
+    parser.add_argument('--return-home', action='store_true', help='--tour에서 마지막에 내 집으로 돌아옴')
+    parser.add_argument('--workers', type=int,
+                        help='--tour 거리 행렬을 나누어 계산할 작업 프로세스 수 (기본값: CPU 수)')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
+    main(engine=args.engine, renderer=args.renderer, area_costs=dict(args.area_cost),
+         near_construction=args.near_construction_cost, render=args.render,
+         path_format=args.path_format, tour=args.tour, tour_cafes=args.tour_cafe,
+         return_home=args.return_home, workers=args.workers)
+    report.write(args.report)
\ No newline at end of file
@@ -2,107 +2,124 @@
 Stage 3: 최단 경로 찾기 (A* 알고리즘 적용)
 """
 
+import argparse
 import pandas as pd
 import os
 import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-from collections import deque
 import heapq
 import sys
+import numpy as np
 
 # map_draw.py의 지도 그리기 함수들을 import
-from map_draw import setup_map_figure, draw_structures, add_legend
-
-def find_key_locations(df):
-    """구조물들의 위치를 찾습니다."""
-
-    valid_coord = set(zip(df['x'], df['y']))
-
-
-    home_loc = df[df['struct'] == 'MyHome']
-    if home_loc.empty:
+from map_draw import RENDERERS, add_legend, draw_base_map
+from map_grid import (Grid, MAP_BUNDLE, MAP_CSV, bundle_is_fresh, extract_bundle_locations,
+                      extract_key_locations, load_bundle)
+from map_cache import cached_field
+from map_raster import save_raster
+from map_report import add_report_arguments, report
+
+def find_key_locations(df, bundle=None):
+    """구조물들의 위치를 찾습니다. (bundle: load_bundle 결과가 있으면 사용)"""
+
+    if bundle is not None:
+        home_coord, cafe_coord, _, grid = extract_bundle_locations(*bundle)
+    else:
+        home_coord, cafe_coord, _, grid = extract_key_locations(df) # 벡터 연산으로 한 번에 추출
+
+    if home_coord is None:
         print('MyHome 위치 없음')
         sys.exit(1)
 
-    home_coord = (home_loc.iloc[0]['x'], home_loc.iloc[0]['y'])
-
-    cafes_loc = df[df['struct'] == 'BandalgomCoffee']
-    if cafes_loc.empty:
+    if not cafe_coord:
         print('BandalgomCoffee 위치 없음')
         sys.exit(1)
-
-    cafe_coord = [(row['x'], row['y']) for _,row in cafes_loc.iterrows()]
-
-    construction_coord = { (r['x'],r['y']) for _,r in df[df['ConstructionSite']==1].iterrows() }
     
-    print(f'\n지도 위 구조물 파악 계산 완료')
+    report.info(f'\n지도 위 구조물 파악 계산 완료')
 
-    return home_coord, cafe_coord, construction_coord, valid_coord
+    return home_coord, cafe_coord, grid
 
-def compute_heuristic_map(targets, valid, blocked):
+def compute_heuristic_map(targets, grid):
     # 목표 지점들로부터 역방향 BFS를 통해 휴리스틱 맵을 계산합니다.
+    # 결과는 cell id로 색인된 int32 배열이며, 목표에 닿을 수 없는 칸은 -1 입니다.
+    # 가장 가까운 카페 번호와 방향까지 필요하면 NearestCafeField를 직접 사용합니다.
+    # 같은 지도로 계산한 결과가 디스크 캐시에 있으면 BFS 없이 불러옵니다.
+
+    return cached_field(grid, targets).dist
+
+
+def astar_algorithm(start, targets, grid, field=None):
+    # field: 같은 targets로 미리 만든 NearestCafeField (있으면 휴리스틱 계산 생략)
+    if field is None:
+        report.info(f'역방향 BFS로 휴리스틱 계산 시작')
+        hmap = memoryview(compute_heuristic_map(targets, grid))
+    else:
+        hmap = memoryview(field.dist)
+    start_cell = grid.cell_id(*start)
+    if start_cell < 0 or hmap[start_cell] < 0: # 목표에 닿을 수 없는 시작점
+        report.info('경로 없음')
+        return None, None
 
-    hmap = { pos: float('inf') for pos in valid if pos not in blocked }
-    # 임시로 inf로 초기화
-
-    dq = deque()
-
-    for t in targets:
-        hmap[t] = 0
-        dq.append(t)
-    dirs = [(1,0),(-1,0),(0,1),(0,-1)]
-    while dq:
-        cur = dq.popleft()
-        for dx,dy in dirs: #dx,dy 는 변화량
-            nb = (cur[0]+dx, cur[1]+dy)
-            if nb in hmap and hmap[nb] == float('inf'):
-                hmap[nb] = hmap[cur] + 1
-                dq.append(nb)
-    return hmap
-
-
-def astar_algorithm(start, targets, blocked, valid):
-    print(f'역방향 BFS로 휴리스틱 계산 시작')
-    hmap = compute_heuristic_map(targets, valid, blocked)
+    target_cells = {grid.cell_id(*t) for t in targets}
     open_set = []
-    heapq.heappush(open_set, (hmap[start], 0, start))
-    came_from = {} # 경로 복원을 위한 딕셔너리
-    gscore = { start: 0 } #도착까지 최단거리 딕셔너리
-    visited = set()
-    dirs = [(1,0),(-1,0),(0,1),(0,-1)]
+    stride = grid.stride
+    # 동점이면 기존 (x, y) 튜플 순서대로 꺼내도록 (x 열 번호, cell id)를 함께 넣음
+    # (같은 열에서는 cell id가 y 순서와 같음)
+    heapq.heappush(open_set, (hmap[start_cell], 0, start_cell % stride, start_cell))
+    came_from_array = np.full(grid.size, -1, dtype=np.int32)
+    came_from = memoryview(came_from_array) # 경로 복원을 위한 배열
+    gscore = memoryview(np.full(grid.size, np.iinfo(np.int32).max, dtype=np.int32)) #도착까지 최단거리 배열
+    gscore[start_cell] = 0
+    visited = bytearray(grid.size)
+    offsets = (1, -1, grid.stride, -grid.stride) # (1,0),(-1,0),(0,1),(0,-1)
     goal = None
+    track = report.instrumenting
+    max_open = 1
+    stale = 0 # 이미 확장한 칸이라 버린 heap 항목 수
 
     while open_set:
-        f, g, cur = heapq.heappop(open_set)
-        if cur in visited: continue
-        visited.add(cur)
-        if cur in targets:
+        if track and len(open_set) > max_open:
+            max_open = len(open_set)
+        f, g, _, cur = heapq.heappop(open_set)
+        if visited[cur]:
+            stale += 1
+            continue
+        visited[cur] = 1
+        if cur in target_cells:
             goal = cur
             break
-        for dx,dy in dirs:
-            nb = (cur[0]+dx, cur[1]+dy)
-            if nb in valid and nb not in blocked:
-                ng = g + 1
-                if ng < gscore.get(nb, float('inf')):
-                    gscore[nb] = ng
-                    came_from[nb] = cur
-                    heapq.heappush(open_set, (ng + hmap.get(nb), ng, nb))
-
-    if not goal:
-        print('경로 없음')
+        ng = g + 1
+        for offset in offsets:
+            nb = cur + offset
+            h = hmap[nb] # 공사장, 지도 밖, 목표에 닿을 수 없는 칸은 -1
+            if h >= 0 and ng < gscore[nb]:
+                gscore[nb] = ng
+                came_from[nb] = cur
+                heapq.heappush(open_set, (ng + h, ng, nb % stride, nb))
+
+    if track:
+        # push 수 = 꺼낸 항목 + 남은 항목, 다시 넣은 수 = push 수 - 한 번이라도 넣은 칸 수
+        expanded = visited.count(1)
+        pushes = expanded + stale + len(open_set)
+        report.search('astar', expanded=expanded, pushes=pushes,
+                      re_pushes=pushes - 1 - int(np.count_nonzero(came_from_array >= 0)),
+                      stale_pops=stale, max_open=max_open)
+
+    if goal is None:
+        report.info('경로 없음')
         return None, None
 
     # 경로 복원
     path = []
     node = goal
-    while node != start:
-        path.append(node)
+    while node != start_cell:
+        path.append(grid.coord(node))
         node = came_from[node]
-    path.append(start)
+    path.append(grid.coord(start_cell))
     path.reverse()
-    print(f'경로 발견: {len(path)}단계')
-    return path, goal
+    report.info(f'경로 발견: {len(path)}단계')
+    return path, grid.coord(goal)
 
 def save_path(path, goal, filename='home_to_cafe2.csv'):
     """경로를 CSV 파일로 저장합니다."""
@@ -124,21 +141,25 @@ def save_path(path, goal, filename='home_to_cafe2.csv'):
 
     df.to_csv(filename, index=False, encoding='utf-8-sig')
 
-    print(f'경로가 {filename} 파일로 저장되었습니다.')
+    report.info(f'경로가 {filename} 파일로 저장되었습니다.')
 
     return df
 
 
-def visualize_path_on_map(complete_df, path, target_cafe, filename='map_final2.png'):
-    """경로를 지도에 빨간색 선으로 표시하고 저장합니다."""
+def visualize_path_on_map(complete_df, path, target_cafe, filename='map_final2.png', grid=None, renderer='patches'):
+    """경로를 지도에 빨간색 선으로 표시하고 저장합니다. (grid가 있으면 complete_df 대신 사용)"""
     try:
-        print('최종 지도 시각화 시작...')
-        
-        # map_draw.py의 setup_map_figure 함수 사용
-        _, ax, _ = setup_map_figure(complete_df)
+        report.info('최종 지도 시각화 시작...')
         
-        # map_draw.py의 draw_structures 함수 사용
-        draw_structures(ax, complete_df)
+        if renderer == 'raster':
+            # matplotlib 없이 지도와 경로를 NumPy 배열로 그려 바로 저장
+            save_raster(grid if grid is not None else Grid.from_dataframe(complete_df),
+                        filename, path=path, target=target_cafe)
+            report.info(f'최종 지도가 {filename} 파일로 저장되었습니다.')
+            return
+
+        # map_draw.py의 draw_base_map 함수 사용 (figure 설정 + 구조물 그리기)
+        _, ax, _, _ = draw_base_map(complete_df, grid, renderer)
         
         # 경로를 빨간색 선으로 그리기
         if path and len(path) > 1:
@@ -175,7 +196,7 @@ def visualize_path_on_map(complete_df, path, target_cafe, filename='map_final2.p
         plt.savefig(filename, dpi=500, bbox_inches='tight')
         plt.close()
         
-        print(f'최종 지도가 {filename} 파일로 저장되었습니다.')
+        report.info(f'최종 지도가 {filename} 파일로 저장되었습니다.')
                 
     except Exception as e:
         print(f'지도 시각화 중 오류 발생: {e}')
@@ -183,51 +204,72 @@ def visualize_path_on_map(complete_df, path, target_cafe, filename='map_final2.p
 
 
 
-def main():
-    """메인 실행 함수"""
+def main(renderer='patches'):
+    """메인 실행 함수 (renderer: 지도 그리기 방식, map_draw.RENDERERS)"""
     
-    print('=== Stage 3: 최단 경로 찾기 시작 ===')
+    report.stage('stage3')
+    report.info('=== Stage 3: 최단 경로 찾기 시작 ===')
     
 
-    print('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
+    report.info('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
     
     try:
         # 1. 데이터 로딩
          
-        path = 'data/complete_map_data.csv'
-
-        if not os.path.exists(path):
-            raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
+        with report.timed('stage3.load'):
+            path = MAP_CSV
+            complete_df, bundle = None, None
+
+            if bundle_is_fresh(MAP_BUNDLE, path):
+                # Stage 1이 저장한 격자 번들이 있으면 CSV 파싱 생략
+                bundle = load_bundle(MAP_BUNDLE)
+                report.info(f'격자 번들 "{MAP_BUNDLE}"을(를) 사용합니다.')
+                report.info(f'로드된 지도 통합 데이터: {len(bundle[1])}개')
+            else:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
         
-        complete_df = pd.read_csv(path)                   
+                complete_df = pd.read_csv(path)                   
 
-        if complete_df.empty:
-            raise ValueError(f'오류: 통합된 지도 데이터 파일 "{path}"이(가) 비어있습니다.')
+                if complete_df.empty:
+                    raise ValueError(f'오류: 통합된 지도 데이터 파일 "{path}"이(가) 비어있습니다.')
             
-        print(f'로드된 지도 통합 데이터: {len(complete_df)}개')
+                report.info(f'로드된 지도 통합 데이터: {len(complete_df)}개')
 
         # 2. 핵심 위치 찾기
-        home_loc, cafes_loc, blocked_loc, valid = find_key_locations(complete_df)
+        home_loc, cafes_loc, grid = find_key_locations(complete_df, bundle)
         
         # 3. 최단 경로 탐색
-        path, goal = astar_algorithm(home_loc, cafes_loc, blocked_loc, valid)
+        with report.timed('stage3.search'):
+            path, goal = astar_algorithm(home_loc, cafes_loc, grid)
+        report.count('engine', 'astar')
 
         if path is None:
             print('집에서 반달곰 커피까지의 경로를 찾을 수 없습니다.')
             sys.exit(1)
+        report.count('path_length', len(path))
         
         # 4. 경로를 CSV 파일로 저장
         save_path(path, goal)
 
         # 5. 경로가 표시된 지도 시각화 및 저장
-        visualize_path_on_map(complete_df, path, goal)
+        with report.timed('stage3.render'):
+            visualize_path_on_map(complete_df, path, goal, grid=grid, renderer=renderer)
 
     except Exception as e:
         print(f'오류 발생: {e}')
         sys.exit(1)
 
 
-    print('============\nStage 3 완료\n=============')
+    report.info('============\nStage 3 완료\n=============')
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='Stage 3: 최단 경로 찾기 (A*)')
+    parser.add_argument('--renderer', choices=RENDERERS, default='patches',
+                        help='지도 그리기 방식 (collection: 구조물 종류마다 한 번에 그림, 큰 지도용)')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
+    main(renderer=args.renderer)
+    report.write(args.report)
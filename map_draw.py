@@ -3,22 +3,39 @@ Stage 2: 지도 시각화
 
 """
 
+import argparse
 import pandas as pd
 import os
 import matplotlib
 matplotlib.use('Agg') 
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
+from matplotlib.collections import EllipseCollection, LineCollection, PolyCollection
+import numpy as np
 import sys
 
+from map_grid import (Grid, NO_STRUCT, STRUCT_CODES, STRUCT_TYPES, MAP_BUNDLE, MAP_CSV,
+                      bundle_is_fresh, load_bundle)
+from map_raster import RENDERERS, count_structures, save_raster
+from map_report import add_report_arguments, report
+from map_tiles import TILES_DIR, render_tile_pyramid
 
-def setup_map_figure(complete_df):
-    """지도 시각화를 위한 matplotlib figure와 좌표계를 설정합니다."""
-    # 좌표 범위 계산
-    x_min, x_max = complete_df['x'].min(), complete_df['x'].max()
-    y_min, y_max = complete_df['y'].min(), complete_df['y'].max()
 
-    print(f'좌표 범위: X({x_min}~{x_max}), Y({y_min}~{y_max})')
+def setup_map_figure(complete_df, grid=None, batched=False):
+    """
+    지도 시각화를 위한 matplotlib figure와 좌표계를 설정합니다. (grid가 있으면 complete_df 대신 사용)
+
+    batched=True이면 격자선을 줄마다 axvline/axhline으로 그리지 않고 LineCollection 하나로 그립니다.
+    """
+    # 좌표 범위 계산
+    if grid is not None:
+        x_min, x_max = grid.x_min, grid.x_max
+        y_min, y_max = grid.y_min, grid.y_max
+    else:
+        x_min, x_max = complete_df['x'].min(), complete_df['x'].max()
+        y_min, y_max = complete_df['y'].min(), complete_df['y'].max()
+
+    report.info(f'좌표 범위: X({x_min}~{x_max}), Y({y_min}~{y_max})')
     
     # figure 크기 설정 (좌표 비율에 맞춤)
     fig_width = (x_max - x_min + 1) * 0.8
@@ -36,10 +53,23 @@ def setup_map_figure(complete_df):
     ax.invert_yaxis()
 
             # 격자선 그리기 (건물이 격자선 위에 위치하도록 중심 좌표를 정수로 사용)
-    for x in range(x_min, x_max + 1):
-        ax.axvline(x=x, color='#212529', linestyle='-', alpha=0.8, zorder=0)
-    for y in range(y_min, y_max + 1):
-        ax.axhline(y=y, color='#212529', linestyle='-', alpha=0.8, zorder=0)
+    if batched:
+        # axvline/axhline처럼 축 전체를 가로지르는 선분들
+        xs = np.arange(x_min, x_max + 1)
+        ys = np.arange(y_min, y_max + 1)
+        vertical = np.stack([np.stack([xs, np.full_like(xs, y_min - 1)], axis=1),
+                             np.stack([xs, np.full_like(xs, y_max + 1)], axis=1)], axis=1)
+        horizontal = np.stack([np.stack([np.full_like(ys, x_min - 1), ys], axis=1),
+                               np.stack([np.full_like(ys, x_max + 1), ys], axis=1)], axis=1)
+        ax.add_collection(LineCollection(np.concatenate([vertical, horizontal]),
+                                         colors='#212529', linestyles='-', alpha=0.8, zorder=0,
+                                         linewidths=plt.rcParams['lines.linewidth']),
+                          autolim=False)
+    else:
+        for x in range(x_min, x_max + 1):
+            ax.axvline(x=x, color='#212529', linestyle='-', alpha=0.8, zorder=0)
+        for y in range(y_min, y_max + 1):
+            ax.axhline(y=y, color='#212529', linestyle='-', alpha=0.8, zorder=0)
 
     # 축 설정 
     ax.set_xlabel('X', fontsize=12)
@@ -53,7 +83,7 @@ def setup_map_figure(complete_df):
     return fig, ax, (x_min, x_max, y_min, y_max)
 
 
-def draw_structures(ax, complete_df):
+def draw_structures(ax, complete_df, grid=None):
     """각 구조물을 지정된 색상과 모양으로 그립니다."""
     structure_counts = {
         'Apartment': 0,
@@ -62,11 +92,18 @@ def draw_structures(ax, complete_df):
         'MyHome': 0,
         'ConstructionSite': 0
     }
-    
-    for _, row in complete_df.iterrows():
-        x, y = row['x'], row['y']
-        struct_type = row['struct']
-        is_construction = row['ConstructionSite'] == 1
+
+    if grid is None:
+        grid = Grid.from_dataframe(complete_df)
+
+    # 빈 칸은 건너뛰고 공사장이나 구조물이 있는 칸만 그림
+    cells = np.flatnonzero(grid.construction | (grid.struct > STRUCT_CODES['Empty']))
+    xs, ys = grid.coords(cells)
+
+    for x, y, is_construction, struct_code in zip(xs.tolist(), ys.tolist(),
+                                                  grid.construction[cells].tolist(),
+                                                  grid.struct[cells].tolist()):
+        struct_type = STRUCT_TYPES[struct_code] if struct_code >= 0 else None
 
         # 건물이 격자선 위에 위치하도록 중심 좌표를 정수로 사용
         if is_construction:
@@ -114,6 +151,86 @@ def draw_structures(ax, complete_df):
     return structure_counts
 
 
+def _squares(xs, ys, half):
+    """중심 (xs, ys), 반변 길이 half인 정사각형 꼭짓점 배열 (N, 4, 2)"""
+    corners = np.array([(-half, -half), (half, -half), (half, half), (-half, half)])
+    return np.stack([xs, ys], axis=1)[:, None, :] + corners[None, :, :]
+
+
+def draw_structures_batched(ax, complete_df, grid=None):
+    """
+    draw_structures와 같은 모양/색상으로 그리되, 구조물 종류마다 collection 하나만 만듭니다.
+
+    칸마다 Artist를 만들지 않으므로 큰 지도에서도 그리기 시간과 메모리가 거의 늘지 않습니다.
+    """
+    if grid is None:
+        grid = Grid.from_dataframe(complete_df)
+
+    construction = grid.construction
+    struct = np.where(construction, NO_STRUCT, grid.struct)
+
+    def positions(mask):
+        xs, ys = grid.coords(np.flatnonzero(mask))
+        return xs.astype(float), ys.astype(float)
+
+    structure_counts = {}
+
+    # 회색 사각형으로 공사장 표시
+    xs, ys = positions(construction)
+    structure_counts['ConstructionSite'] = len(xs)
+    if len(xs):
+        ax.add_collection(PolyCollection(_squares(xs, ys, 0.5), facecolors='gray', edgecolors='gray',
+                                         alpha=0.8, linewidths=0, joinstyle='miter'), autolim=False)
+
+    # 갈색 원으로 아파트/빌딩 표시 (테두리 색으로 구분)
+    for name, edgecolor in (('Apartment', '#800000'), ('Building', '#003458')):
+        xs, ys = positions(struct == STRUCT_CODES[name])
+        structure_counts[name] = len(xs)
+        if len(xs):
+            ax.add_collection(EllipseCollection(np.full(len(xs), 0.8), np.full(len(xs), 0.8),
+                                                np.zeros(len(xs)), units='xy',
+                                                offsets=np.stack([xs, ys], axis=1),
+                                                offset_transform=ax.transData,
+                                                facecolors='saddlebrown', edgecolors=edgecolor,
+                                                alpha=1.0, linewidths=5), autolim=False)
+
+    # 초록색 사각형으로 반달곰커피 표시
+    xs, ys = positions(struct == STRUCT_CODES['BandalgomCoffee'])
+    structure_counts['BandalgomCoffee'] = len(xs)
+    if len(xs):
+        ax.add_collection(PolyCollection(_squares(xs, ys, 0.4), facecolors='green', edgecolors='darkgreen',
+                                         alpha=0.9, linewidths=3, joinstyle='miter'), autolim=False)
+
+    # 초록색 삼각형으로 내 집 표시
+    xs, ys = positions(struct == STRUCT_CODES['MyHome'])
+    structure_counts['MyHome'] = len(xs)
+    if len(xs):
+        triangle = np.array([(0, -0.35), (-0.35, 0.3), (0.35, 0.3)])
+        ax.add_collection(PolyCollection(np.stack([xs, ys], axis=1)[:, None, :] + triangle[None, :, :],
+                                         facecolors='green', edgecolors='darkgreen',
+                                         alpha=0.9, linewidths=3, joinstyle='miter'), autolim=False)
+
+    return {name: structure_counts[name]
+            for name in ('Apartment', 'Building', 'BandalgomCoffee', 'MyHome', 'ConstructionSite')}
+
+
+def draw_base_map(complete_df, grid=None, renderer='patches'):
+    """
+    선택한 renderer로 figure 설정과 구조물 그리기를 한 번에 수행합니다.
+
+    Returns:
+        (fig, ax, coord_range, structure_counts)
+    """
+    if renderer not in RENDERERS or renderer == 'raster':
+        raise ValueError(f'matplotlib로 그릴 수 없는 renderer입니다: {renderer}')
+
+    batched = renderer == 'collection'
+    fig, ax, coord_range = setup_map_figure(complete_df, grid, batched=batched)
+    draw = draw_structures_batched if batched else draw_structures
+    structure_counts = draw(ax, complete_df, grid)
+    return fig, ax, coord_range, structure_counts
+
+
 def add_legend(ax):
     """범례"""
     legend_elements = [
@@ -136,45 +253,89 @@ def save_map(fig, filename='map.png'):
     try:
         plt.tight_layout()
         fig.savefig(filename, dpi=500, bbox_inches='tight')
-        print(f'지도가 {filename} 파일로 저장되었습니다.')
+        report.info(f'지도가 {filename} 파일로 저장되었습니다.')
         
     except Exception as e:
         print(f'지도 저장 중 오류 발생: {e}')
 
 
-def create_map_visualization():
-    """메인 함수: 지도 시각화를 생성하고 저장합니다."""
+def create_map_visualization(bundle=None, renderer='patches', tiles_dir=None, workers=None):
+    """
+    메인 함수: 지도 시각화를 생성하고 저장합니다.
+
+    bundle: 같은 프로세스에서 Stage 1이 만든 (grid, rows) - 있으면 파일을 읽지 않음
+    renderer: 'patches'(칸마다 patch), 'collection'(구조물 종류마다 collection, 큰 지도용)
+              또는 'raster'(matplotlib 없이 NumPy 배열로 그림, 가장 빠름)
+    tiles_dir: 주어지면 map.png 대신 이 폴더에 z/x/y 타일 피라미드를 저장 (renderer 무시)
+    workers: 타일을 나누어 그릴 작업 프로세스 수 (None이면 CPU 수)
+    """
     try:
-        print('=== Stage 2: 지도 시각화 시작 ===')
+        report.stage('stage2')
+        report.info('=== Stage 2: 지도 시각화 시작 ===')
         # 1. 데이터 로딩
-        print('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
-        path = 'data/complete_map_data.csv'
-
-        if not os.path.exists(path):
-            raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
-
-        complete_df = pd.read_csv(path)
-
-        if complete_df.empty:
-            raise ValueError(f'오류: 통합된 지도 데이터 파일 "{path}"이(가) 비어있습니다.')
+        report.info('Stage 1에서 생성한 지도 통합 데이터 로드 중 ...','\n')
+        with report.timed('stage2.load'):
+            path = MAP_CSV
+            complete_df, grid = None, None
+
+            if bundle is not None:
+                grid, rows = bundle
+                report.info(f'전달된 지도 통합 데이터: {len(rows)}개')
+            elif bundle_is_fresh(MAP_BUNDLE, path):
+                # Stage 1이 저장한 격자 번들이 있으면 CSV 파싱 생략
+                grid, rows = load_bundle(MAP_BUNDLE)
+                report.info(f'격자 번들 "{MAP_BUNDLE}"을(를) 사용합니다.')
+                report.info(f'전달된 지도 통합 데이터: {len(rows)}개')
+            else:
+                if not os.path.exists(path):
+                    raise FileNotFoundError(f'오류: 지도 통합 데이터 "{path}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행하여 파일을 생성해 주세요.')
+
+                complete_df = pd.read_csv(path)
+
+                if complete_df.empty:
+                    raise ValueError(f'오류: 통합된 지도 데이터 파일 "{path}"이(가) 비어있습니다.')
         
-        print(f'전달된 지도 통합 데이터: {len(complete_df)}개')  
-
+                report.info(f'전달된 지도 통합 데이터: {len(complete_df)}개')  
+
+
+        if tiles_dir is not None:
+            # 큰 지도용: 전체 이미지를 만들지 않고 타일만 그림 (바뀐 타일만 다시 그림)
+            if grid is None:
+                grid = Grid.from_dataframe(complete_df)
+            report.info(f'지도 타일 피라미드를 "{tiles_dir}" 폴더에 그리는 중...')
+            with report.timed('stage2.tiles'):
+                summary = render_tile_pyramid(grid, tiles_dir, workers=workers)
+            report.info(f'확대 수준 {summary["zoom_levels"]}단계, 타일 {summary["tiles"]}개 중 '
+                        f'{summary["rendered"]}개를 새로 그렸습니다.')
+            report.count('tiles', summary)
+            return
+
+        if renderer == 'raster':
+            # 래스터는 그리기와 저장을 한 번에 수행
+            if grid is None:
+                grid = Grid.from_dataframe(complete_df)
+            report.info(f'좌표 범위: X({grid.x_min}~{grid.x_max}), Y({grid.y_min}~{grid.y_max})')
+            report.info('구조물과 범례를 래스터로 그리는 중...')
+            with report.timed('stage2.draw'):
+                save_raster(grid, 'map.png')
+            report.info('지도가 map.png 파일로 저장되었습니다.')
+            report.count('structures', count_structures(grid))
+            return
 
         # 2. 그래프 설정
-        print('지도 figure 설정 중...')
-        fig, ax, coord_range = setup_map_figure(complete_df)
+        with report.timed('stage2.draw'):
+            # 3. 구조물 그리기
+            report.info('지도 figure 설정 및 구조물을 지도에 표시하는 중...')
+            fig, ax, coord_range, structure_counts = draw_base_map(complete_df, grid, renderer)
         
-        # 3. 구조물 그리기
-        print('구조물을 지도에 표시하는 중...')
-        structure_counts = draw_structures(ax, complete_df)
-        
-        # 4. 범례 추가
-        print('범례 추가 중...')
-        add_legend(ax)
+            # 4. 범례 추가
+            report.info('범례 추가 중...')
+            add_legend(ax)
         
         # 5. 지도 저장
-        save_map(fig, 'map.png')
+        with report.timed('stage2.save'):
+            save_map(fig, 'map.png')
+        report.count('structures', structure_counts)
     
         plt.close(fig)  
 
@@ -184,9 +345,23 @@ def create_map_visualization():
 
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stage 2: 지도 시각화')
+    parser.add_argument('--renderer', choices=RENDERERS, default='patches',
+                        help='그리기 방식 (collection: 구조물 종류마다 한 번에 그림, 큰 지도용 / '
+                             'raster: matplotlib 없이 바로 PNG 저장)')
+    parser.add_argument('--tiles', nargs='?', const=TILES_DIR, metavar='DIR',
+                        help=f'map.png 대신 z/x/y 타일 피라미드로 저장 (기본 폴더: {TILES_DIR})')
+    parser.add_argument('--workers', type=int,
+                        help='타일을 나누어 그릴 작업 프로세스 수 (기본값: CPU 수)')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
     try:  # 데이터 파일 경로
-        create_map_visualization()
-        print('\n Stage 2 완료: map.png 파일이 생성되었습니다.')
+        create_map_visualization(renderer=args.renderer, tiles_dir=args.tiles, workers=args.workers)
+        output = f'{args.tiles} 타일 폴더가' if args.tiles else 'map.png 파일이'
+        report.info(f'\n Stage 2 완료: {output} 생성되었습니다.')
+        report.write(args.report)
         
     except KeyboardInterrupt:
         print('\n\n사용자에 의해 중단되었습니다.')
@@ -0,0 +1,301 @@
+"""
+지도 격자 모델
+
+Stage 1이 만든 지도 통합 데이터를 좌표 튜플 집합 대신 NumPy 배열로 표현합니다.
+모든 배열은 linearized cell id로 색인되며, Stage 2 시각화와 Stage 3 경로 탐색이
+같은 Grid 객체를 공유합니다.
+
+Stage 1은 CSV와 함께 격자 배열을 그대로 담은 .npz 번들을 저장할 수 있고,
+Stage 2/3은 번들이 CSV보다 최신이면 CSV를 다시 파싱하지 않고 번들을 읽습니다.
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+
+# area_category.csv의 category 번호와 같은 순서 (0은 빈 칸)
+STRUCT_TYPES = ('Empty', 'Apartment', 'Building', 'MyHome', 'BandalgomCoffee')
+STRUCT_CODES = {name: code for code, name in enumerate(STRUCT_TYPES)}
+NO_STRUCT = -1  # 지도에 없는 칸 또는 알 수 없는 구조물
+
+MAP_CSV = 'data/complete_map_data.csv'
+MAP_BUNDLE = 'data/complete_map_data.npz'
+BUNDLE_FORMAT = 'caffee-map-grid'
+BUNDLE_VERSION = 1
+
+
+class Grid:
+    """
+    배열 기반 지도 격자
+
+    지도 바깥을 통과 불가 칸 한 겹으로 둘러싼 (height + 2) x (width + 2) 배열을
+    1차원으로 펼쳐 저장합니다. 덕분에 이웃 칸은 항상 cell ± 1, cell ± stride 이며
+    탐색 중에 경계 검사가 필요 없습니다.
+
+    Attributes:
+        passable: 이동 가능 여부 (bool)
+        construction: 공사장 여부 (bool)
+        struct: 구조물 코드 (int8, STRUCT_TYPES의 인덱스 또는 NO_STRUCT)
+        area: 지역 번호 (int16, 없으면 -1)
+    """
+
+    def __init__(self, x_min, y_min, width, height):
+        self.x_min = int(x_min)
+        self.y_min = int(y_min)
+        self.width = int(width)
+        self.height = int(height)
+        self.stride = self.width + 2
+        self.size = self.stride * (self.height + 2)
+
+        self.passable = np.zeros(self.size, dtype=bool)
+        self.construction = np.zeros(self.size, dtype=bool)
+        self.struct = np.full(self.size, NO_STRUCT, dtype=np.int8)
+        self.area = np.full(self.size, -1, dtype=np.int16)
+
+        # bfs_shortest_path의 이동 순서: 위, 아래, 왼쪽, 오른쪽
+        self.offsets = (-self.stride, self.stride, -1, 1)
+
+    @classmethod
+    def from_dataframe(cls, complete_df):
+        """complete_map_data.csv 형식의 DataFrame으로 Grid를 만듭니다."""
+        return cls.from_columns(*_map_columns(complete_df))
+
+    @classmethod
+    def from_columns(cls, xs, ys, construction, struct, area):
+        """행 단위 컬럼 배열(x, y, 공사장 여부, 구조물 코드, area)로 Grid를 만듭니다."""
+        if len(xs) == 0:
+            raise ValueError('지도 데이터가 비어있어 격자를 만들 수 없습니다.')
+
+        x_min, y_min = xs.min(), ys.min()
+        grid = cls(x_min, y_min, xs.max() - x_min + 1, ys.max() - y_min + 1)
+        cells = grid.cell_ids(xs, ys)
+
+        grid.construction[cells] = construction
+        grid.passable[cells] = ~construction
+        grid.struct[cells] = struct
+        grid.area[cells] = area
+
+        return grid
+
+    @property
+    def x_max(self):
+        return self.x_min + self.width - 1
+
+    @property
+    def y_max(self):
+        return self.y_min + self.height - 1
+
+    def cell_id(self, x, y):
+        """좌표 (x, y)의 cell id를 반환합니다. 지도 범위 밖이면 -1을 반환합니다."""
+        col = int(x) - self.x_min
+        row = int(y) - self.y_min
+        if not (0 <= col < self.width and 0 <= row < self.height):
+            return -1
+        return (row + 1) * self.stride + col + 1
+
+    def cell_ids(self, xs, ys):
+        """좌표 배열을 cell id 배열로 변환합니다. (범위 검사 없음)"""
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        return (ys - self.y_min + 1) * self.stride + (xs - self.x_min + 1)
+
+    def coord(self, cell):
+        """cell id를 좌표 (x, y)로 변환합니다."""
+        row, col = divmod(int(cell), self.stride)
+        return (col - 1 + self.x_min, row - 1 + self.y_min)
+
+    def coords(self, cells):
+        """cell id 배열을 x, y 좌표 배열로 변환합니다."""
+        rows, cols = np.divmod(np.asarray(cells, dtype=np.int64), self.stride)
+        return cols - 1 + self.x_min, rows - 1 + self.y_min
+
+    def neighbors(self, cell):
+        """상하좌우 이웃 cell id 목록을 반환합니다. (통과 가능 여부는 확인하지 않음)"""
+        return [cell + offset for offset in self.offsets]
+
+    def is_passable(self, x, y):
+        """좌표 (x, y)가 지도 안에 있고 공사장이 아닌지 확인합니다."""
+        cell = self.cell_id(x, y)
+        return cell >= 0 and bool(self.passable[cell])
+
+    def new_visited(self):
+        """통과 불가 칸이 미리 방문 처리된 방문 표시 배열을 만듭니다."""
+        return bytearray((~self.passable).view(np.uint8))
+
+    def view(self, values):
+        """cell id로 색인된 배열을 테두리를 뺀 (height, width) 2차원 배열로 봅니다."""
+        return values.reshape(self.height + 2, self.stride)[1:-1, 1:-1]
+
+
+def _map_columns(complete_df):
+    """DataFrame에서 Grid에 필요한 컬럼들을 NumPy 배열로 한 번에 꺼냅니다."""
+    xs = complete_df['x'].to_numpy(dtype=np.int64)
+    ys = complete_df['y'].to_numpy(dtype=np.int64)
+    construction = complete_df['ConstructionSite'].fillna(0).to_numpy() == 1
+    # 문자열 비교 대신 범주형 코드로 변환 (알 수 없는 이름과 결측치는 NO_STRUCT)
+    struct = _struct_codes(complete_df['struct'])
+    area = complete_df['area'].fillna(-1).to_numpy(dtype=np.int16)
+    return xs, ys, construction, struct, area
+
+
+def _struct_codes(values):
+    """구조물 이름 컬럼을 STRUCT_TYPES 기준 int8 코드 배열로 변환합니다."""
+    import pandas as pd
+
+    return pd.Categorical(values, categories=STRUCT_TYPES).codes.astype(np.int8)
+
+
+def extract_key_locations(complete_df):
+    """
+    지도 통합 데이터에서 탐색에 필요한 정보를 벡터 연산 한 번으로 추출합니다.
+
+    Returns:
+        (home_pos, cafe_positions, blocked_cells, grid)
+          - home_pos: 첫 번째 MyHome 좌표 (x, y), 없으면 None
+          - cafe_positions: 모든 BandalgomCoffee 좌표 리스트
+          - blocked_cells: 공사장 cell id 배열
+          - grid: 이동 가능 여부 등을 담은 Grid
+    """
+    xs, ys, construction, struct, area = _map_columns(complete_df)
+    grid = Grid.from_columns(xs, ys, construction, struct, area)
+    return _key_locations(grid, xs, ys, struct)
+
+
+def extract_bundle_locations(grid, rows):
+    """load_bundle 결과에서 extract_key_locations와 같은 정보를 추출합니다."""
+    xs, ys = grid.coords(rows)
+    return _key_locations(grid, xs, ys, grid.struct[rows])
+
+
+def _key_locations(grid, xs, ys, struct):
+    """행 순서의 좌표/구조물 코드에서 집, 카페, 공사장 위치를 찾습니다."""
+    home_rows = np.flatnonzero(struct == STRUCT_CODES['MyHome'])
+    home_pos = (int(xs[home_rows[0]]), int(ys[home_rows[0]])) if len(home_rows) else None
+
+    cafe_rows = struct == STRUCT_CODES['BandalgomCoffee']
+    cafe_positions = list(zip(xs[cafe_rows].tolist(), ys[cafe_rows].tolist()))
+
+    blocked_cells = np.flatnonzero(grid.construction)
+
+    return home_pos, cafe_positions, blocked_cells, grid
+
+
+def build_bundle(complete_df):
+    """
+    지도 통합 데이터에서 load_bundle과 같은 형식의 (grid, rows)를 메모리에서 바로 만듭니다.
+
+    rows는 원래 행 순서의 cell id 배열이며, 번들에서 찾은 집/카페 순서가 CSV에서 찾은 것과 같도록 합니다.
+    """
+    xs, ys, construction, struct, area = _map_columns(complete_df)
+    grid = Grid.from_columns(xs, ys, construction, struct, area)
+    return grid, grid.cell_ids(xs, ys)
+
+
+def read_map_csv(path=MAP_CSV):
+    """
+    지도 통합 데이터 CSV를 pandas 없이 읽어 build_bundle과 같은 형식의 (grid, rows)를 만듭니다.
+
+    작은 지도에서는 pandas import 시간이 경로 탐색보다 길기 때문에 Stage 3은 이 함수로 지도를 읽습니다.
+    빈 값은 extract_key_locations와 같이 처리합니다. (공사장 아님, area -1, 구조물 NO_STRUCT)
+    """
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        columns = dict(zip(header, zip(*reader)))
+
+    if not columns or not columns.get('x'):
+        raise ValueError(f'지도 통합 데이터 "{path}"이(가) 비어있습니다.')
+    missing = [name for name in ('x', 'y', 'ConstructionSite', 'area', 'struct') if name not in columns]
+    if missing:
+        raise ValueError(f'지도 통합 데이터 "{path}"에 {", ".join(missing)} 컬럼이 없습니다.')
+
+    xs = _numbers(columns['x']).astype(np.int64)
+    ys = _numbers(columns['y']).astype(np.int64)
+    construction = _numbers(columns['ConstructionSite']) == 1
+    area = np.nan_to_num(_numbers(columns['area']), nan=-1).astype(np.int16)
+    struct = np.array([STRUCT_CODES.get(name, NO_STRUCT) for name in columns['struct']], dtype=np.int8)
+
+    grid = Grid.from_columns(xs, ys, construction, struct, area)
+    return grid, grid.cell_ids(xs, ys)
+
+
+def _numbers(values):
+    """CSV 문자열 컬럼을 float 배열로 변환합니다. (빈 값은 NaN)"""
+    values = np.array(values)
+    return np.where(values == '', 'nan', values).astype(np.float64)
+
+
+def save_bundle(complete_df, path=MAP_BUNDLE):
+    """
+    지도 통합 데이터를 격자 배열 그대로 .npz 번들로 저장합니다.
+
+    번들에는 스키마 헤더(JSON), 원래 행 순서의 cell id, 공사장/구조물/area 배열이 들어갑니다.
+
+    Returns:
+        (grid, rows) - build_bundle 결과
+    """
+    grid, rows = build_bundle(complete_df)
+    stored_rows = rows.astype(np.int32 if grid.size <= np.iinfo(np.int32).max else np.int64)
+
+    header = {
+        'format': BUNDLE_FORMAT,
+        'version': BUNDLE_VERSION,
+        'x_min': grid.x_min,
+        'y_min': grid.y_min,
+        'width': grid.width,
+        'height': grid.height,
+        'struct_types': list(STRUCT_TYPES),
+    }
+
+    # 다른 Stage가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, header=np.array(json.dumps(header)), rows=stored_rows,
+                 construction=grid.construction, struct=grid.struct, area=grid.area)
+    os.replace(tmp_path, path)
+    return grid, rows
+
+
+def load_bundle(path=MAP_BUNDLE):
+    """
+    save_bundle로 저장한 번들을 읽습니다.
+
+    Returns:
+        (grid, rows) - rows는 원래 CSV 행 순서의 cell id 배열
+    """
+    with np.load(path, allow_pickle=False) as bundle:
+        try:
+            header = json.loads(str(bundle['header']))
+        except (KeyError, ValueError) as e:
+            raise ValueError(f'지도 번들 "{path}"의 헤더를 읽을 수 없습니다: {e}')
+
+        if header.get('format') != BUNDLE_FORMAT or header.get('version') != BUNDLE_VERSION:
+            raise ValueError(f'지원하지 않는 지도 번들 형식입니다: {header.get("format")} v{header.get("version")}')
+        if tuple(header.get('struct_types', ())) != STRUCT_TYPES:
+            raise ValueError('지도 번들의 구조물 종류가 현재 코드와 다릅니다. Stage 1을 다시 실행해 주세요.')
+
+        grid = Grid(header['x_min'], header['y_min'], header['width'], header['height'])
+        for name in ('construction', 'struct', 'area'):
+            values = bundle[name]
+            if values.shape != (grid.size,):
+                raise ValueError(f'지도 번들의 {name} 배열 크기가 헤더와 맞지 않습니다.')
+            getattr(grid, name)[:] = values
+        rows = bundle['rows'].astype(np.int64)
+
+    if len(rows) == 0:
+        raise ValueError(f'지도 번들 "{path}"이(가) 비어있습니다.')
+
+    grid.passable[rows] = ~grid.construction[rows]
+    return grid, rows
+
+
+def bundle_is_fresh(bundle_path=MAP_BUNDLE, csv_path=MAP_CSV):
+    """번들이 있고 CSV보다 오래되지 않았으면 True (CSV만 다시 만들어진 경우 번들은 무시)"""
+    if not os.path.exists(bundle_path):
+        return False
+    if not os.path.exists(csv_path):
+        return True
+    return os.path.getmtime(bundle_path) >= os.path.getmtime(csv_path)
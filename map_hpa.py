@@ -0,0 +1,361 @@
+"""
+계층적 경로 탐색 (HPA*)
+
+지도를 cluster_size x cluster_size 크기의 클러스터로 나누고, 클러스터 경계의 출입구(entrance)와
+클러스터 내부 출입구 사이 거리를 미리 계산해 추상 그래프를 만듭니다.
+질의는 추상 그래프에서 먼저 경로를 찾은 뒤, 경로가 지나는 클러스터 안에서만 실제 칸 경로로 다듬습니다.
+지도 전체 칸 수가 아니라 출입구 수에 비례해 탐색하므로 도시 규모의 지도에서도 쓸 수 있습니다.
+(결과 경로는 최단 경로에 가깝지만 항상 최단은 아닙니다.)
+"""
+
+from collections import deque
+import heapq
+
+import numpy as np
+
+from map_report import report
+
+
+CLUSTER_SIZE = 16
+LONG_ENTRANCE = 6  # 이 길이 이상인 출입구 구간은 양 끝에 두 개의 전이점을 둠
+
+
+def _border_transitions(both_open, cluster_size):
+    """경계 양쪽이 모두 열린 칸들을 클러스터 단위 구간으로 나누고 전이점 위치를 반환합니다."""
+    idx = np.flatnonzero(both_open)
+    if not idx.size:
+        return idx
+
+    breaks = np.flatnonzero((np.diff(idx) != 1)
+                            | (idx[1:] // cluster_size != idx[:-1] // cluster_size)) + 1
+    first = idx[np.concatenate(([0], breaks))]
+    last = idx[np.concatenate((breaks, [idx.size])) - 1]
+
+    is_long = last - first + 1 >= LONG_ENTRANCE
+    middle = (first + last) // 2
+    return np.concatenate((first[is_long], last[is_long], middle[~is_long]))
+
+
+def _cluster_distances(block, pos, valid, lo, hi):
+    """
+    한 줄의 클러스터들에서 출입구 lo..hi-1을 시작점으로 동시에 BFS하여
+    모든 출입구까지의 거리 (clusters_x, hi - lo, K)를 계산합니다. 도달 불가 -1.
+    """
+    clusters_x, size = block.shape[0], block.shape[1]
+    k = pos.shape[1]
+    bits = np.left_shift(np.uint64(1), np.arange(hi - lo, dtype=np.uint64))
+
+    reached = np.zeros((clusters_x, size * size), dtype=np.uint64)
+    cx_idx, k_idx = np.nonzero(valid[:, lo:hi])
+    np.bitwise_or.at(reached, (cx_idx, pos[cx_idx, k_idx + lo]), bits[k_idx])
+    reached = reached.reshape(clusters_x, size, size)
+    open_mask = np.where(block, ~np.uint64(0), np.uint64(0))
+    frontier = reached.copy()
+
+    dist = np.full((clusters_x, hi - lo, k), -1, dtype=np.int32)
+    dist[cx_idx, k_idx, k_idx + lo] = 0
+
+    level = 0
+    while True:
+        level += 1
+        grown = np.zeros_like(frontier)
+        grown[:, 1:, :] |= frontier[:, :-1, :]
+        grown[:, :-1, :] |= frontier[:, 1:, :]
+        grown[:, :, 1:] |= frontier[:, :, :-1]
+        grown[:, :, :-1] |= frontier[:, :, 1:]
+        frontier = grown & open_mask & ~reached
+        if not frontier.any():
+            break
+        reached |= frontier
+
+        # 출입구 칸에 새로 도달한 시작점 비트를 풀어서 거리 기록
+        at_nodes = np.take_along_axis(frontier.reshape(clusters_x, -1), pos, axis=1)
+        hit = (at_nodes[:, None, :] & bits[None, :, None]) != 0
+        dist[hit & valid[:, None, :] & (dist < 0)] = level
+
+    return dist
+
+
+class HierarchicalMap:
+    """
+    HPA* 추상 그래프
+
+    Attributes:
+        node_cells: 추상 노드(출입구 칸)의 cell id 배열 (정렬됨)
+        cluster_nodes: 클러스터별 노드 번호 (clusters_y, clusters_x, K), 빈 자리는 -1
+        indptr, edge_dst, edge_cost: CSR 형식의 추상 간선
+    """
+
+    def __init__(self, grid, cluster_size, node_cells, cluster_nodes, indptr, edge_dst, edge_cost):
+        self.grid = grid
+        self.cluster_size = cluster_size
+        self.node_cells = node_cells
+        self.cluster_nodes = cluster_nodes
+        self.indptr = indptr
+        self.edge_dst = edge_dst
+        self.edge_cost = edge_cost
+
+    @classmethod
+    def build(cls, grid, cluster_size=CLUSTER_SIZE):
+        """출입구를 찾고 클러스터 내부 거리를 계산하여 추상 그래프를 만듭니다."""
+        size = cluster_size
+        height, width = grid.height, grid.width
+        passable = grid.view(grid.passable)
+        clusters_y = -(-height // size)
+        clusters_x = -(-width // size)
+
+        # 1. 클러스터 경계의 출입구 찾기 (내부 좌표 기준 row, col)
+        side_a, side_b = [], []
+        for col in range(size - 1, width - 1, size):
+            rows = _border_transitions(passable[:, col] & passable[:, col + 1], size)
+            side_a.append(np.stack((rows, np.full_like(rows, col)), axis=1))
+            side_b.append(np.stack((rows, np.full_like(rows, col + 1)), axis=1))
+        for row in range(size - 1, height - 1, size):
+            cols = _border_transitions(passable[row, :] & passable[row + 1, :], size)
+            side_a.append(np.stack((np.full_like(cols, row), cols), axis=1))
+            side_b.append(np.stack((np.full_like(cols, row + 1), cols), axis=1))
+
+        empty = np.zeros((0, 2), dtype=np.int64)
+        side_a = np.concatenate(side_a) if side_a else empty
+        side_b = np.concatenate(side_b) if side_b else empty
+        to_cell = lambda rc: (rc[:, 0] + 1) * grid.stride + rc[:, 1] + 1
+        cells_a, cells_b = to_cell(side_a), to_cell(side_b)
+
+        node_cells = np.unique(np.concatenate((cells_a, cells_b)))
+        node_rows = node_cells // grid.stride - 1
+        node_cols = node_cells % grid.stride - 1
+
+        # 2. 클러스터별 노드 목록 (clusters_y, clusters_x, K)
+        cluster_key = (node_rows // size) * clusters_x + node_cols // size
+        order = np.argsort(cluster_key, kind='stable')
+        _, first, counts = np.unique(cluster_key[order], return_index=True, return_counts=True)
+        k_max = int(counts.max()) if counts.size else 0
+        rank = np.arange(order.size) - np.repeat(first, counts)
+        cluster_nodes = np.full((clusters_y * clusters_x, max(k_max, 1)), -1, dtype=np.int64)
+        cluster_nodes[cluster_key[order], rank] = order
+        cluster_nodes = cluster_nodes.reshape(clusters_y, clusters_x, -1)
+
+        # 3. 클러스터 내부 거리: 클러스터 한 줄씩, 모든 출입구에서 동시에 BFS
+        #    (칸마다 "도달한 출입구" 집합을 uint64 비트마스크로 저장, 64개씩 나누어 처리)
+        padded = np.zeros((clusters_y * size, clusters_x * size), dtype=bool)
+        padded[:height, :width] = passable
+        local_pos = (node_rows % size) * size + node_cols % size
+
+        src, dst, cost = [], [], []
+        for cy in range(clusters_y):
+            nodes = cluster_nodes[cy]
+            valid = nodes >= 0
+            k = int(valid.sum(axis=1).max())
+            if k < 2:
+                continue
+            nodes, valid = nodes[:, :k], valid[:, :k]
+            pos = np.where(valid, local_pos[np.where(valid, nodes, 0)], 0)
+            block = padded[cy * size:(cy + 1) * size].reshape(size, clusters_x, size).transpose(1, 0, 2)
+
+            dist = np.full((clusters_x, k, k), -1, dtype=np.int32)
+            for lo in range(0, k, 64):
+                hi = min(lo + 64, k)
+                dist[:, lo:hi] = _cluster_distances(block, pos, valid, lo, hi)
+
+            pair = (dist > 0) & valid[:, :, None] & valid[:, None, :]
+            cx_idx, a_idx, b_idx = np.nonzero(pair)
+            src.append(nodes[cx_idx, a_idx])
+            dst.append(nodes[cx_idx, b_idx])
+            cost.append(dist[cx_idx, a_idx, b_idx])
+
+        # 4. 클러스터 사이 간선 (비용 1, 양방향)
+        node_a = np.searchsorted(node_cells, cells_a)
+        node_b = np.searchsorted(node_cells, cells_b)
+        src += [node_a, node_b]
+        dst += [node_b, node_a]
+        cost += [np.ones(node_a.size, dtype=np.int32)] * 2
+
+        src = np.concatenate(src)
+        order = np.argsort(src, kind='stable')
+        indptr = np.searchsorted(src[order], np.arange(node_cells.size + 1))
+        edge_dst = np.concatenate(dst)[order]
+        edge_cost = np.concatenate(cost)[order].astype(np.int32)
+
+        report.info(f'HPA* 추상 그래프 생성 완료: 클러스터 {clusters_y * clusters_x}개, '
+                    f'출입구 {node_cells.size}개, 간선 {edge_dst.size}개')
+        return cls(grid, size, node_cells, cluster_nodes, indptr, edge_dst, edge_cost)
+
+    def _cluster_bounds(self, cell):
+        """cell이 속한 클러스터의 (row 시작, row 끝, col 시작, col 끝)을 패딩 좌표로 반환합니다."""
+        grid, size = self.grid, self.cluster_size
+        row, col = divmod(cell, grid.stride)
+        row_lo = (row - 1) // size * size + 1
+        col_lo = (col - 1) // size * size + 1
+        return row_lo, min(row_lo + size, grid.height + 1), col_lo, min(col_lo + size, grid.width + 1)
+
+    def cluster_of(self, cell):
+        """cell이 속한 클러스터의 출입구 노드 번호 목록을 반환합니다."""
+        row, col = divmod(cell, self.grid.stride)
+        nodes = self.cluster_nodes[(row - 1) // self.cluster_size, (col - 1) // self.cluster_size]
+        return nodes[nodes >= 0].tolist()
+
+    def local_search(self, source):
+        """source가 속한 클러스터 안에서만 BFS를 하여 (거리, 부모) 딕셔너리를 반환합니다."""
+        grid = self.grid
+        stride = grid.stride
+        passable = grid.passable
+        row_lo, row_hi, col_lo, col_hi = self._cluster_bounds(source)
+
+        dist = {source: 0}
+        parent = {source: -1}
+        queue = deque([source])
+        while queue:
+            cur = queue.popleft()
+            for offset in grid.offsets:
+                nb = cur + offset
+                if nb in dist or not passable[nb]:
+                    continue
+                row, col = divmod(nb, stride)
+                if row_lo <= row < row_hi and col_lo <= col < col_hi:
+                    dist[nb] = dist[cur] + 1
+                    parent[nb] = cur
+                    queue.append(nb)
+        return dist, parent
+
+
+def hpa_search(start_pos, target_positions, grid, hmap=None):
+    """
+    HPA* 탐색
+
+    Arguments:
+        start_pos: 시작 좌표 (x, y)
+        target_positions: 도착 후보 좌표 리스트
+        grid: 지도 격자 (map_grid.Grid)
+        hmap: 미리 만든 HierarchicalMap (없으면 새로 계산)
+
+    Returns:
+        (path, target) - bfs_shortest_path와 같은 형식
+    """
+    if hmap is None:
+        hmap = HierarchicalMap.build(grid)
+
+    start = grid.cell_id(*start_pos)
+    targets = {grid.cell_id(*pos) for pos in target_positions}
+    if start >= 0 and start in targets:
+        return [grid.coord(start)], grid.coord(start)
+
+    targets = sorted(cell for cell in targets if cell >= 0 and grid.passable[cell])
+    if start < 0 or not targets:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    node_cells = hmap.node_cells
+    num_nodes = node_cells.size
+    indptr = memoryview(hmap.indptr)
+    edge_dst = memoryview(hmap.edge_dst)
+    edge_cost = memoryview(hmap.edge_cost)
+
+    # 추상 그래프 상태 번호: 출입구 0..N-1, 목표 N + i, 시작점 -1
+    def state_cell(state):
+        if state < 0:
+            return start
+        return targets[state - num_nodes] if state >= num_nodes else int(node_cells[state])
+
+    target_x, target_y = grid.coords(targets)
+
+    def heuristic(cell):
+        x, y = grid.coord(cell)
+        return int((np.abs(target_x - x) + np.abs(target_y - y)).min())
+
+    # 목표를 자기 클러스터의 출입구와 연결
+    goal_edges = {}
+    for i, cell in enumerate(targets):
+        dist, _ = hmap.local_search(cell)
+        for node in hmap.cluster_of(cell):
+            d = dist.get(int(node_cells[node]))
+            if d is not None:
+                goal_edges.setdefault(node, []).append((num_nodes + i, d))
+
+    # 시작점을 자기 클러스터의 출입구(및 같은 클러스터의 목표)와 연결
+    # bfs_shortest_path처럼 공사장 위에서도 출발할 수 있도록, 그때는 열린 이웃 칸에서 출발
+    if grid.passable[start]:
+        sources = [(start, 0)]
+    else:
+        sources = [(nb, 1) for nb in grid.neighbors(start) if grid.passable[nb]]
+
+    start_edges = []  # (상태, 비용, 출발 칸)
+    for source, offset in sources:
+        start_dist, _ = hmap.local_search(source)
+        start_edges += [(node, offset + start_dist[int(node_cells[node])], source)
+                        for node in hmap.cluster_of(source) if int(node_cells[node]) in start_dist]
+        start_edges += [(num_nodes + i, offset + start_dist[cell], source)
+                        for i, cell in enumerate(targets) if cell in start_dist]
+    start_via = {}
+
+    gscore = {-1: 0}
+    came_from = {}
+    closed = set()
+    # f가 같으면 g가 큰 상태부터 꺼내 같은 비용의 경로들을 넓게 훑지 않도록 함
+    open_set = [(heuristic(start), 0, 0, -1)]
+    goal_state = None
+
+    track = report.instrumenting
+    max_open = 1
+    stale = 0  # 이미 확장한 상태라 버린 heap 항목 수
+
+    while open_set:
+        if track and len(open_set) > max_open:
+            max_open = len(open_set)
+        _, _, g, state = heapq.heappop(open_set)
+        if state in closed:
+            stale += 1
+            continue
+        closed.add(state)
+        if state >= num_nodes:
+            goal_state = state
+            break
+
+        if state < 0:
+            edges = start_edges
+        else:
+            edges = [(edge_dst[j], edge_cost[j], None) for j in range(indptr[state], indptr[state + 1])]
+            edges += [(nxt, cost, None) for nxt, cost in goal_edges.get(state, [])]
+
+        for nxt, cost, source in edges:
+            ng = g + cost
+            if ng < gscore.get(nxt, ng + 1):
+                gscore[nxt] = ng
+                came_from[nxt] = state
+                start_via[nxt] = source
+                heapq.heappush(open_set, (ng + heuristic(state_cell(nxt)), -ng, ng, nxt))
+
+    if track:
+        # push 수 = 꺼낸 항목 + 남은 항목, 다시 넣은 수 = push 수 - 한 번이라도 넣은 상태 수(gscore)
+        pushes = len(closed) + stale + len(open_set)
+        report.search('hpa', expanded=len(closed), pushes=pushes, re_pushes=pushes - len(gscore),
+                      stale_pops=stale, max_open=max_open)
+
+    if goal_state is None:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    abstract = [goal_state]
+    while abstract[-1] != -1:
+        abstract.append(came_from[abstract[-1]])
+    abstract.reverse()
+    source = start_via[abstract[1]]
+    abstract = [state_cell(state) for state in abstract]
+    if source != start:
+        abstract.insert(1, source)
+
+    # 추상 경로가 지나는 클러스터 안에서만 실제 경로로 다듬기
+    path = [abstract[0]]
+    for a, b in zip(abstract, abstract[1:]):
+        if b - a in grid.offsets:
+            path.append(b)
+            continue
+        _, parent = hmap.local_search(a)
+        segment = []
+        node = b
+        while node != a:
+            segment.append(node)
+            node = parent[node]
+        path.extend(reversed(segment))
+
+    report.info(f'경로 발견! 길이: {len(path)} 단계 (추상 노드 {len(closed)}개 확장)')
+    return [grid.coord(cell) for cell in path], grid.coord(path[-1])
@@ -0,0 +1,220 @@
+"""
+Jump Point Search (4방향 격자)
+
+이동 비용이 모두 같은 4방향 격자에서 "가로 이동을 먼저 한다"는 정규 순서를 정해 대칭 경로를 잘라내고,
+직선으로 건너뛸 수 있는 칸은 열린 목록에 넣지 않고 다음 점프 지점까지 한 번에 이동합니다.
+
+점프 거리는 지도마다 한 번만 NumPy로 미리 계산해 두므로(JumpTable),
+탐색 중 한 번의 점프는 표 조회와 목표 지점 확인만으로 끝납니다.
+"""
+
+import heapq
+
+import numpy as np
+
+from map_report import report
+
+
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3  # Grid.offsets 순서
+
+
+def _sweep(passable, stop, dtype):
+    """
+    axis 0 증가 방향으로 이동할 때 각 칸의 (벽 전까지 이동 가능한 칸 수, 첫 점프 지점까지 칸 수)를 계산합니다.
+    점프 지점보다 벽을 먼저 만나면 점프 거리는 0 입니다.
+    """
+    run = np.zeros(passable.shape, dtype=dtype)
+    jump = np.zeros(passable.shape, dtype=dtype)
+    for i in range(passable.shape[0] - 2, -1, -1):
+        nxt = passable[i + 1]
+        run[i] = np.where(nxt, run[i + 1] + 1, 0)
+        jump[i] = np.where(nxt & stop[i + 1], 1, np.where(nxt & (jump[i + 1] > 0), jump[i + 1] + 1, 0))
+    return run, jump
+
+
+class JumpTable:
+    """
+    지도별 점프 거리 표
+
+    Attributes:
+        run: 방향별로 벽(공사장, 지도 밖) 전까지 이동 가능한 칸 수
+        jump: 방향별로 첫 점프 지점까지의 칸 수 (없으면 0)
+    """
+
+    def __init__(self, grid, run, jump):
+        self.grid = grid
+        self.run = run
+        self.jump = jump
+
+    @classmethod
+    def build(cls, grid):
+        """Grid로부터 네 방향의 점프 거리 표를 만듭니다."""
+        rows, cols = grid.height + 2, grid.stride
+        dtype = np.int16 if max(rows, cols) < np.iinfo(np.int16).max else np.int32
+        p = grid.passable.reshape(rows, cols)
+
+        # 세로 이동 중 강제 이웃: 옆 칸은 열려 있는데 직전 칸의 옆은 막힌 경우
+        # (가로 우선 순서에서는 그 옆 칸에 더 일찍 도달할 방법이 없음)
+        forced_down = np.zeros_like(p)
+        forced_up = np.zeros_like(p)
+        side_l, side_r = p[1:-1, :-2], p[1:-1, 2:]
+        forced_down[1:-1, 1:-1] = p[1:-1, 1:-1] & (
+            (side_l & ~p[:-2, :-2]) | (side_r & ~p[:-2, 2:]))
+        forced_up[1:-1, 1:-1] = p[1:-1, 1:-1] & (
+            (side_l & ~p[2:, :-2]) | (side_r & ~p[2:, 2:]))
+
+        run_down, jump_down = _sweep(p, forced_down, dtype)
+        run_up, jump_up = _sweep(p[::-1], forced_up[::-1], dtype)
+        run_up, jump_up = run_up[::-1], jump_up[::-1]
+
+        # 가로 이동은 그 칸에서 세로로 점프 지점을 찾을 수 있으면 멈춤
+        stop_h = p & ((jump_up > 0) | (jump_down > 0))
+        run_right, jump_right = _sweep(p.T, stop_h.T, dtype)
+        run_left, jump_left = _sweep(p.T[::-1], stop_h.T[::-1], dtype)
+        run_right, jump_right = run_right.T, jump_right.T
+        run_left, jump_left = run_left[::-1].T, jump_left[::-1].T
+
+        run = [np.ascontiguousarray(a).ravel() for a in (run_up, run_down, run_left, run_right)]
+        jump = [np.ascontiguousarray(a).ravel() for a in (jump_up, jump_down, jump_left, jump_right)]
+        return cls(grid, run, jump)
+
+
+def jump_point_search(start_pos, target_positions, grid, table=None):
+    """
+    Jump Point Search
+
+    Arguments:
+        start_pos: 시작 좌표 (x, y)
+        target_positions: 도착 후보 좌표 리스트
+        grid: 지도 격자 (map_grid.Grid)
+        table: 미리 만든 JumpTable (없으면 새로 계산)
+
+    Returns:
+        (path, target) - bfs_shortest_path와 같은 형식
+    """
+    if table is None:
+        table = JumpTable.build(grid)
+
+    start = grid.cell_id(*start_pos)
+    targets = {grid.cell_id(*pos) for pos in target_positions}
+    if start >= 0 and start in targets:
+        return [grid.coord(start)], grid.coord(start)
+
+    # 공사장이나 지도 밖의 목표에는 도달할 수 없음
+    targets = {cell for cell in targets if cell >= 0 and grid.passable[cell]}
+    if start < 0 or not targets:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    offsets = grid.offsets
+    stride = grid.stride
+    passable = memoryview(grid.passable.view(np.uint8))
+    runs = [memoryview(a) for a in table.run]
+    jumps = [memoryview(a) for a in table.jump]
+
+    # 세로 점프는 목표 칸에서, 가로 점프는 목표가 있는 세로 구간의 칸에서 멈춤
+    target_cells = np.zeros(grid.size, dtype=bool)
+    target_columns = np.zeros(grid.size, dtype=bool)
+    for cell in targets:
+        target_cells[cell] = True
+        top = cell - int(table.run[UP][cell]) * stride
+        bottom = cell + int(table.run[DOWN][cell]) * stride
+        target_columns[top:bottom + 1:stride] = True
+    stop_marks = (target_cells, target_cells, target_columns, target_columns)
+
+    target_x = np.array([grid.coord(cell)[0] for cell in targets])
+    target_y = np.array([grid.coord(cell)[1] for cell in targets])
+
+    def heuristic(cell):
+        x, y = grid.coord(cell)
+        return int((np.abs(target_x - x) + np.abs(target_y - y)).min())
+
+    def jump(cell, direction):
+        """cell에서 direction으로 점프하여 (다음 점프 지점, 이동 칸 수)를 반환합니다. 없으면 (-1, 0)."""
+        step = jumps[direction][cell]
+        limit = step if step else runs[direction][cell]
+        if limit:
+            offset = offsets[direction]
+            marks = stop_marks[direction][cell + offset:cell + offset * (limit + 1):offset]
+            hit = int(marks.argmax())
+            if marks[hit]:
+                return cell + offset * (hit + 1), hit + 1
+        if step:
+            return cell + offsets[direction] * step, step
+        return -1, 0
+
+    def successors(cell, arrived):
+        """가로 우선 정규 순서에 따라 확장할 방향을 반환합니다."""
+        if arrived < 0:
+            return (UP, DOWN, LEFT, RIGHT)
+        if arrived in (LEFT, RIGHT):
+            return (arrived, UP, DOWN)
+        directions = [arrived]
+        behind = cell - offsets[arrived]
+        for side in (LEFT, RIGHT):
+            if passable[cell + offsets[side]] and not passable[behind + offsets[side]]:
+                directions.append(side)
+        return directions
+
+    # 같은 칸이라도 도착 방향에 따라 확장 방향이 다르므로 (칸, 방향)을 상태로 사용
+    start_state = (start, -1)
+    # f가 같으면 더 멀리 온(g가 큰) 상태를 먼저 꺼내 같은 비용의 경로들을 넓게 훑지 않도록 함
+    open_set = [(heuristic(start), 0, 0, start_state)]
+    gscore = {start_state: 0}
+    came_from = {}
+    closed = set()
+    goal_state = None
+
+    track = report.instrumenting
+    max_open = 1
+    stale = 0  # 이미 확장한 상태라 버린 heap 항목 수
+
+    while open_set:
+        if track and len(open_set) > max_open:
+            max_open = len(open_set)
+        _, _, g, state = heapq.heappop(open_set)
+        if state in closed:
+            stale += 1
+            continue
+        closed.add(state)
+        cell, arrived = state
+        if cell in targets:
+            goal_state = state
+            break
+
+        for direction in successors(cell, arrived):
+            nxt, steps = jump(cell, direction)
+            if nxt < 0:
+                continue
+            nxt_state = (nxt, direction)
+            ng = g + steps
+            if ng < gscore.get(nxt_state, ng + 1):
+                gscore[nxt_state] = ng
+                came_from[nxt_state] = state
+                heapq.heappush(open_set, (ng + heuristic(nxt), -ng, ng, nxt_state))
+
+    if track:
+        # push 수 = 꺼낸 항목 + 남은 항목, 다시 넣은 수 = push 수 - 한 번이라도 넣은 상태 수(gscore)
+        pushes = len(closed) + stale + len(open_set)
+        report.search('jps', expanded=len(closed), pushes=pushes, re_pushes=pushes - len(gscore),
+                      stale_pops=stale, max_open=max_open)
+
+    if goal_state is None:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    # 점프 지점 사이의 직선 구간을 채워 경로 복원
+    path = [goal_state[0]]
+    state = goal_state
+    while state != start_state:
+        prev = came_from[state]
+        offset = offsets[state[1]]
+        cell = state[0]
+        while cell != prev[0]:
+            cell -= offset
+            path.append(cell)
+        state = prev
+    path.reverse()
+
+    report.info(f'최단 경로 발견! 길이: {len(path)} 단계 (점프 지점 {len(closed)}개 확장)')
+    return [grid.coord(cell) for cell in path], grid.coord(goal_state[0])
@@ -0,0 +1,92 @@
+"""
+Stage 1 입력/출력 매니페스트
+
+Stage 1이 읽은 입력 파일과 만든 출력 파일의 크기, 수정 시각, 내용 해시를 JSON으로 기록합니다.
+다음 실행에서 기록과 비교하여 바뀐 파일이 없으면 병합 작업을 건너뛸 수 있습니다.
+크기와 수정 시각이 그대로면 해시를 다시 계산하지 않고, 둘 중 하나가 바뀐 경우에만
+내용 해시를 비교하므로 파일을 건드리기만 한 경우(touch)도 변경 없음으로 판단합니다.
+"""
+
+import hashlib
+import json
+import os
+
+from map_report import report
+
+
+MANIFEST_PATH = 'data/stage1_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_hash(path, block_size=1 << 20):
+    """파일 내용의 blake2b 해시를 반환합니다."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_entry(path, previous=None):
+    """
+    파일의 매니페스트 항목(size, mtime_ns, hash)을 만듭니다.
+
+    previous의 크기와 수정 시각이 같으면 그 해시를 재사용합니다.
+    """
+    stat = os.stat(path)
+    if previous and previous.get('size') == stat.st_size and previous.get('mtime_ns') == stat.st_mtime_ns:
+        content_hash = previous['hash']
+    else:
+        content_hash = file_hash(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': content_hash}
+
+
+def is_unchanged(path, entry):
+    """파일 내용이 매니페스트 항목과 같은지 확인합니다. (파일이 없거나 기록이 없으면 False)"""
+    if not entry or not os.path.exists(path):
+        return False
+    stat = os.stat(path)
+    if stat.st_size != entry.get('size'):
+        return False
+    if stat.st_mtime_ns == entry.get('mtime_ns'):
+        return True
+    return file_hash(path) == entry.get('hash')
+
+
+def changed_files(section, paths):
+    """section(경로 -> 항목)의 기록과 내용이 다른 파일들의 리스트를 반환합니다."""
+    return [path for path in paths if not is_unchanged(path, section.get(path))]
+
+
+def record_files(paths, previous=None):
+    """paths의 현재 상태를 경로 -> 항목 딕셔너리로 기록합니다."""
+    previous = previous or {}
+    return {path: file_entry(path, previous.get(path)) for path in paths}
+
+
+def load_manifest(path=MANIFEST_PATH):
+    """매니페스트를 읽습니다. 없거나 형식이 맞지 않으면 None을 반환합니다."""
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        report.warn(f'경고: 매니페스트를 읽을 수 없어 무시합니다: {e}')
+        return None
+
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return None
+    manifest.setdefault('inputs', {})
+    manifest.setdefault('outputs', {})
+    return manifest
+
+
+def save_manifest(inputs, outputs, path=MANIFEST_PATH):
+    """입력/출력 기록을 매니페스트 파일로 저장합니다."""
+    manifest = {'version': MANIFEST_VERSION, 'inputs': inputs, 'outputs': outputs}
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return manifest
@@ -0,0 +1,199 @@
+"""
+경로 파일 읽기/쓰기
+
+경로(좌표 리스트)를 하나씩 이어 쓰는 스트리밍 writer와 그 reader입니다. 형식은 파일 확장자로 정합니다.
+
+    .csv - 지금의 step,x,y,type CSV (경로가 여러 개이면 step이 1부터 다시 시작, 중간 경유지는 type이 Stop)
+    .rle - 한 줄에 경로 하나: "x y 이동" - 이동은 R(x+1), L(x-1), D(y+1), U(y-1)과 반복 횟수
+           예) 14 2 DL11D2 = (14, 2)에서 아래로 1칸, 왼쪽으로 11칸, 아래로 2칸
+    .bin - 파일 머리(BIN_MAGIC) 뒤에 경로마다 little-endian int32 [칸 수, x0, y0, x1, y1, ...]
+
+rle/bin은 CSV보다 작고 빠르며, read_paths로 읽은 경로를 csv로 다시 쓰면 원래 CSV와 같은 내용이 됩니다.
+(경유지 표시는 csv에만 저장되므로 여러 곳을 들르는 tour 경로는 Stop 대신 Path로 복원됩니다.)
+"""
+
+import argparse
+import csv
+import os
+import re
+import sys
+
+import numpy as np
+
+
+PATH_FORMATS = ('csv', 'rle', 'bin')
+CSV_FIELDS = ('step', 'x', 'y', 'type')
+BIN_MAGIC = b'CAFPATH1'
+MOVES = {(1, 0): 'R', (-1, 0): 'L', (0, 1): 'D', (0, -1): 'U'}
+STEPS = {letter: delta for delta, letter in MOVES.items()}
+_RUN = re.compile(r'([RLDU])(\d*)')
+
+
+def path_format(filename):
+    """파일 확장자로 경로 파일 형식을 정합니다."""
+    fmt = os.path.splitext(filename)[1].lstrip('.').lower()
+    if fmt not in PATH_FORMATS:
+        raise ValueError(f'지원하지 않는 경로 파일 형식입니다: {filename} ({", ".join(PATH_FORMATS)} 중 하나)')
+    return fmt
+
+
+def encode_moves(path):
+    """경로를 이동 문자열(RLE)로 바꿉니다. 한 번에 한 칸씩 상하좌우로 움직이는 경로여야 합니다."""
+    runs = []
+    letter, count = None, 0
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        move = MOVES.get((x1 - x0, y1 - y0))
+        if move is None:
+            raise ValueError(f'상하좌우 한 칸 이동이 아닙니다: {(x0, y0)} -> {(x1, y1)}')
+        if move == letter:
+            count += 1
+            continue
+        if letter:
+            runs.append(letter + (str(count) if count > 1 else ''))
+        letter, count = move, 1
+    if letter:
+        runs.append(letter + (str(count) if count > 1 else ''))
+    return ''.join(runs)
+
+
+def decode_moves(start, moves):
+    """encode_moves의 반대 - 시작 좌표와 이동 문자열로 경로를 복원합니다."""
+    x, y = start
+    path = [(x, y)]
+    end = 0
+    for match in _RUN.finditer(moves):
+        if match.start() != end:
+            break
+        end = match.end()
+        dx, dy = STEPS[match.group(1)]
+        for _ in range(int(match.group(2) or 1)):
+            x += dx
+            y += dy
+            path.append((x, y))
+    if end != len(moves):
+        raise ValueError(f'이동 문자열 형식이 올바르지 않습니다: {moves}')
+    return path
+
+
+def path_rows(path, stops=()):
+    """경로의 CSV 행 (step, x, y, type)을 하나씩 돌려주는 generator (stops: 중간 경유지의 path 인덱스 - type이 Stop)"""
+    last = len(path) - 1
+    stops = set(stops)
+    for i, (x, y) in enumerate(path):
+        yield i + 1, x, y, 'Start' if i == 0 else 'End' if i == last else 'Stop' if i in stops else 'Path'
+
+
+class PathWriter:
+    """
+    경로를 하나씩 파일에 이어 씁니다. (with 문으로 사용)
+
+    경로를 모두 메모리에 모으지 않으므로 경로가 아주 많거나 길어도 메모리 사용량이 일정합니다.
+    """
+
+    def __init__(self, filename, fmt=None):
+        self.filename = filename
+        self.format = fmt or path_format(filename)
+        self.count = 0
+        if self.format == 'csv':
+            # 기존 save_path와 같이 BOM이 있는 UTF-8, 줄바꿈 \n
+            self._file = open(filename, 'w', newline='', encoding='utf-8-sig')
+            self._csv = csv.writer(self._file, lineterminator='\n')
+            self._csv.writerow(CSV_FIELDS)
+        elif self.format == 'rle':
+            self._file = open(filename, 'w', encoding='utf-8')
+        else:
+            self._file = open(filename, 'wb')
+            self._file.write(BIN_MAGIC)
+
+    def write(self, path, stops=()):
+        """
+        경로 하나를 씁니다. (stops: 중간 경유지의 path 인덱스 - csv에서 type이 Stop)
+
+        빈 경로는 어느 형식으로도 다시 읽을 수 없으므로 ValueError를 발생시킵니다.
+        """
+        if not len(path):
+            raise ValueError(f'빈 경로는 "{self.filename}"에 쓸 수 없습니다.')
+        if self.format == 'csv':
+            self._csv.writerows(path_rows(path, stops))
+        elif self.format == 'rle':
+            x, y = path[0]
+            self._file.write(f'{x} {y} {encode_moves(path)}\n')
+        else:
+            values = np.empty(1 + 2 * len(path), dtype='<i4')
+            values[0] = len(path)
+            values[1:] = np.asarray(path, dtype='<i4').ravel()
+            self._file.write(values.tobytes())
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_paths(filename, paths, fmt=None):
+    """
+    경로들을 파일 하나에 씁니다.
+
+    Returns:
+        쓴 경로 수
+    """
+    with PathWriter(filename, fmt) as writer:
+        for path in paths:
+            writer.write(path)
+    return writer.count
+
+
+def read_paths(filename, fmt=None):
+    """경로 파일의 경로들을 좌표 튜플 리스트로 하나씩 돌려주는 generator"""
+    fmt = fmt or path_format(filename)
+
+    if fmt == 'csv':
+        with open(filename, newline='', encoding='utf-8-sig') as f:
+            path = []
+            for row in csv.DictReader(f):
+                if row['step'] == '1' and path:
+                    yield path
+                    path = []
+                path.append((int(row['x']), int(row['y'])))
+            if path:
+                yield path
+
+    elif fmt == 'rle':
+        with open(filename, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    x, y, *moves = line.split()
+                    yield decode_moves((int(x), int(y)), moves[0] if moves else '')
+
+    else:
+        with open(filename, 'rb') as f:
+            if f.read(len(BIN_MAGIC)) != BIN_MAGIC:
+                raise ValueError(f'경로 파일 "{filename}"의 형식이 올바르지 않습니다.')
+            values = np.fromfile(f, dtype='<i4')
+        i = 0
+        while i < len(values):
+            count = int(values[i])
+            coords = values[i + 1:i + 1 + 2 * count]
+            if count < 1 or len(coords) != 2 * count:
+                raise ValueError(f'경로 파일 "{filename}"이(가) 손상되었습니다.')
+            yield list(zip(coords[0::2].tolist(), coords[1::2].tolist()))
+            i += 1 + 2 * count
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='경로 파일 형식 변환 (csv, rle, bin)')
+    parser.add_argument('source', help='읽을 경로 파일 (예: home_to_cafe.rle)')
+    parser.add_argument('target', help='쓸 경로 파일 (예: home_to_cafe.csv)')
+    args = parser.parse_args()
+
+    try:
+        count = write_paths(args.target, read_paths(args.source))
+        print(f'경로 {count}개를 {args.target} 파일로 저장했습니다.')
+    except (OSError, ValueError) as e:
+        print(f'오류: {e}')
+        sys.exit(1)
@@ -0,0 +1,375 @@
+"""
+래스터 지도 렌더러 (matplotlib 없이 NumPy 배열 -> PNG)
+
+칸 종류(빈 칸, 공사장, 아파트, 빌딩, 반달곰 커피, 내 집)마다 한 칸 크기의 그림(sprite)을
+한 번만 그려 두고, 지도 전체는 칸 종류 배열로 sprite 표를 색인하여 한 번에 만듭니다.
+그리기 시간은 칸 수에 거의 비례하며, 결과는 Pillow로 PNG로 저장합니다.
+
+색상과 모양, 선 굵기는 map_draw의 matplotlib 그림(칸당 0.8인치)과 같은 비율을 사용합니다.
+구조물은 격자선 교차점(정수 좌표)에 그려지므로, 한 칸 크기의 블록을 교차점마다 배치한 뒤
+가장자리를 반 칸씩 잘라 matplotlib 축 범위(x_min - 1 ~ x_max + 1)와 맞춥니다.
+"""
+
+import numpy as np
+
+from map_grid import STRUCT_CODES
+
+# Pillow는 실제로 그림을 만들 때 함수 안에서 import (경로만 찾는 Stage 3 실행의 시작 시간을 줄임)
+
+
+# draw_structures: 칸마다 patch 하나 / draw_structures_batched: 구조물 종류마다 collection 하나
+# raster: matplotlib 없이 map_raster로 NumPy 배열을 바로 PNG로 저장 (제목/축 눈금 없음)
+# (matplotlib을 import하지 않고도 옵션 목록을 쓸 수 있도록 여기에 둠)
+RENDERERS = ('patches', 'collection', 'raster')
+
+PIXELS_PER_CELL = 32
+MAX_IMAGE_SIDE = 8192  # 큰 지도에서 칸당 픽셀 수를 줄여 이미지 한 변을 이 값 이하로 유지
+SUPERSAMPLE = 4  # sprite 가장자리 안티앨리어싱용 배율
+POINTS_PER_CELL = 0.8 * 72  # matplotlib 그림에서 한 칸 = 0.8인치
+
+# add_legend와 같은 색상 (matplotlib 색 이름의 RGB 값)
+COLORS = {
+    'white': (255, 255, 255),
+    'grid': (33, 37, 41),  # '#212529'
+    'gray': (128, 128, 128),
+    'darkgray': (169, 169, 169),
+    'saddlebrown': (139, 69, 19),
+    'apartment_edge': (128, 0, 0),  # '#800000'
+    'building_edge': (0, 52, 88),  # '#003458'
+    'green': (0, 128, 0),
+    'darkgreen': (0, 100, 0),
+    'limegreen': (50, 205, 50),
+    'red': (255, 0, 0),
+    'darkred': (139, 0, 0),
+    'blue': (0, 0, 255),
+    'darkblue': (0, 0, 139),
+    'orange': (255, 165, 0),
+    'darkorange': (255, 140, 0),
+    'black': (0, 0, 0),
+}
+
+# sprite 번호
+EMPTY, CONSTRUCTION, APARTMENT, BUILDING, CAFE, HOME, BORDER_H, BORDER_V, BORDER_CORNER = range(9)
+
+
+def _points(value):
+    """matplotlib 포인트 단위 굵기를 칸 단위로 변환"""
+    return value / POINTS_PER_CELL
+
+
+def _blend(canvas, mask, color, alpha):
+    """canvas(float RGB)의 mask 부분에 color를 alpha로 덮어 그립니다."""
+    weight = mask[..., None] * alpha
+    canvas *= 1 - weight
+    canvas += weight * np.asarray(color, dtype=float)
+
+
+def _segment_distance(u, v, a, b):
+    """점 (u, v)와 선분 ab 사이의 거리"""
+    (ax, ay), (bx, by) = a, b
+    dx, dy = bx - ax, by - ay
+    t = np.clip(((u - ax) * dx + (v - ay) * dy) / (dx * dx + dy * dy), 0, 1)
+    return np.hypot(u - (ax + t * dx), v - (ay + t * dy))
+
+
+def _polygon_masks(u, v, vertices, edge_width):
+    """볼록 다각형의 (채움, 테두리) 마스크"""
+    inside = np.ones(u.shape, dtype=bool)
+    distance = np.full(u.shape, np.inf)
+    count = len(vertices)
+    # 꼭짓점 순서와 관계없이 쓰도록 넓이 부호로 안쪽 방향을 정함
+    area = sum(vertices[i][0] * vertices[(i + 1) % count][1] - vertices[(i + 1) % count][0] * vertices[i][1]
+               for i in range(count))
+    for i in range(count):
+        a, b = vertices[i], vertices[(i + 1) % count]
+        cross = (b[0] - a[0]) * (v - a[1]) - (b[1] - a[1]) * (u - a[0])
+        inside &= cross * area >= 0
+        distance = np.minimum(distance, _segment_distance(u, v, a, b))
+    return inside, distance <= edge_width / 2
+
+
+def build_sprites(size):
+    """칸 종류별 size x size RGB sprite 표 (9, size, size, 3)를 만듭니다."""
+    fine = size * SUPERSAMPLE
+    # 블록 중심(격자선 교차점)이 0인 칸 단위 좌표
+    coords = (np.arange(fine) + 0.5) / fine - 0.5
+    u, v = np.meshgrid(coords, coords)
+
+    grid_half = _points(1.5) / 2  # matplotlib 기본 선 굵기 1.5pt
+    vertical = np.abs(u) <= grid_half
+    horizontal = np.abs(v) <= grid_half
+
+    sprites = []
+    for kind in range(9):
+        canvas = np.empty((fine, fine, 3))
+        canvas[:] = COLORS['white']
+
+        # 격자선 (구조물보다 아래, 지도 바깥 테두리 블록에는 한 방향 선만 지나감)
+        lines = np.zeros(u.shape, dtype=bool)
+        if kind not in (BORDER_H, BORDER_CORNER):
+            lines |= vertical
+        if kind not in (BORDER_V, BORDER_CORNER):
+            lines |= horizontal
+        _blend(canvas, lines, COLORS['grid'], 0.8)
+
+        if kind == CONSTRUCTION:
+            _blend(canvas, np.ones(u.shape, dtype=bool), COLORS['gray'], 0.8)
+        elif kind in (APARTMENT, BUILDING):
+            radius = np.hypot(u, v)
+            edge = COLORS['apartment_edge'] if kind == APARTMENT else COLORS['building_edge']
+            _blend(canvas, radius <= 0.4, COLORS['saddlebrown'], 1.0)
+            _blend(canvas, np.abs(radius - 0.4) <= _points(5) / 2, edge, 1.0)
+        elif kind == CAFE:
+            fill, stroke = _polygon_masks(u, v, [(-0.4, -0.4), (0.4, -0.4), (0.4, 0.4), (-0.4, 0.4)], _points(3))
+            _blend(canvas, fill, COLORS['green'], 0.9)
+            _blend(canvas, stroke, COLORS['darkgreen'], 0.9)
+        elif kind == HOME:
+            fill, stroke = _polygon_masks(u, v, [(0, -0.35), (-0.35, 0.3), (0.35, 0.3)], _points(3))
+            _blend(canvas, fill, COLORS['green'], 0.9)
+            _blend(canvas, stroke, COLORS['darkgreen'], 0.9)
+
+        # SUPERSAMPLE x SUPERSAMPLE 블록 평균으로 축소
+        sprite = canvas.reshape(size, SUPERSAMPLE, size, SUPERSAMPLE, 3).mean(axis=(1, 3))
+        sprites.append(np.round(sprite).astype(np.uint8))
+
+    return np.stack(sprites)
+
+
+def cell_kinds(grid):
+    """Grid의 각 칸(테두리 포함)을 sprite 번호로 나타낸 (height + 2, width + 2) 배열"""
+    kinds = np.full(grid.size, EMPTY, dtype=np.uint8)
+    for kind, name in ((APARTMENT, 'Apartment'), (BUILDING, 'Building'),
+                       (CAFE, 'BandalgomCoffee'), (HOME, 'MyHome')):
+        kinds[grid.struct == STRUCT_CODES[name]] = kind
+    kinds[grid.construction] = CONSTRUCTION
+
+    kinds = kinds.reshape(grid.height + 2, grid.stride)
+    kinds[[0, -1], :] = BORDER_V
+    kinds[:, [0, -1]] = BORDER_H
+    kinds[[0, 0, -1, -1], [0, -1, 0, -1]] = BORDER_CORNER
+    return kinds
+
+
+def count_structures(grid):
+    """draw_structures와 같은 구조물 종류별 개수 (공사장 칸의 구조물은 세지 않음)"""
+    struct = grid.struct[~grid.construction]
+    counts = {name: int(np.count_nonzero(struct == STRUCT_CODES[name]))
+              for name in ('Apartment', 'Building', 'BandalgomCoffee', 'MyHome')}
+    counts['ConstructionSite'] = int(np.count_nonzero(grid.construction))
+    return counts
+
+
+def default_pixels_per_cell(grid):
+    """이미지 한 변이 MAX_IMAGE_SIDE를 넘지 않는 칸당 픽셀 수 (4 ~ PIXELS_PER_CELL 사이의 짝수)"""
+    cells = max(grid.width, grid.height) + 1
+    return max(4, min(PIXELS_PER_CELL, MAX_IMAGE_SIDE // cells // 2 * 2))
+
+
+def render_map(grid, pixels_per_cell=None):
+    """
+    지도를 RGB 배열로 그립니다. (pixels_per_cell이 None이면 지도 크기에 맞춰 정함)
+
+    Returns:
+        (height + 1) * pixels_per_cell x (width + 1) * pixels_per_cell x 3 uint8 배열
+    """
+    if pixels_per_cell is None:
+        pixels_per_cell = default_pixels_per_cell(grid)
+    if pixels_per_cell < 4 or pixels_per_cell % 2:
+        raise ValueError(f'pixels_per_cell은 4 이상의 짝수여야 합니다: {pixels_per_cell}')
+
+    kinds = cell_kinds(grid)
+    rows, cols = kinds.shape
+    size = pixels_per_cell
+    return render_window(kinds, build_sprites(size), 0, 0, (rows - 1) * size, (cols - 1) * size)
+
+
+def render_window(kinds, sprites, top, left, height, width):
+    """
+    render_map 이미지 중 (top, left)에서 시작하는 height x width 부분만 그립니다.
+
+    전체 이미지를 만들지 않고 창에 걸치는 칸들의 sprite만 이어 붙이며, 지도 밖은 흰색으로 채웁니다.
+    """
+    size = sprites.shape[1]
+    half = size // 2
+    rows, cols = kinds.shape
+    window = np.empty((height, width, 3), dtype=np.uint8)
+    window[:] = COLORS['white']
+
+    # 지도 이미지 범위로 자른 창 (잘라내기 전 sprite 배치 기준 좌표)
+    r0, r1 = max(top, 0) + half, min(top + height, (rows - 1) * size) + half
+    c0, c1 = max(left, 0) + half, min(left + width, (cols - 1) * size) + half
+    if r0 >= r1 or c0 >= c1:
+        return window
+
+    b0, b1 = r0 // size, (r1 - 1) // size + 1
+    k0, k1 = c0 // size, (c1 - 1) // size + 1
+    block = kinds[b0:b1, k0:k1]
+    # (rows, cols, size, size, 3) -> (rows * size, cols * size, 3)
+    image = sprites[block].transpose(0, 2, 1, 3, 4).reshape(block.shape[0] * size, block.shape[1] * size, 3)
+    dr, dc = r0 - half - top, c0 - half - left
+    window[dr:dr + r1 - r0, dc:dc + c1 - c0] = image[r0 - b0 * size:r1 - b0 * size, c0 - k0 * size:c1 - k0 * size]
+    return window
+
+
+def pixel_center(grid, pos, pixels_per_cell=PIXELS_PER_CELL):
+    """좌표 (x, y)의 이미지 픽셀 위치 (col, row)"""
+    x, y = pos
+    return (int(x) - grid.x_min + 1) * pixels_per_cell, (int(y) - grid.y_min + 1) * pixels_per_cell
+
+
+def _disc(image, center, diameter, face, edge, edge_width, alpha):
+    """image에 원형 마커를 그립니다. (지름과 테두리 굵기는 픽셀 단위)"""
+    col, row = center
+    reach = int(np.ceil(diameter / 2 + edge_width)) + 1
+    top, left = max(row - reach, 0), max(col - reach, 0)
+    bottom, right = min(row + reach + 1, image.shape[0]), min(col + reach + 1, image.shape[1])
+    if top >= bottom or left >= right:
+        return
+    v, u = np.mgrid[top:bottom, left:right]
+    radius = np.hypot(u - col, v - row)
+    window = image[top:bottom, left:right].astype(float)
+    _blend(window, radius <= diameter / 2, face, alpha)
+    _blend(window, np.abs(radius - diameter / 2) <= edge_width / 2, edge, alpha)
+    image[top:bottom, left:right] = np.round(window).astype(np.uint8)
+
+
+def draw_path(image, grid, path, pixels_per_cell=PIXELS_PER_CELL):
+    """
+    visualize_path_on_map과 같은 모양으로 경로(빨간 선 + 마커)와 시작/끝 점을 그립니다.
+
+    선은 각 경로 점 주변 한 칸 크기 창 안에서 이전/다음 점 쪽 반 구간씩만 그리므로,
+    창들이 겹치지 않아 같은 픽셀에 두 번 덧칠되지 않습니다.
+    """
+    if not path:
+        return image
+
+    size = pixels_per_cell
+    half_width = _points(6) * size / 2
+    centers = [pixel_center(grid, pos, size) for pos in path]
+    height, width = image.shape[:2]
+
+    for i, (col, row) in enumerate(centers):
+        top, left = max(row - size // 2, 0), max(col - size // 2, 0)
+        bottom, right = min(row + size // 2, height), min(col + size // 2, width)
+        if top >= bottom or left >= right:
+            continue
+        v, u = np.mgrid[top:bottom, left:right]
+        mask = np.hypot(u - col, v - row) <= half_width if len(centers) == 1 else np.zeros(u.shape, dtype=bool)
+        for j in (i - 1, i + 1):
+            if 0 <= j < len(centers):
+                other_col, other_row = centers[j]
+                mid = ((col + other_col) / 2, (row + other_row) / 2)
+                mask |= _segment_distance(u, v, (col, row), mid) <= half_width
+        window = image[top:bottom, left:right].astype(float)
+        _blend(window, mask, COLORS['red'], 0.8)
+        image[top:bottom, left:right] = np.round(window).astype(np.uint8)
+
+    # 경로 위의 마커, 그 위에 시작/끝 점
+    for center in centers:
+        _disc(image, center, _points(10) * size, COLORS['red'], COLORS['darkred'], _points(1) * size, 0.8)
+    _disc(image, centers[0], _points(8) * size, COLORS['blue'], COLORS['darkblue'], _points(1) * size, 1.0)
+    _disc(image, centers[-1], _points(8) * size, COLORS['orange'], COLORS['darkorange'], _points(1) * size, 1.0)
+    return image
+
+
+def _font(size):
+    from PIL import ImageFont
+
+    try:
+        return ImageFont.load_default(size=size)
+    except (TypeError, OSError):
+        return ImageFont.load_default()
+
+
+def draw_legend(image, entries):
+    """
+    왼쪽 위에 범례를 그립니다.
+
+    entries: (모양, 채움 색, 테두리 색, 이름) 리스트 - 모양은 'circle', 'square', 'triangle', 'line'
+    """
+    from PIL import Image, ImageDraw
+
+    canvas = Image.fromarray(image)
+    draw = ImageDraw.Draw(canvas)
+    font_size = max(10, min(image.shape[:2]) // 60)
+    font = _font(font_size)
+    swatch = font_size
+    padding = font_size // 2
+    line_height = swatch + padding
+
+    label_width = max(draw.textlength(label, font=font) for *_, label in entries)
+    box = (padding, padding, padding * 4 + swatch + int(label_width), padding * 2 + line_height * len(entries))
+    draw.rectangle(box, fill=COLORS['white'], outline=COLORS['darkgray'])
+
+    for i, (shape, face, edge, label) in enumerate(entries):
+        left = padding * 2
+        top = padding * 2 + i * line_height
+        rect = (left, top, left + swatch, top + swatch)
+        if shape == 'circle':
+            draw.ellipse(rect, fill=face, outline=edge, width=2)
+        elif shape == 'triangle':
+            draw.polygon([(left + swatch / 2, top), (left, top + swatch), (left + swatch, top + swatch)],
+                         fill=face, outline=edge)
+        elif shape == 'line':
+            draw.line((left, top + swatch / 2, left + swatch, top + swatch / 2), fill=face, width=max(2, swatch // 4))
+            draw.ellipse((left + swatch / 3, top + swatch / 3, left + swatch * 2 / 3, top + swatch * 2 / 3),
+                         fill=face, outline=edge)
+        else:
+            draw.rectangle(rect, fill=face, outline=edge, width=2)
+        draw.text((left + swatch + padding, top), label, fill=COLORS['black'], font=font)
+
+    return np.asarray(canvas)
+
+
+# add_legend와 같은 항목
+MAP_LEGEND = [
+    ('circle', COLORS['saddlebrown'], COLORS['saddlebrown'], 'Apartment/Building'),
+    ('square', COLORS['green'], COLORS['darkgreen'], 'Bandalgom Coffee'),
+    ('triangle', COLORS['green'], COLORS['darkgreen'], 'My Home'),
+    ('square', COLORS['gray'], COLORS['darkgray'], 'Construction Site'),
+]
+
+
+def draw_stops(image, grid, positions, pixels_per_cell=PIXELS_PER_CELL):
+    """tour의 중간 경유지(카페)를 초록색 점으로 그립니다."""
+    size = pixels_per_cell
+    for pos in positions:
+        _disc(image, pixel_center(grid, pos, size), _points(8) * size,
+              COLORS['limegreen'], COLORS['darkgreen'], _points(1) * size, 1.0)
+    return image
+
+
+def path_legend(path, target, stop_count=0):
+    """visualize_path_on_map의 범례 항목"""
+    entries = [
+        ('line', COLORS['red'], COLORS['darkred'], f'Shortest Path ({len(path)} steps)'),
+        ('circle', COLORS['blue'], COLORS['darkblue'], 'Start (MyHome)'),
+        ('circle', COLORS['orange'], COLORS['darkorange'], f'Goal {target}'),
+    ]
+    if stop_count:
+        entries.append(('circle', COLORS['limegreen'], COLORS['darkgreen'], f'Cafe Stops ({stop_count})'))
+    return entries
+
+
+def save_raster(grid, filename, path=None, target=None, pixels_per_cell=None, legend=True, stops=()):
+    """
+    지도(와 경로)를 래스터로 그려 PNG로 저장합니다.
+
+    stops: 경로 중간에 들르는 곳의 path 인덱스 (tour)
+
+    Returns:
+        저장한 RGB 배열
+    """
+    from PIL import Image
+
+    if pixels_per_cell is None:
+        pixels_per_cell = default_pixels_per_cell(grid)
+    image = render_map(grid, pixels_per_cell)
+    stop_points = [path[i] for i in stops if 0 < i < len(path) - 1] if path else []
+    if path:
+        draw_path(image, grid, path, pixels_per_cell)
+        draw_stops(image, grid, stop_points, pixels_per_cell)
+    if legend:
+        image = draw_legend(image, path_legend(path, target, len(stop_points)) if path else MAP_LEGEND)
+    Image.fromarray(image).save(filename)
+    return image
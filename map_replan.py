@@ -0,0 +1,199 @@
+"""
+공사장 변경 시 점진적 경로 재계획 (D* Lite)
+
+목표(반달곰 커피)들에서 집 쪽으로 거꾸로 탐색한 상태(g, rhs, 우선순위 큐)를 계속 유지하다가,
+공사장이 새로 생기거나 없어진 칸이 주어지면 그 변화의 영향을 받는 칸들만 다시 계산하여 경로를 고칩니다.
+매일 몇 칸씩 바뀌는 공사 정보 때문에 Stage 1부터 전체를 다시 탐색할 필요가 없습니다.
+"""
+
+import heapq
+
+import numpy as np
+
+
+INF = 2 ** 30
+
+
+class DStarLitePlanner:
+    """
+    다중 목표 D* Lite 경로 계획기
+
+    칸에 들어갈 때의 비용을 1로 보고(공사장은 들어갈 수 없음), bfs_shortest_path와 같이
+    시작 칸이 공사장이어도 출발할 수 있습니다. 지도 변경은 플래너가 가진 통과 가능 배열 사본에만 반영되므로
+    원래 Grid는 바뀌지 않습니다.
+
+    Attributes:
+        expanded: 지금까지 확장(g 값 확정)한 칸 수
+    """
+
+    def __init__(self, grid, start_pos, target_positions):
+        self.grid = grid
+        self.passable = grid.passable.copy()
+        self.start = grid.cell_id(*start_pos)
+        if self.start < 0:
+            raise ValueError(f'시작 좌표 {start_pos}이(가) 지도 밖에 있습니다.')
+        self.goals = {cell for cell in (grid.cell_id(*pos) for pos in target_positions) if cell >= 0}
+
+        self._g_array = np.full(grid.size, INF, dtype=np.int32)
+        self._rhs_array = np.full(grid.size, INF, dtype=np.int32)
+        self.g = memoryview(self._g_array)
+        self.rhs = memoryview(self._rhs_array)
+        self.km = 0
+        self.queue = []
+        self.queued = {}  # 칸 -> 현재 유효한 key (큐에서 지연 삭제용)
+        self.expanded = 0
+
+        for goal in self.goals:
+            self.rhs[goal] = 0
+            self._push(goal)
+
+    def _heuristic(self, cell):
+        """시작 칸까지의 맨해튼 거리 (일관된 휴리스틱)"""
+        row, col = divmod(cell, self.grid.stride)
+        start_row, start_col = divmod(self.start, self.grid.stride)
+        return abs(row - start_row) + abs(col - start_col)
+
+    def _key(self, cell):
+        best = min(self.g[cell], self.rhs[cell])
+        return (best + self._heuristic(cell) + self.km, best)
+
+    def _push(self, cell):
+        key = self._key(cell)
+        self.queued[cell] = key
+        heapq.heappush(self.queue, (key, cell))
+
+    def _update_vertex(self, cell):
+        """cell의 rhs를 다시 계산하고 일관성 여부에 따라 큐에 넣거나 뺍니다."""
+        if cell not in self.goals:
+            best = INF
+            if self.passable[cell] or cell == self.start:
+                for nb in self.grid.neighbors(cell):
+                    if self.passable[nb] and self.g[nb] + 1 < best:
+                        best = self.g[nb] + 1
+            self.rhs[cell] = min(best, INF)
+
+        if self.g[cell] != self.rhs[cell]:
+            self._push(cell)
+        else:
+            self.queued.pop(cell, None)
+
+    def _predecessors(self, cell):
+        """cell로 들어올 수 있는 이웃 칸들 (cell 자체가 공사장이면 없음)"""
+        if not self.passable[cell]:
+            return []
+        return self.grid.neighbors(cell)
+
+    def compute_shortest_path(self):
+        """시작 칸의 값이 확정될 때까지 불일치한 칸들만 확장합니다."""
+        start = self.start
+        while self.queue:
+            key, cell = self.queue[0]
+            if self.queued.get(cell) != key:
+                heapq.heappop(self.queue)  # 이미 갱신되었거나 삭제된 항목
+                continue
+            if key >= self._key(start) and self.rhs[start] == self.g[start]:
+                break
+
+            heapq.heappop(self.queue)
+            del self.queued[cell]
+            new_key = self._key(cell)
+            if key < new_key:
+                self._push(cell)
+                continue
+
+            self.expanded += 1
+            if self.g[cell] > self.rhs[cell]:
+                self.g[cell] = self.rhs[cell]
+                for pred in self._predecessors(cell):
+                    self._update_vertex(pred)
+            else:
+                self.g[cell] = INF
+                self._update_vertex(cell)
+                for pred in self._predecessors(cell):
+                    self._update_vertex(pred)
+
+    def plan(self):
+        """
+        현재 지도에서 경로를 계산합니다.
+
+        Returns:
+            (path, target) - bfs_shortest_path와 같은 형식
+        """
+        self.compute_shortest_path()
+        return self.current_path()
+
+    def current_path(self):
+        """g 값이 가장 작은 이웃을 따라가며 시작 칸에서 목표까지의 경로를 복원합니다."""
+        grid = self.grid
+        cell = self.start
+        if self.g[cell] >= INF and cell not in self.goals:
+            return None, None
+
+        path = [cell]
+        while cell not in self.goals:
+            nxt = min((nb for nb in grid.neighbors(cell) if self.passable[nb]),
+                      key=lambda nb: self.g[nb], default=None)
+            if nxt is None or self.g[nxt] >= INF:
+                return None, None
+            cell = nxt
+            path.append(cell)
+
+        return [grid.coord(c) for c in path], grid.coord(cell)
+
+    def update_cells(self, blocked=(), unblocked=()):
+        """
+        공사장 변경을 반영하고 경로를 고칩니다.
+
+        Arguments:
+            blocked: 새로 공사장이 된 좌표 리스트
+            unblocked: 공사가 끝나 지나갈 수 있게 된 좌표 리스트
+
+        Returns:
+            (path, target) - 고친 경로
+        """
+        grid = self.grid
+        changed = []
+        for positions, value in ((blocked, False), (unblocked, True)):
+            for pos in positions:
+                cell = grid.cell_id(*pos)
+                if cell >= 0 and self.passable[cell] != value:
+                    self.passable[cell] = value
+                    changed.append(cell)
+
+        # 바뀐 칸 자신과, 그 칸으로 들어가는 간선이 달라진 이웃들의 rhs만 다시 계산
+        for cell in changed:
+            self._update_vertex(cell)
+            for nb in grid.neighbors(cell):
+                self._update_vertex(nb)
+
+        return self.plan()
+
+    def move_start(self, start_pos):
+        """경로를 따라 이동한 뒤 새 위치에서 이어서 계획합니다."""
+        new_start = self.grid.cell_id(*start_pos)
+        if new_start < 0:
+            raise ValueError(f'시작 좌표 {start_pos}이(가) 지도 밖에 있습니다.')
+        old_start = self.start
+        self.km += self._heuristic(new_start)  # 이전 시작점 기준 휴리스틱 변화량 보정
+        self.start = new_start
+        # 공사장 위 출발 허용 여부가 바뀌므로 이전/새 시작 칸의 rhs를 다시 계산
+        self._update_vertex(old_start)
+        self._update_vertex(new_start)
+        return self.plan()
+
+
+def construction_changes(old_grid, new_grid):
+    """
+    두 지도(같은 크기)의 공사장 차이를 좌표 리스트로 반환합니다.
+
+    Returns:
+        (blocked, unblocked) - DStarLitePlanner.update_cells에 그대로 넘길 수 있음
+    """
+    if (old_grid.x_min, old_grid.y_min, old_grid.width, old_grid.height) != \
+            (new_grid.x_min, new_grid.y_min, new_grid.width, new_grid.height):
+        raise ValueError('지도 크기가 달라 공사장 변경을 비교할 수 없습니다.')
+
+    blocked = np.flatnonzero(old_grid.passable & ~new_grid.passable)
+    unblocked = np.flatnonzero(~old_grid.passable & new_grid.passable)
+    to_coords = lambda cells: list(zip(*(axis.tolist() for axis in new_grid.coords(cells))))
+    return to_coords(blocked), to_coords(unblocked)
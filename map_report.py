@@ -0,0 +1,181 @@
+"""
+실행 출력 수준과 JSON 실행 보고서
+
+각 Stage의 진행 메시지와 DataFrame 출력을 출력 수준(verbosity)에 따라 걸러내고,
+행 수, 경고, 단계별 소요 시간을 모아 JSON 보고서로 남깁니다.
+오류 메시지는 출력 수준과 관계없이 항상 출력합니다.
+
+계측(--instrument)을 켜면 timed 블록마다 최대 메모리 사용량(tracemalloc)도 기록하고,
+탐색 엔진들이 확장 노드 수, 최대 open list/queue 크기, heap push 수 같은 탐색 카운터를 남깁니다.
+add_hook으로 등록한 함수는 기록이 생길 때마다 (종류, 이름, 값)으로 호출되므로 외부 프로파일러로 보낼 수 있습니다.
+
+출력 수준:
+    quiet   - 콘솔 출력 없음 (보고서만)
+    normal  - 진행 메시지와 경고만 출력, DataFrame 전체 출력은 생략
+    verbose - 기존과 같이 DataFrame까지 모두 출력 (기본값)
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+VERBOSITY_LEVELS = ('quiet', 'normal', 'verbose')
+
+
+class RunReport:
+    """
+    한 번의 실행 동안 모은 요약 정보
+
+    Attributes:
+        verbosity: 출력 수준 (VERBOSITY_LEVELS 중 하나)
+        instrumenting: 계측(메모리, 탐색 카운터) 사용 여부
+        data: 보고서 내용 (stages, rows, counts, warnings, timings, memory, search)
+    """
+
+    def __init__(self, verbosity='verbose'):
+        self.set_verbosity(verbosity)
+        self.instrumenting = False
+        self._hooks = []
+        self._peaks = []  # 중첩된 timed 블록별로 안쪽 블록에서 잰 최대 메모리
+        self.reset()
+
+    def set_verbosity(self, verbosity):
+        if verbosity not in VERBOSITY_LEVELS:
+            raise ValueError(f'알 수 없는 출력 수준입니다: {verbosity}')
+        self.verbosity = verbosity
+        self._level = VERBOSITY_LEVELS.index(verbosity)
+
+    def reset(self):
+        """보고서 내용을 비웁니다."""
+        self.data = {'stages': [], 'rows': {}, 'counts': {}, 'warnings': [], 'timings': {},
+                     'memory': {}, 'search': {}}
+        self._started = time.perf_counter()
+
+    def configure(self, args):
+        """add_report_arguments로 받은 옵션(출력 수준, 계측)을 적용합니다."""
+        self.set_verbosity(args.verbosity)
+        if args.instrument:
+            self.enable_instrumentation()
+
+    def enable_instrumentation(self, memory=True):
+        """계측을 켭니다. memory=True이면 tracemalloc으로 timed 블록별 최대 메모리도 잽니다."""
+        self.instrumenting = True
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def add_hook(self, callback):
+        """기록이 생길 때마다 callback(kind, name, values)를 호출합니다. (kind: 'timing' 또는 'search')"""
+        self._hooks.append(callback)
+
+    def _emit(self, kind, name, values):
+        for callback in self._hooks:
+            callback(kind, name, values)
+
+    def stage(self, name):
+        """새 Stage의 시작을 기록합니다."""
+        if name not in self.data['stages']:
+            self.data['stages'].append(name)
+
+    def info(self, *args, **kwargs):
+        """진행 메시지 (normal 이상에서 출력)"""
+        if self._level >= 1:
+            print(*args, **kwargs)
+
+    def warn(self, message):
+        """경고를 보고서에 남기고 normal 이상에서 출력합니다."""
+        self.data['warnings'].append(message)
+        if self._level >= 1:
+            print(message)
+
+    def frame(self, name, df, title=None):
+        """DataFrame의 행 수를 기록하고, verbose에서만 (제목과 함께) 전체 내용을 출력합니다."""
+        self.data['rows'][name] = len(df)
+        if self._level >= 2:
+            if title is not None:
+                print(title)
+            print(df)
+
+    def count(self, name, value):
+        """임의의 개수/값을 보고서에 남깁니다."""
+        self.data['counts'][name] = value
+
+    def search(self, name, **counters):
+        """탐색 엔진 name의 카운터(확장 노드 수 등)를 보고서에 남깁니다."""
+        self.data['search'][name] = counters
+        self._emit('search', name, counters)
+
+    @contextmanager
+    def timed(self, name):
+        """
+        with 블록의 소요 시간(초)을 보고서에 남깁니다.
+
+        메모리 계측 중이면 블록 안의 최대 메모리 사용량(바이트)도 남깁니다.
+        tracemalloc의 최대값은 하나뿐이므로, 안쪽 블록이 끝날 때 그 최대값을 바깥 블록에 넘겨 줍니다.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            if self._peaks:
+                self._peaks[-1] = max(self._peaks[-1], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self._peaks.append(0)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = round(time.perf_counter() - started, 6)
+            self.data['timings'][name] = seconds
+            values = {'seconds': seconds}
+            if tracing:
+                peak = max(self._peaks.pop(), tracemalloc.get_traced_memory()[1])
+                self.data['memory'][name] = peak
+                values['peak_bytes'] = peak
+                if self._peaks:
+                    self._peaks[-1] = max(self._peaks[-1], peak)
+            self._emit('timing', name, values)
+
+    def to_dict(self):
+        report = dict(self.data)
+        report['total_seconds'] = round(time.perf_counter() - self._started, 6)
+        return report
+
+    def write(self, path=None):
+        """
+        보고서를 JSON으로 저장합니다.
+
+        path가 None이면 quiet 모드에서만 한 줄 JSON을 표준 출력으로 내보냅니다.
+        """
+        text = json.dumps(self.to_dict(), ensure_ascii=False, default=_json_default)
+        if path is None:
+            if self._level == 0:
+                print(text)
+            return text
+
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        os.replace(tmp_path, path)
+        return text
+
+
+def _json_default(value):
+    """NumPy 정수/실수 등 JSON 기본 타입이 아닌 값을 변환합니다."""
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def add_report_arguments(parser):
+    """--verbosity, --report, --instrument 옵션을 argparse 파서에 추가합니다. (report.configure로 적용)"""
+    parser.add_argument('--verbosity', choices=VERBOSITY_LEVELS, default='verbose',
+                        help='출력 수준 (quiet: 보고서만, normal: DataFrame 출력 생략, verbose: 전체 출력)')
+    parser.add_argument('--report', metavar='PATH',
+                        help='실행 요약(행 수, 경고, 소요 시간)을 JSON으로 저장할 경로')
+    parser.add_argument('--instrument', action='store_true',
+                        help='단계별 최대 메모리와 탐색 카운터(확장 노드 수, 최대 queue 크기 등)도 기록 (실행이 느려짐)')
+
+
+# 모든 Stage가 공유하는 보고서 (run_pipeline에서는 한 보고서에 세 Stage가 함께 기록됨)
+report = RunReport()
@@ -0,0 +1,187 @@
+"""
+경로 결과 LRU 캐시
+
+(출발 좌표, 목표 좌표 집합, 탐색 엔진)을 키로 경로를 기억합니다.
+많이 쓰는 출발점 몇백 곳에서 같은 카페들로 가는 질의가 대부분이므로 대부분의 요청이 탐색 없이 끝납니다.
+
+부분 경로 재사용:
+    최단 경로의 뒷부분은 그 중간 칸에서 같은 목표 집합까지의 최단 경로이기도 합니다.
+    그래서 캐시된 경로 위의 칸에서 출발하는 질의는 그 경로의 뒷부분을 그대로 돌려줍니다.
+    (최단 경로를 보장하는 EXACT_ENGINES에서만 사용)
+
+지도 버전과 선택적 무효화:
+    지도가 바뀌면 update_map에 새 격자를 주어 버전을 올립니다. 모든 항목을 버리지 않고
+    - 새로 막힌 칸(공사장이 생긴 칸)을 지나는 경로만 버리고,
+    - 새로 열린 칸이 있으면 그 칸을 거쳐 더 짧아질 수 있는 경로(맨해튼 거리로 판단)만 버립니다.
+    그 외의 경로는 새 지도에서도 그대로 최단 경로이므로 새 버전으로 이어서 씁니다.
+"""
+
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+
+MAX_ENTRIES = 4096
+# 칸 수 기준 최단 경로를 보장하는 엔진 (hpa는 근사, dial 계열은 비용 기준이므로 제외)
+EXACT_ENGINES = ('bfs', 'jps')
+
+
+class RouteCache:
+    """
+    여러 스레드가 함께 쓸 수 있는 경로 LRU 캐시
+
+    Attributes:
+        grid: 현재 지도 격자
+        version: 지도 버전 (update_map마다 1씩 증가)
+        stats: hits, subpath_hits, misses, evicted, invalidated 개수
+    """
+
+    def __init__(self, grid, max_entries=MAX_ENTRIES, version=1):
+        self.grid = grid
+        self.version = version
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'subpath_hits': 0, 'misses': 0, 'evicted': 0, 'invalidated': 0}
+        self._entries = OrderedDict()  # (start, targets, engine) -> (path, target)
+        self._on_path = {}  # (targets, engine) -> {좌표: (키, 경로에서의 위치)} - 부분 경로 찾기용
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, start, targets, engine='bfs', version=None):
+        """
+        캐시된 경로를 찾습니다.
+
+        version을 주면 그 지도 버전이 캐시의 현재 버전과 같을 때만 찾습니다.
+        (지도를 바꾸는 중에 이전 지도로 처리 중인 요청이 새 버전의 항목을 쓰거나 저장하지 않도록)
+
+        Returns:
+            (found, path, target, version) - version은 put에 그대로 넘겨 줌
+        """
+        start = (int(start[0]), int(start[1]))
+        group = (frozenset(targets), engine)
+        key = (start, *group)
+        with self._lock:
+            if version is not None and version != self.version:
+                self.stats['misses'] += 1
+                return False, None, None, version
+
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return True, entry[0], entry[1], self.version
+
+            if engine in EXACT_ENGINES:
+                owner = self._on_path.get(group, {}).get(start)
+                if owner is not None:
+                    owner_key, index = owner
+                    path, target = self._entries[owner_key]
+                    self._entries.move_to_end(owner_key)
+                    self.stats['subpath_hits'] += 1
+                    return True, path[index:], target, self.version
+
+            self.stats['misses'] += 1
+            return False, None, None, self.version
+
+    def put(self, start, targets, engine, path, target, version):
+        """
+        경로를 저장합니다. (찾지 못한 경우 path=None도 저장)
+
+        탐색하는 동안 지도가 바뀌었으면(version이 현재 버전과 다르면) 저장하지 않습니다.
+        """
+        start = (int(start[0]), int(start[1]))
+        group = (frozenset(targets), engine)
+        key = (start, *group)
+        path = [tuple(pos) for pos in path] if path else None
+        with self._lock:
+            if version != self.version:
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (path, tuple(target) if target else None)
+            if path and engine in EXACT_ENGINES:
+                index = self._on_path.setdefault(group, {})
+                for i, pos in enumerate(path):
+                    index[pos] = (key, i)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats['evicted'] += 1
+
+    def route(self, start, targets, search, engine='bfs', version=None):
+        """
+        캐시에 있으면 바로, 없으면 search(start, targets)로 찾아 저장한 뒤 (path, target)을 반환합니다.
+        """
+        found, path, target, version = self.lookup(start, targets, engine, version)
+        if found:
+            return path, target
+        path, target = search(start, list(targets))
+        self.put(start, targets, engine, path, target, version)
+        return path, target
+
+    def _remove(self, key):
+        path, _ = self._entries.pop(key)
+        index = self._on_path.get(key[1:])
+        if index is None or not path:
+            return
+        for pos in path:
+            if index.get(pos, (None,))[0] == key:
+                del index[pos]
+        if not index:
+            del self._on_path[key[1:]]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._on_path.clear()
+
+    def update_map(self, grid, version=None):
+        """
+        새 지도로 바꾸고, 바뀐 칸 때문에 더 이상 맞지 않는 항목만 버립니다.
+
+        Arguments:
+            version: 새 지도 버전 (생략하면 현재 버전 + 1)
+
+        Returns:
+            버린 항목 수
+        """
+        with self._lock:
+            old = self.grid
+            self.grid = grid
+            self.version = version if version is not None else self.version + 1
+            if (old.x_min, old.y_min, old.width, old.height) != (grid.x_min, grid.y_min, grid.width, grid.height):
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._on_path.clear()
+                self.stats['invalidated'] += dropped
+                return dropped
+
+            blocked_cells = np.flatnonzero(old.passable & ~grid.passable)
+            opened_cells = np.flatnonzero(~old.passable & grid.passable)
+            blocked = set(zip(*(coords.tolist() for coords in grid.coords(blocked_cells))))
+            opened_x, opened_y = grid.coords(opened_cells)
+
+            stale = [key for key, (path, target) in self._entries.items()
+                     if _is_stale(key, path, target, blocked, opened_x, opened_y)]
+            for key in stale:
+                self._remove(key)
+            self.stats['invalidated'] += len(stale)
+            return len(stale)
+
+
+def _is_stale(key, path, target, blocked, opened_x, opened_y):
+    """지도가 바뀐 뒤에도 캐시된 결과가 맞는지 판단합니다."""
+    start, targets, engine = key
+    if path is not None and blocked and not blocked.isdisjoint(path):
+        return True  # 경로가 새로 막힌 칸을 지남
+    if not len(opened_x):
+        return False
+    if path is None or engine not in EXACT_ENGINES:
+        return True  # 열린 칸 때문에 새로 닿을 수 있거나, 최단 경로가 보장되지 않는 엔진
+
+    # 열린 칸 c를 거치는 경로의 길이는 |start - c| + min |c - t| 이상이므로,
+    # 이 하한이 지금 경로보다 짧은 열린 칸이 없으면 지금 경로가 여전히 최단 경로
+    to_start = np.abs(opened_x - start[0]) + np.abs(opened_y - start[1])
+    to_target = np.min([np.abs(opened_x - tx) + np.abs(opened_y - ty) for tx, ty in targets], axis=0)
+    return bool((to_start + to_target < len(path) - 1).any())
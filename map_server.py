@@ -0,0 +1,338 @@
+"""
+경로 질의 서버
+
+지도를 한 번만 읽어 메모리에 둔 채로 경로 질의에 답하는 상주 프로세스입니다.
+요청과 응답은 한 줄에 JSON 하나(JSON lines)이며, 표준 입출력 또는 Unix socket으로 주고받습니다.
+
+    요청: {"id": 1, "op": "route", "start": [x, y], "targets": [[x, y], ...], "engine": "bfs"}
+    응답: {"id": 1, "ok": true, "path": [[x, y], ...], "target": [x, y], "length": n, "ms": 0.4}
+
+    op: route (start 생략 시 내 집, targets 생략 시 모든 반달곰 커피), info, reload, ping
+    오류: {"id": 1, "ok": false, "error": "..."}
+
+요청은 작업 스레드들이 동시에 처리하며, 응답 순서는 요청 순서와 다를 수 있으므로 id로 짝을 맞춥니다.
+지도 통합 데이터(complete_map_data.csv 또는 격자 번들)가 바뀌면 감시 스레드가 새 지도를 따로 만든 뒤
+참조 하나만 바꿔 끼우므로, 처리 중인 요청은 이전 지도로, 새 요청은 새 지도로 끝까지 일관되게 처리됩니다.
+최근 경로는 map_route_cache.RouteCache에 두고, 지도를 바꿀 때는 바뀐 칸과 관계있는 경로만 버립니다.
+"""
+
+import argparse
+import json
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from map_cache import cached_field
+from map_cafe_field import NearestCafeField
+from map_direct_save import ENGINES, bfs_path
+from map_grid import MAP_BUNDLE, MAP_CSV, bundle_is_fresh, extract_bundle_locations, load_bundle, read_map_csv
+from map_hpa import HierarchicalMap, hpa_search
+from map_jps import JumpTable, jump_point_search
+from map_report import report
+from map_route_cache import MAX_ENTRIES, RouteCache
+from map_weighted import CostTable, weighted_shortest_path
+
+
+POLL_SECONDS = 1.0  # 지도 파일 변경 확인 주기
+WORKERS = 8
+FIELD_ENTRIES = 16  # dial-astar 휴리스틱용으로 메모리에 두는 목표 집합별 거리장 수
+
+
+def log(message):
+    """서버 로그는 표준 오류로 출력 (표준 출력은 응답 전용)"""
+    print(message, file=sys.stderr, flush=True)
+
+
+def source_signature():
+    """지도 파일들의 (경로, 크기, 수정 시각) - 바뀌면 다시 읽음"""
+    signature = []
+    for path in (MAP_CSV, MAP_BUNDLE):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            signature.append((path, stat.st_size, stat.st_mtime_ns))
+    return tuple(signature)
+
+
+class MapState:
+    """
+    한 번 읽은 지도와 그 지도로 만든 탐색 자료 (만든 뒤에는 바꾸지 않음)
+
+    Attributes:
+        grid, home, cafes: find_key_locations와 같은 지도 정보
+        field: 모든 카페까지의 거리장 (기본 목표 질의는 BFS 없이 경로 복원)
+        version: 몇 번째로 읽은 지도인지 (다시 읽을 때마다 1씩 증가)
+
+    엔진별 전처리(HierarchicalMap, JumpTable, CostTable)는 처음 쓸 때 한 번만 만들고,
+    다른 목표 집합의 거리장은 최근 FIELD_ENTRIES개를 메모리에 두어 요청마다 다시 만들지 않습니다.
+    """
+
+    def __init__(self, grid, home, cafes, signature, version):
+        self.grid = grid
+        self.home = home
+        self.cafes = cafes
+        self.signature = signature
+        self.version = version
+        self.loaded_at = time.time()
+        self.field = cached_field(grid, cafes)
+        self._built = {}
+        self._fields = OrderedDict()  # frozenset(목표 좌표) -> NearestCafeField
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, version=1):
+        signature = source_signature()
+        if bundle_is_fresh(MAP_BUNDLE, MAP_CSV):
+            home, cafes, _, grid = extract_bundle_locations(*load_bundle(MAP_BUNDLE))
+        elif os.path.exists(MAP_CSV):
+            home, cafes, _, grid = extract_bundle_locations(*read_map_csv(MAP_CSV))
+        else:
+            raise FileNotFoundError(f'지도 통합 데이터 "{MAP_CSV}"을(를) 찾을 수 없습니다. Stage 1을 먼저 실행해 주세요.')
+        if home is None or not cafes:
+            raise ValueError('지도에 MyHome 또는 BandalgomCoffee가 없습니다.')
+        return cls(grid, home, cafes, signature, version)
+
+    def _once(self, name, build):
+        """build(grid)로 만드는 탐색 자료를 처음 쓸 때 한 번만 만듭니다."""
+        with self._lock:
+            if name not in self._built:
+                self._built[name] = build(self.grid)
+            return self._built[name]
+
+    def hierarchical_map(self):
+        """HPA* 추상 그래프"""
+        return self._once('hpa', HierarchicalMap.build)
+
+    def jump_table(self):
+        """JPS 점프 거리표"""
+        return self._once('jps', JumpTable.build)
+
+    def costs(self):
+        """dial 계열 엔진의 칸별 이동 비용 (요청마다 변환하지 않도록 CostTable로 한 번만 만듦)"""
+        return self._once('costs', CostTable.build)
+
+    def target_field(self, targets):
+        """targets까지의 거리장 (모든 카페이면 self.field)"""
+        key = frozenset(map(tuple, targets))
+        if key == frozenset(self.cafes):
+            return self.field
+        with self._lock:
+            field = self._fields.get(key)
+            if field is not None:
+                self._fields.move_to_end(key)
+                return field
+        field = NearestCafeField.build(self.grid, list(key))
+        with self._lock:
+            self._fields[key] = field
+            while len(self._fields) > FIELD_ENTRIES:
+                self._fields.popitem(last=False)
+        return field
+
+    def route(self, start, targets=None, engine='bfs'):
+        if targets is None and engine == 'bfs':
+            return self.field.route(start)
+        targets = targets if targets is not None else self.cafes
+        if engine == 'bfs':
+            return bfs_path(start, targets, self.grid)
+        if engine == 'jps':
+            return jump_point_search(start, targets, self.grid, self.jump_table())
+        if engine == 'hpa':
+            return hpa_search(start, targets, self.grid, self.hierarchical_map())
+        if engine == 'dial-astar':
+            return weighted_shortest_path(start, targets, self.grid, self.costs(), True, self.target_field(targets))
+        return weighted_shortest_path(start, targets, self.grid, self.costs())
+
+
+class RouteService:
+    """현재 지도(MapState)를 들고 요청을 처리하며, 지도 파일이 바뀌면 새 지도로 바꿔 끼웁니다."""
+
+    def __init__(self, engine='bfs', poll=POLL_SECONDS, cache_size=MAX_ENTRIES):
+        self.engine = engine
+        self.poll = poll
+        self.state = MapState.load()
+        # 경로 결과 캐시 (cache_size가 0이면 사용하지 않음)
+        self.cache = RouteCache(self.state.grid, cache_size, self.state.version) if cache_size else None
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+    def reload(self, force=False):
+        """
+        지도 파일이 바뀌었으면 새 지도를 만든 뒤 교체합니다.
+
+        새 지도를 만드는 동안 실패하면 (예: 파일을 쓰는 중) 이전 지도를 그대로 씁니다.
+
+        Returns:
+            교체했으면 True
+        """
+        with self._reload_lock:
+            current = self.state
+            if not force and source_signature() == current.signature:
+                return False
+            state = MapState.load(current.version + 1)
+            dropped = self.cache.update_map(state.grid, state.version) if self.cache is not None else 0
+            self.state = state  # 참조 하나만 바꾸므로 요청 처리 중에도 안전
+            log(f'지도를 다시 읽었습니다. (version {state.version}, {state.grid.width}x{state.grid.height}'
+                + (f', 캐시 {dropped}개 무효화, {len(self.cache)}개 유지)' if self.cache is not None else ')'))
+            return True
+
+    def _watch(self):
+        # 쓰는 중인 파일을 읽지 않도록 두 번 연속 같은 상태일 때만 다시 읽음
+        previous = source_signature()
+        while not self._stop.wait(self.poll):
+            signature = source_signature()
+            if signature == previous and signature != self.state.signature:
+                try:
+                    self.reload()
+                except Exception as e:
+                    log(f'경고: 지도를 다시 읽지 못해 이전 지도를 계속 사용합니다: {e}')
+            previous = signature
+
+    def start_watching(self):
+        self._watcher = threading.Thread(target=self._watch, name='map-watcher', daemon=True)
+        self._watcher.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def handle(self, request):
+        """요청 딕셔너리 하나를 처리하여 응답 딕셔너리를 반환합니다."""
+        started = time.perf_counter()
+        response = {'id': request.get('id')} if isinstance(request, dict) else {'id': None}
+        try:
+            if not isinstance(request, dict):
+                raise ValueError('요청은 JSON 객체여야 합니다.')
+            op = request.get('op', 'route')
+            state = self.state  # 이 요청은 끝까지 같은 지도로 처리
+
+            if op == 'route':
+                start = _position(request['start']) if 'start' in request else state.home
+                targets = request.get('targets')
+                if targets is not None:
+                    targets = [_position(target) for target in targets]
+                    if not targets:
+                        raise ValueError('targets가 비어 있습니다.')
+                engine = request.get('engine', self.engine)
+                if engine not in ENGINES:
+                    raise ValueError(f'알 수 없는 탐색 엔진입니다: {engine}')
+                if self.cache is not None:
+                    path, target = self.cache.route(
+                        start, targets if targets is not None else state.cafes,
+                        lambda start, _: state.route(start, targets, engine), engine, state.version)
+                else:
+                    path, target = state.route(start, targets, engine)
+                response.update(ok=True, version=state.version,
+                                path=[list(pos) for pos in path] if path else None,
+                                target=list(target) if target else None,
+                                length=len(path) if path else None)
+            elif op == 'info':
+                cache = dict(self.cache.stats, entries=len(self.cache)) if self.cache is not None else None
+                response.update(ok=True, version=state.version, width=state.grid.width,
+                                height=state.grid.height, home=list(state.home),
+                                cafes=[list(cafe) for cafe in state.cafes], loaded_at=state.loaded_at, cache=cache)
+            elif op == 'reload':
+                response.update(ok=True, reloaded=self.reload(force=True), version=self.state.version)
+            elif op == 'ping':
+                response.update(ok=True)
+            else:
+                raise ValueError(f'알 수 없는 요청입니다: {op}')
+
+        except Exception as e:
+            response.update(ok=False, error=str(e) or type(e).__name__)
+
+        response['ms'] = round((time.perf_counter() - started) * 1000, 3)
+        return response
+
+    def handle_line(self, line):
+        """JSON 한 줄을 처리하여 응답 JSON 한 줄(줄바꿈 없음)을 반환합니다."""
+        try:
+            request = json.loads(line)
+        except ValueError as e:
+            return json.dumps({'id': None, 'ok': False, 'error': f'JSON 형식 오류: {e}'}, ensure_ascii=False)
+        return json.dumps(self.handle(request), ensure_ascii=False)
+
+
+def _position(value):
+    x, y = value
+    return int(x), int(y)
+
+
+def serve_stdio(service, workers=WORKERS):
+    """표준 입력의 요청을 작업 스레드들로 처리하여 표준 출력에 응답합니다. (입력이 끝나면 종료)"""
+    write_lock = threading.Lock()
+
+    def answer(line):
+        text = service.handle_line(line)
+        with write_lock:
+            sys.stdout.write(text + '\n')
+            sys.stdout.flush()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for line in sys.stdin:
+            if line.strip():
+                executor.submit(answer, line)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """연결 하나의 요청들을 차례로 처리 (연결마다 스레드 하나)"""
+
+    def handle(self):
+        for line in self.rfile:
+            if line.strip():
+                text = self.server.service.handle_line(line.decode('utf-8'))
+                self.wfile.write(text.encode('utf-8') + b'\n')
+                self.wfile.flush()
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_socket(service, path):
+    """Unix socket에서 요청을 받습니다. 연결마다 스레드 하나가 처리하므로 여러 클라이언트가 동시에 질의할 수 있습니다."""
+    if os.path.exists(path):
+        os.remove(path)  # 이전 실행이 남긴 socket 파일
+    server = _UnixServer(path, _Handler)
+    server.service = service
+    log(f'{path}에서 요청을 기다립니다.')
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='경로 질의 서버 (JSON lines)')
+    parser.add_argument('--socket', metavar='PATH', help='Unix socket 경로 (없으면 표준 입출력 사용)')
+    parser.add_argument('--engine', choices=ENGINES, default='bfs', help='기본 탐색 엔진 (기본값: bfs)')
+    parser.add_argument('--workers', type=int, default=WORKERS,
+                        help=f'표준 입출력 모드의 작업 스레드 수 (기본값: {WORKERS})')
+    parser.add_argument('--poll', type=float, default=POLL_SECONDS,
+                        help=f'지도 파일 변경 확인 주기(초) (기본값: {POLL_SECONDS})')
+    parser.add_argument('--cache-size', type=int, default=MAX_ENTRIES,
+                        help=f'경로 결과 캐시 항목 수, 0이면 캐시 사용 안 함 (기본값: {MAX_ENTRIES})')
+    args = parser.parse_args()
+    # 탐색 함수들의 진행 메시지가 응답(표준 출력)에 섞이지 않도록 출력을 끔
+    report.set_verbosity('quiet')
+
+    try:
+        service = RouteService(engine=args.engine, poll=args.poll, cache_size=args.cache_size)
+        log(f'지도를 읽었습니다. ({service.state.grid.width}x{service.state.grid.height}, '
+            f'반달곰 커피 {len(service.state.cafes)}개)')
+        service.start_watching()
+        if args.socket:
+            serve_socket(service, args.socket)
+        else:
+            serve_stdio(service, args.workers)
+        service.stop()
+
+    except KeyboardInterrupt:
+        log('\n서버를 종료합니다.')
+    except Exception as e:
+        log(f'서버 실행 중 오류 발생: {e}')
+        sys.exit(1)
@@ -0,0 +1,108 @@
+"""
+합성 지도 데이터 생성기
+
+벤치마크용으로 data/ 폴더와 같은 형식의 area_map.csv, area_struct.csv, area_category.csv를
+원하는 크기(예: 15x15 ~ 5000x5000), 공사장 밀도, 반달곰 커피 개수로 만듭니다.
+같은 seed를 주면 항상 같은 지도가 만들어집니다.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# data/area_category.csv와 같은 구조물 번호
+CATEGORIES = {1: 'Apartment', 2: 'Building', 3: 'MyHome', 4: 'BandalgomCoffee'}
+WRITE_CHUNK = 1_000_000  # 큰 지도를 나누어 쓰는 행 수
+
+
+def generate_map(width, height, obstacle_density=0.2, cafes=2, structure_density=0.03, seed=0):
+    """
+    합성 지도를 만듭니다.
+
+    area는 지도를 네 구역(사분면)으로 나눈 번호(0~3)이고, 내 집과 반달곰 커피는 공사장이 아닌 칸에 놓입니다.
+
+    Returns:
+        (area_map_df, area_struct_df) - 두 DataFrame 모두 (x, y) 순서로 정렬됨
+    """
+    if width < 2 or height < 2:
+        raise ValueError(f'지도 크기는 2x2 이상이어야 합니다: {width}x{height}')
+    if cafes < 1 or cafes + 1 > width * height:
+        raise ValueError(f'반달곰 커피 개수가 올바르지 않습니다: {cafes}')
+
+    rng = np.random.default_rng(seed)
+    cells = width * height
+    xs = np.repeat(np.arange(1, width + 1, dtype=np.int32), height)
+    ys = np.tile(np.arange(1, height + 1, dtype=np.int32), width)
+
+    construction = (rng.random(cells) < obstacle_density).astype(np.int8)
+    category = np.where(rng.random(cells) < structure_density,
+                        rng.integers(1, 3, cells), 0).astype(np.int8)  # 아파트/빌딩
+
+    # 내 집 1개와 반달곰 커피 cafes개 (공사장 칸이면 공사장을 치움)
+    special = rng.choice(cells, size=cafes + 1, replace=False)
+    category[special[0]] = 3
+    category[special[1:]] = 4
+    construction[special] = 0
+
+    area = ((xs > width // 2).astype(np.int8) + 2 * (ys > height // 2)).astype(np.int8)
+
+    area_map_df = pd.DataFrame({'x': xs, 'y': ys, 'ConstructionSite': construction})
+    area_struct_df = pd.DataFrame({'x': xs, 'y': ys, 'category': category, 'area': area})
+    return area_map_df, area_struct_df
+
+
+def _write_csv(df, path):
+    """data/의 원본 파일처럼 BOM이 있는 UTF-8로 나누어 씁니다."""
+    for start in range(0, max(len(df), 1), WRITE_CHUNK):
+        chunk = df.iloc[start:start + WRITE_CHUNK]
+        if start == 0:
+            chunk.to_csv(path, index=False, encoding='utf-8-sig')
+        else:
+            chunk.to_csv(path, index=False, header=False, mode='a', encoding='utf-8')
+
+
+def write_map_files(data_dir, width, height, obstacle_density=0.2, cafes=2, structure_density=0.03, seed=0):
+    """
+    data_dir에 세 입력 CSV를 씁니다.
+
+    Returns:
+        {이름: 경로} 딕셔너리 (caffee_map.INPUT_FILES와 같은 키)
+    """
+    area_map_df, area_struct_df = generate_map(width, height, obstacle_density, cafes, structure_density, seed)
+    os.makedirs(data_dir, exist_ok=True)
+    paths = {name: os.path.join(data_dir, f'{name}.csv') for name in ('area_map', 'area_struct', 'area_category')}
+
+    _write_csv(area_map_df, paths['area_map'])
+    _write_csv(area_struct_df, paths['area_struct'])
+    # 원본처럼 쉼표 뒤에 공백이 있는 형식 (clean_category_data가 정리함)
+    with open(paths['area_category'], 'w', encoding='utf-8') as f:
+        f.write('category, struct\n')
+        for code, name in CATEGORIES.items():
+            f.write(f'{code}, {name}\n')
+    return paths
+
+
+def parse_size(text):
+    """'500' 또는 '800x600' 형식의 지도 크기를 (width, height)로 변환합니다."""
+    width, _, height = text.lower().partition('x')
+    try:
+        return int(width), int(height or width)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'지도 크기 형식이 올바르지 않습니다: {text}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='벤치마크용 합성 지도 데이터 생성')
+    parser.add_argument('size', type=parse_size, help='지도 크기 (예: 500 또는 800x600)')
+    parser.add_argument('--out-dir', default='data_synth', help='CSV를 저장할 폴더 (기본값: data_synth)')
+    parser.add_argument('--density', type=float, default=0.2, help='공사장 비율 (기본값: 0.2)')
+    parser.add_argument('--cafes', type=int, default=2, help='반달곰 커피 개수 (기본값: 2)')
+    parser.add_argument('--seed', type=int, default=0, help='난수 seed (기본값: 0)')
+    args = parser.parse_args()
+
+    paths = write_map_files(args.out_dir, *args.size, obstacle_density=args.density, cafes=args.cafes, seed=args.seed)
+    for path in paths.values():
+        print(f'{path} 저장 완료')
@@ -0,0 +1,222 @@
+"""
+여러 확대 수준의 지도 타일 피라미드 (z/x/y)
+
+큰 지도를 하나의 거대한 PNG 대신 TILE_SIZE x TILE_SIZE 크기의 타일들로 저장합니다.
+가장 큰 확대 수준(z_max)의 타일은 map_raster의 sprite로 해당 부분만 직접 그리고,
+그보다 작은 수준의 타일은 아래 수준의 타일 4개를 이어 붙여 절반으로 줄여 만듭니다.
+따라서 전체 해상도 이미지를 메모리에 만들지 않습니다.
+
+    <출력 폴더>/<z>/<x>/<y>.png   (z = 0이 지도 전체를 담은 타일 하나)
+    <출력 폴더>/tiles.json        (타일 배치 정보와 타일별 내용 해시)
+
+각 타일의 해시는 z_max에서는 타일에 걸치는 칸들의 종류, 그 아래 수준에서는 자식 타일 해시로 정해지므로
+다시 실행하면 칸이 바뀐 타일과 그 상위 타일만 다시 그립니다. 타일은 작업 프로세스들이 나누어 그립니다.
+"""
+
+import hashlib
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from map_raster import COLORS, PIXELS_PER_CELL, build_sprites, cell_kinds, render_window
+from map_report import report
+
+
+TILE_SIZE = 256
+TILES_DIR = 'tiles'
+TILES_INDEX = 'tiles.json'
+TILES_VERSION = 1
+
+# 작업 프로세스마다 한 번만 받는 지도 정보 (_init_worker에서 설정)
+_worker = {}
+
+
+def tile_path(out_dir, z, x, y):
+    return os.path.join(out_dir, str(z), str(x), f'{y}.png')
+
+
+def _init_worker(kinds, pixels_per_cell, out_dir):
+    _worker['kinds'] = kinds
+    _worker['sprites'] = build_sprites(pixels_per_cell) if kinds is not None else None
+    _worker['out_dir'] = out_dir
+
+
+def _save_tile(image, z, x, y):
+    """타일을 임시 파일에 쓴 뒤 교체하여, 읽는 쪽이 쓰다 만 타일을 보지 않도록 합니다."""
+    path = tile_path(_worker['out_dir'], z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    Image.fromarray(image).save(tmp_path, format='PNG')
+    os.replace(tmp_path, path)
+
+
+def _render_base_tile(task):
+    """z_max 타일 하나를 sprite로 직접 그립니다."""
+    z, x, y = task
+    image = render_window(_worker['kinds'], _worker['sprites'], y * TILE_SIZE, x * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+    _save_tile(image, z, x, y)
+
+
+def _render_parent_tile(task):
+    """아래 수준의 타일 4개를 이어 붙여 절반 크기로 줄인 타일을 만듭니다. (없는 자식은 흰색)"""
+    z, x, y = task
+    merged = np.empty((TILE_SIZE * 2, TILE_SIZE * 2, 3), dtype=np.uint8)
+    merged[:] = COLORS['white']
+    for dy in (0, 1):
+        for dx in (0, 1):
+            path = tile_path(_worker['out_dir'], z + 1, 2 * x + dx, 2 * y + dy)
+            if os.path.exists(path):
+                with Image.open(path) as child:
+                    merged[dy * TILE_SIZE:(dy + 1) * TILE_SIZE,
+                           dx * TILE_SIZE:(dx + 1) * TILE_SIZE] = np.asarray(child.convert('RGB'))
+    # 2 x 2 픽셀 평균 (반올림)
+    total = merged[0::2, 0::2].astype(np.uint16) + merged[0::2, 1::2] + merged[1::2, 0::2] + merged[1::2, 1::2]
+    _save_tile(((total + 2) // 4).astype(np.uint8), z, x, y)
+
+
+def pyramid_shape(grid, pixels_per_cell=PIXELS_PER_CELL):
+    """
+    z_max 수준의 타일 개수와 확대 수준 수를 계산합니다.
+
+    Returns:
+        (columns, rows, zoom_levels) - z는 0 ~ zoom_levels - 1
+    """
+    columns = math.ceil((grid.width + 1) * pixels_per_cell / TILE_SIZE)
+    rows = math.ceil((grid.height + 1) * pixels_per_cell / TILE_SIZE)
+    return columns, rows, math.ceil(math.log2(max(columns, rows))) + 1
+
+
+def base_tile_hashes(kinds, pixels_per_cell, columns, rows, z):
+    """z_max 타일마다 타일에 걸치는 칸 종류의 해시를 계산합니다. ((z, x, y) -> 해시)"""
+    size = pixels_per_cell
+    half = size // 2
+    hashes = {}
+    for x in range(columns):
+        k0 = (x * TILE_SIZE + half) // size
+        k1 = ((x + 1) * TILE_SIZE - 1 + half) // size + 1
+        for y in range(rows):
+            b0 = (y * TILE_SIZE + half) // size
+            b1 = ((y + 1) * TILE_SIZE - 1 + half) // size + 1
+            block = np.ascontiguousarray(kinds[b0:b1, k0:k1])
+            digest = hashlib.blake2b(block.tobytes(), digest_size=12)
+            digest.update(f'{b0},{k0},{block.shape}'.encode())
+            hashes[(z, x, y)] = digest.hexdigest()
+    return hashes
+
+
+def parent_tile_hashes(child_hashes, z, columns, rows):
+    """자식 타일 해시로 z 수준 타일(columns x rows)의 해시를 계산합니다."""
+    hashes = {}
+    for x in range(columns):
+        for y in range(rows):
+            digest = hashlib.blake2b(digest_size=12)
+            for dy in (0, 1):
+                for dx in (0, 1):
+                    digest.update(child_hashes.get((z + 1, 2 * x + dx, 2 * y + dy), '-').encode())
+            hashes[(z, x, y)] = digest.hexdigest()
+    return hashes
+
+
+def load_tile_index(out_dir):
+    """이전 실행의 tiles.json을 읽습니다. 없거나 읽을 수 없으면 None을 반환합니다."""
+    path = os.path.join(out_dir, TILES_INDEX)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError) as e:
+        report.warn(f'경고: 타일 목록을 읽을 수 없어 모든 타일을 다시 그립니다: {e}')
+        return None
+    if not isinstance(index, dict) or index.get('version') != TILES_VERSION:
+        return None
+    index['tiles'] = {tuple(int(v) for v in key.split('/')): value for key, value in index.get('tiles', {}).items()}
+    return index
+
+
+def _run_tasks(function, tasks, workers, initargs):
+    """tasks를 작업 프로세스들에 나누어 실행합니다. (workers가 1이면 현재 프로세스에서 실행)"""
+    if not tasks:
+        return
+    if workers == 1 or len(tasks) == 1:
+        _init_worker(*initargs)
+        for task in tasks:
+            function(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as executor:
+        chunksize = max(1, len(tasks) // (workers * 4))
+        # 예외가 있으면 여기서 다시 발생
+        for _ in executor.map(function, tasks, chunksize=chunksize):
+            pass
+
+
+def render_tile_pyramid(grid, out_dir=TILES_DIR, pixels_per_cell=PIXELS_PER_CELL, workers=None, force=False):
+    """
+    지도를 z/x/y 타일 피라미드로 저장합니다.
+
+    Arguments:
+        pixels_per_cell: z_max 수준에서 한 칸의 픽셀 수 (map_raster.render_map과 같은 의미)
+        workers: 작업 프로세스 수 (None이면 CPU 수)
+        force: 이전 해시와 같아도 모든 타일을 다시 그림
+
+    Returns:
+        {'zoom_levels', 'tiles', 'rendered', 'removed'} 요약 딕셔너리
+    """
+    if pixels_per_cell < 4 or pixels_per_cell % 2:
+        raise ValueError(f'pixels_per_cell은 4 이상의 짝수여야 합니다: {pixels_per_cell}')
+    workers = workers or os.cpu_count() or 1
+
+    kinds = cell_kinds(grid)
+    columns, rows, zoom_levels = pyramid_shape(grid, pixels_per_cell)
+    z_max = zoom_levels - 1
+
+    # 수준별 타일 해시 (z_max부터 0까지)
+    levels = {z_max: base_tile_hashes(kinds, pixels_per_cell, columns, rows, z_max)}
+    level_shape = {z_max: (columns, rows)}
+    for z in range(z_max - 1, -1, -1):
+        child_columns, child_rows = level_shape[z + 1]
+        level_shape[z] = (math.ceil(child_columns / 2), math.ceil(child_rows / 2))
+        levels[z] = parent_tile_hashes(levels[z + 1], z, *level_shape[z])
+
+    previous = load_tile_index(out_dir)
+    layout = {'tile_size': TILE_SIZE, 'pixels_per_cell': pixels_per_cell, 'zoom_levels': zoom_levels,
+              'x_min': grid.x_min, 'y_min': grid.y_min, 'width': grid.width, 'height': grid.height}
+    # 타일 배치가 달라졌으면 이전 해시는 쓸 수 없음
+    reusable = previous and not force and all(previous.get(name) == value for name, value in layout.items())
+    old_hashes = previous['tiles'] if reusable else {}
+
+    def changed(z):
+        return [tile for tile, value in levels[z].items()
+                if old_hashes.get(tile) != value or not os.path.exists(tile_path(out_dir, *tile))]
+
+    rendered = 0
+    base_tasks = changed(z_max)
+    _run_tasks(_render_base_tile, base_tasks, workers, (kinds, pixels_per_cell, out_dir))
+    rendered += len(base_tasks)
+    for z in range(z_max - 1, -1, -1):
+        tasks = changed(z)
+        _run_tasks(_render_parent_tile, tasks, workers, (None, pixels_per_cell, out_dir))
+        rendered += len(tasks)
+
+    # 지도가 작아져 더 이상 쓰지 않는 타일 삭제
+    tiles = {tile: value for z in sorted(levels) for tile, value in levels[z].items()}
+    removed = 0
+    for tile in previous['tiles'] if previous else ():
+        path = tile_path(out_dir, *tile)
+        if tile not in tiles and os.path.exists(path):
+            os.remove(path)
+            removed += 1
+
+    os.makedirs(out_dir, exist_ok=True)
+    index_path = os.path.join(out_dir, TILES_INDEX)
+    tmp_path = f'{index_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': TILES_VERSION, **layout,
+                   'tiles': {'/'.join(map(str, tile)): value for tile, value in tiles.items()}}, f)
+    os.replace(tmp_path, index_path)
+
+    return {'zoom_levels': zoom_levels, 'tiles': len(tiles), 'rendered': rendered, 'removed': removed}
@@ -0,0 +1,290 @@
+"""
+여러 반달곰 커피를 차례로 들르는 경로(tour) 계획
+
+1. 거리 행렬: 내 집과 카페들(핵심 위치)마다 BFS 거리장을 한 번씩 만들어(작업 프로세스로 병렬)
+   모든 위치 쌍의 최단 거리를 구합니다. 행렬은 지도 내용과 위치 목록의 해시를 키로
+   .map_cache/<키>.tour.npy에 저장하므로, 같은 지도에서는 다음 실행부터 BFS를 하지 않습니다.
+2. 방문 순서: 카페가 EXACT_LIMIT개 이하이면 Held-Karp 동적 계획법으로 가장 짧은 순서를 구하고,
+   그보다 많으면 최근접 이웃 순서에서 시작해 2-opt와 Or-opt로 더 이상 짧아지지 않을 때까지 고칩니다.
+3. 경로: 순서대로 이웃한 두 위치 사이의 BFS 경로를 이어 붙입니다.
+
+격자에서는 두 칸 사이의 거리가 방향과 관계없이 같으므로 2-opt/Or-opt는 대칭 거리로 계산합니다.
+단, 공사장 위의 내 집에서는 나갈 수만 있고 돌아올 수는 없으므로, 서로 갈 수 없는 위치가 남으면
+음수(UNREACHABLE) 거리로 계획하지 않고 ValueError를 발생시킵니다.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from map_cache import CACHE_DIR, evict_stale, map_digest
+from map_cafe_field import NearestCafeField
+from map_direct_save import bfs_path
+from map_report import report
+
+
+EXACT_LIMIT = 12  # Held-Karp는 O(2^n * n^2)이므로 이 개수까지만 정확히 풂
+UNREACHABLE = -1
+# 위치 수 x 지도 칸 수가 이보다 작으면 작업 프로세스를 띄우는 비용이 BFS보다 크므로 현재 프로세스에서 계산
+PARALLEL_MIN_CELLS = 4_000_000
+
+# 작업 프로세스마다 한 번만 받는 지도 정보 (_init_worker에서 설정)
+_worker = {}
+
+
+def _init_worker(grid, locations):
+    _worker['grid'] = grid
+    _worker['locations'] = locations
+
+
+def _distance_column(index):
+    """locations[index]까지의 거리장을 만들어 모든 위치에서의 거리를 반환합니다."""
+    field = NearestCafeField.build(_worker['grid'], [_worker['locations'][index]])
+    distances = []
+    for pos in _worker['locations']:
+        _, distance = field.nearest(pos)
+        distances.append(UNREACHABLE if distance is None else distance)
+    return distances
+
+
+def tour_matrix_path(grid, locations, cache_dir=CACHE_DIR):
+    return os.path.join(cache_dir, f'{map_digest(grid, locations)}.tour.npy')
+
+
+def distance_matrix(grid, locations, workers=None, cache_dir=CACHE_DIR):
+    """
+    위치들 사이의 최단 거리 행렬을 만듭니다. (캐시가 있으면 불러옴)
+
+    Arguments:
+        locations: 좌표 리스트 (첫 번째는 출발점)
+        workers: 작업 프로세스 수 (None이면 지도가 PARALLEL_MIN_CELLS 기준보다 클 때만 CPU 수, 1이면 현재 프로세스)
+
+    Returns:
+        matrix[i, j] = locations[i]에서 locations[j]까지의 칸 수 (int32, 도달 불가 UNREACHABLE)
+    """
+    locations = [(int(x), int(y)) for x, y in locations]
+    path = tour_matrix_path(grid, locations, cache_dir)
+    if os.path.exists(path):
+        try:
+            matrix = np.load(path)
+            if matrix.shape == (len(locations), len(locations)):
+                report.info('캐시된 거리 행렬을 불러왔습니다.')
+                os.utime(path, None)  # 최근 사용 시각 갱신 (eviction 기준)
+                return matrix
+        except (OSError, ValueError) as e:
+            report.warn(f'경고: 거리 행렬 캐시를 읽을 수 없어 다시 계산합니다: {e}')
+
+    with report.timed('tour.matrix'):
+        indices = range(len(locations))
+        if workers is None:
+            parallel = len(locations) * grid.size >= PARALLEL_MIN_CELLS and (os.cpu_count() or 1) > 1
+        else:
+            parallel = workers > 1
+        if not parallel or len(locations) < 3:
+            _init_worker(grid, locations)
+            columns = [_distance_column(i) for i in indices]
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(grid, locations)) as executor:
+                columns = list(executor.map(_distance_column, indices))
+    matrix = np.array(columns, dtype=np.int32).T
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # 다른 프로세스가 반쯤 쓴 파일을 읽지 않도록 임시 파일에 쓴 뒤 교체
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, path)
+        evict_stale(cache_dir, keep=os.path.basename(path).split('.', 1)[0])
+    except OSError as e:
+        report.warn(f'경고: 거리 행렬 캐시 저장 실패: {e}')
+    return matrix
+
+
+def tour_length(order, matrix):
+    """방문 순서(위치 번호 리스트)의 총 거리"""
+    return int(sum(matrix[a, b] for a, b in zip(order, order[1:])))
+
+
+def _with_end(matrix, return_home):
+    """
+    도착점 번호 n을 덧붙인 (n + 1) x (n + 1) 행렬을 만듭니다.
+
+    돌아오는 tour이면 도착점은 출발점과 같고, 돌아오지 않으면 어느 위치에서든 거리 0입니다.
+    이렇게 하면 두 경우 모두 "0에서 출발해 n에 도착하는 경로" 하나로 풀 수 있습니다.
+    """
+    n = len(matrix)
+    extended = np.zeros((n + 1, n + 1), dtype=np.int64)
+    extended[:n, :n] = matrix
+    if return_home:
+        extended[:n, n] = matrix[:, 0]
+        extended[n, :n] = matrix[0, :]
+    return extended
+
+
+def held_karp(matrix, return_home=False):
+    """
+    Held-Karp 동적 계획법으로 0번에서 출발해 나머지를 모두 들르는 가장 짧은 순서를 구합니다.
+
+    Returns:
+        방문 순서 (0으로 시작, return_home이면 0으로 끝남)
+    """
+    n = len(matrix)
+    if n <= 2:
+        return list(range(n)) + ([0] if return_home and n > 1 else [])
+
+    dist = _with_end(matrix, return_home)
+    m = n - 1  # 0번을 뺀 위치 수 (비트 k = 위치 k + 1)
+    full = (1 << m) - 1
+    inf = np.iinfo(np.int64).max // 4
+    cost = np.full((1 << m, m), inf, dtype=np.int64)
+    parent = np.full((1 << m, m), -1, dtype=np.int64)
+    inner = dist[1:n, 1:n]
+    for k in range(m):
+        cost[1 << k, k] = dist[0, k + 1]
+
+    # cost[mask, k] = 0에서 출발해 mask의 위치들을 모두 들르고 위치 k + 1에서 끝나는 최소 거리
+    for mask in range(1, full + 1):
+        row = cost[mask]
+        if not (row < inf).any():
+            continue
+        for k in range(m):
+            bit = 1 << k
+            if mask & bit:
+                continue
+            candidates = np.where(row < inf, row + inner[:, k], inf)
+            best = int(candidates.argmin())
+            if candidates[best] < cost[mask | bit, k]:
+                cost[mask | bit, k] = candidates[best]
+                parent[mask | bit, k] = best
+
+    last = int((cost[full] + dist[1:n, n]).argmin())
+    order = []
+    mask = full
+    while last >= 0:
+        order.append(last + 1)
+        last, mask = int(parent[mask, last]), mask & ~(1 << last)
+    order.reverse()
+    return [0] + order + ([0] if return_home else [])
+
+
+def nearest_neighbor(matrix):
+    """0번에서 출발해 가장 가까운 안 들른 위치로 차례로 가는 순서"""
+    order = [0]
+    left = set(range(1, len(matrix)))
+    while left:
+        current = order[-1]
+        following = min(left, key=lambda j: (matrix[current, j], j))
+        order.append(following)
+        left.remove(following)
+    return order
+
+
+def improve_tour(order, matrix, return_home=False):
+    """
+    2-opt(구간 뒤집기)와 Or-opt(1~3개 구간 옮기기)로 더 이상 짧아지지 않을 때까지 순서를 고칩니다.
+
+    Returns:
+        고친 방문 순서 (return_home이면 0으로 끝남)
+    """
+    n = len(matrix)
+    dist = _with_end(matrix, return_home).tolist()  # 안쪽 반복문에서는 list 색인이 빠름
+    seq = [0] + [j for j in order if j != 0] + [n]  # 양 끝(출발점, 도착점)은 고정
+
+    improved = True
+    while improved:
+        improved = False
+
+        # 2-opt: seq[i..j]를 뒤집음
+        for i in range(1, len(seq) - 2):
+            for j in range(i + 1, len(seq) - 1):
+                a, b, c, d = seq[i - 1], seq[i], seq[j], seq[j + 1]
+                if dist[a][c] + dist[b][d] < dist[a][b] + dist[c][d]:
+                    seq[i:j + 1] = reversed(seq[i:j + 1])
+                    improved = True
+
+        # Or-opt: seq[i:i + size]를 떼어 다른 두 위치 사이에 (필요하면 뒤집어) 넣음
+        for size in (1, 2, 3):
+            i = 1
+            while i + size < len(seq):
+                segment = seq[i:i + size]
+                before, after = seq[i - 1], seq[i + size]
+                removed = dist[before][segment[0]] + dist[segment[-1]][after] - dist[before][after]
+                rest = seq[:i] + seq[i + size:]
+                best, best_at, best_segment = 0, None, None
+                for k in range(len(rest) - 1):
+                    a, b = rest[k], rest[k + 1]
+                    for candidate in (segment, segment[::-1]):
+                        gain = removed - (dist[a][candidate[0]] + dist[candidate[-1]][b] - dist[a][b])
+                        if gain > best:
+                            best, best_at, best_segment = gain, k + 1, candidate
+                if best_at is not None:
+                    seq = rest[:best_at] + best_segment + rest[best_at:]
+                    improved = True
+                i += 1
+
+    return seq[:-1] + ([0] if return_home else [])
+
+
+def solve_tour(matrix, return_home=False):
+    """거리 행렬로 방문 순서를 정합니다. (작으면 정확, 크면 근사)"""
+    if (np.asarray(matrix) < 0).any():
+        raise ValueError('서로 갈 수 없는 위치(UNREACHABLE)가 있는 거리 행렬로는 방문 순서를 정할 수 없습니다.')
+    if len(matrix) - 1 <= EXACT_LIMIT:
+        return held_karp(matrix, return_home)
+    return improve_tour(nearest_neighbor(matrix), matrix, return_home)
+
+
+def plan_tour(grid, home, cafes, return_home=False, workers=None):
+    """
+    내 집에서 출발해 카페들을 모두 들르는 경로를 계획합니다.
+
+    집에서 갈 수 없는 카페는 경고를 남기고 뺍니다. 남은 카페끼리(return_home이면 카페에서 집으로)
+    갈 수 없는 쌍이 있으면 ValueError를 발생시킵니다. (예: 공사장 위의 내 집에서만 이어지는 카페들)
+
+    Returns:
+        (path, stops, length)
+          - path: 전체 경로 좌표 리스트
+          - stops: 들르는 곳(카페, return_home이면 마지막은 내 집)의 path 인덱스 리스트 (방문 순서)
+          - length: 총 이동 칸 수
+        카페에 하나도 갈 수 없으면 (None, [], None)
+    """
+    locations = [tuple(home)] + [tuple(cafe) for cafe in dict.fromkeys(map(tuple, cafes))]
+    matrix = distance_matrix(grid, locations, workers)
+
+    reachable = [0] + [j for j in range(1, len(locations)) if matrix[0, j] != UNREACHABLE]
+    for j in range(1, len(locations)):
+        if matrix[0, j] == UNREACHABLE:
+            report.warn(f'경고: 반달곰 커피 {locations[j]}에는 갈 수 없어 tour에서 뺍니다.')
+    if len(reachable) < 2:
+        return None, [], None
+
+    sub = matrix[np.ix_(reachable, reachable)]  # 고급 색인이므로 복사본
+    np.fill_diagonal(sub, 0)  # 공사장 위의 내 집은 자기 자신까지도 UNREACHABLE로 계산됨
+    if not return_home:
+        sub[:, 0] = 0  # 돌아오지 않으면 카페 -> 집 거리는 쓰지 않음
+    unreachable = [(locations[reachable[i]], locations[reachable[j]]) for i, j in np.argwhere(sub == UNREACHABLE)]
+    if unreachable:
+        pairs = ', '.join(f'{a} -> {b}' for a, b in unreachable[:5])
+        raise ValueError(f'서로 갈 수 없는 위치가 있어 tour를 만들 수 없습니다: {pairs}'
+                         + (f' 외 {len(unreachable) - 5}개' if len(unreachable) > 5 else ''))
+
+    with report.timed('tour.solve'):
+        order = solve_tour(sub, return_home)
+    order = [reachable[i] for i in order]
+
+    # 이웃한 두 위치 사이의 경로를 이어 붙임 (이어지는 점은 한 번만, 구간마다 로그를 남기지 않음)
+    path = [locations[0]]
+    stops = []
+    for a, b in zip(order, order[1:]):
+        leg, _ = bfs_path(locations[a], [locations[b]], grid)
+        path.extend(leg[1:])
+        stops.append(len(path) - 1)
+
+    length = tour_length(order, matrix)
+    report.count('tour_stops', len(stops))
+    report.count('tour_length', length)
+    report.info(f'카페 {len(reachable) - 1}곳을 들르는 경로 길이: {length}칸 ({len(path)} 단계)')
+    return path, stops, length
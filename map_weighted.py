@@ -0,0 +1,243 @@
+"""
+칸별 이동 비용이 있는 경로 탐색 (Dial의 bucket queue Dijkstra)
+
+칸에 들어갈 때 드는 비용이 작은 양의 정수(1 ~ MAX_COST)이면, heapq 대신
+거리 값마다 bucket(리스트)을 두고 거리 순서대로 bucket을 비우는 방식으로 Dijkstra를 수행할 수 있습니다.
+bucket은 (최대 비용 + 1)개를 원형으로 돌려 쓰므로 push/pop이 O(1)이고, BFS와 거의 같은 속도로 동작합니다.
+
+A* 변형은 compute_heuristic_map처럼 목표에서 역방향 BFS로 구한 칸 수 거리(map_cache 캐시 사용)에
+가장 작은 칸 비용을 곱해 휴리스틱으로 씁니다. 이 휴리스틱은 일관적(consistent)이므로
+f 값도 bucket queue로 꺼낼 수 있습니다.
+
+비용 배열은 cell id로 색인되며, 지나갈 수 없는 칸(공사장, 지도 밖)은 0입니다.
+같은 지도에서 여러 번 탐색할 때는 CostTable로 한 번만 변환해 두고 넘깁니다.
+"""
+
+import weakref
+
+import numpy as np
+
+from map_cache import cached_field
+from map_report import report
+
+
+MAX_COST = 255  # bucket 수가 비용 최대값에 비례하므로 작은 정수 비용만 허용
+
+
+def cell_costs(grid, area_costs=None, near_construction=0, base=1):
+    """
+    지도 격자의 칸별 이동 비용 배열을 만듭니다.
+
+    Arguments:
+        area_costs: {area 번호: 비용} - 해당 area 칸의 비용 (나머지는 base)
+        near_construction: 공사장과 맞닿은 칸에 더할 비용
+
+    Returns:
+        cell id로 색인된 int32 배열 (지나갈 수 없는 칸은 0)
+    """
+    costs = np.full(grid.size, base, dtype=np.int32)
+    for area, cost in (area_costs or {}).items():
+        costs[grid.area == area] = cost
+    if near_construction:
+        # 테두리 칸은 공사장이 아니므로 np.roll이 반대편으로 넘어가도 영향 없음
+        near = np.zeros(grid.size, dtype=bool)
+        for offset in grid.offsets:
+            near |= np.roll(grid.construction, offset)
+        costs[near] += near_construction
+    return checked_costs(grid, costs)
+
+
+def costs_from_column(grid, complete_df, column):
+    """통합 데이터의 column(칸별 정수 비용)을 비용 배열로 바꿉니다. (없는 칸은 비용 1)"""
+    costs = np.ones(grid.size, dtype=np.int32)
+    ids = grid.cell_ids(complete_df['x'].to_numpy(), complete_df['y'].to_numpy())
+    costs[ids] = complete_df[column].to_numpy(dtype=np.int32)
+    return checked_costs(grid, costs)
+
+
+def checked_costs(grid, costs):
+    """지나갈 수 없는 칸을 0으로 만들고, 나머지 칸의 비용이 1 ~ MAX_COST인지 확인합니다."""
+    costs = np.where(grid.passable, costs, 0).astype(np.int32)
+    open_costs = costs[grid.passable]
+    if len(open_costs) and (open_costs.min() < 1 or open_costs.max() > MAX_COST):
+        raise ValueError(f'이동 비용은 1 ~ {MAX_COST} 사이의 정수여야 합니다: '
+                         f'{open_costs.min()} ~ {open_costs.max()}')
+    return costs
+
+
+class CostTable:
+    """
+    비용 배열을 bucket queue 탐색에 쓰는 형태로 한 번만 바꿔 둔 것
+
+    탐색마다 지도 크기만큼 변환하지 않도록, 같은 지도에서 여러 번 탐색할 때 만들어 두고 재사용합니다.
+    (prepare_engine, 서버의 MapState)
+
+    Attributes:
+        costs: 원래 비용 배열
+        step: 칸별 비용 bytes (bytes 색인이 memoryview(int32) 색인보다 빠름, 비용은 MAX_COST 이하이므로 uint8에 들어감)
+        max_cost: 가장 큰 칸 비용
+        min_cost: 지나갈 수 있는 칸 중 가장 작은 비용 (A* 휴리스틱 배율, 지나갈 칸이 없으면 0)
+    """
+
+    def __init__(self, grid, costs):
+        self.costs = costs
+        self.step = costs.astype(np.uint8).tobytes()
+        self.max_cost = int(costs.max()) if len(costs) else 0
+        open_costs = costs[grid.passable]
+        self.min_cost = int(open_costs.min()) if len(open_costs) else 0
+        self._heuristics = weakref.WeakKeyDictionary()  # 거리장 -> dist 리스트
+
+    @classmethod
+    def build(cls, grid, area_costs=None, near_construction=0, base=1):
+        """cell_costs로 비용 배열을 만들어 CostTable로 바꿉니다."""
+        return cls(grid, cell_costs(grid, area_costs, near_construction, base))
+
+    def heuristic(self, field):
+        """
+        거리장의 dist를 list로 바꿔 돌려줍니다. (list 색인이 배열 색인보다 빠름)
+
+        같은 거리장은 한 번만 바꾸고, 거리장이 사라지면 list도 함께 버립니다.
+        """
+        h = self._heuristics.get(field)
+        if h is None:
+            h = self._heuristics[field] = np.asarray(field.dist).tolist()
+        return h
+
+
+def _bucket_search(start, targets, grid, table, h=None, scale=0):
+    """
+    bucket queue로 start에서 가장 가까운(비용 기준) 목표까지 탐색합니다.
+
+    h(CostTable.heuristic)가 있으면 f = g + scale * h[칸] 순서로 꺼냅니다. (A*)
+    거리와 부모는 dict에 두므로 탐색 준비에 지도 크기만큼의 시간이나 메모리가 들지 않습니다.
+    칸은 거리가 줄어들 때만 다시 넣으므로, 꺼낸 칸의 f가 지금 bucket 값과 다르면 이미 확장한 낡은 항목입니다.
+
+    Returns:
+        (goal, total_cost, parent) - 목표에 닿지 못하면 goal은 None
+    """
+    cost = table.step
+    max_step = table.max_cost + scale  # 한 번 이동할 때 f가 늘어나는 최대값
+    num_buckets = max_step + 1
+    buckets = [[] for _ in range(num_buckets)]
+
+    unvisited = np.iinfo(np.int32).max
+    dist = {start: 0}
+    parent = {start: -1}
+    offsets = grid.offsets
+    track = report.instrumenting
+    max_open = 1
+    expanded = 0
+    stale = 0
+
+    first = scale * h[start] if h is not None else 0
+    buckets[first % num_buckets].append(start)
+    pending = 1
+    current = first
+    goal = None
+
+    while pending:
+        bucket = buckets[current % num_buckets]
+        while bucket:
+            if track and pending > max_open:
+                max_open = pending
+            cell = bucket.pop()
+            pending -= 1
+            g = dist[cell]
+            if (g if h is None else g + scale * h[cell]) != current:
+                stale += 1
+                continue
+            expanded += 1
+            if cell in targets:
+                goal = cell
+                break
+
+            # 이미 확장한 칸은 dist가 더 작거나 같으므로 ng < dist 비교만으로 걸러짐
+            # key - current <= max_step 이므로 원형 bucket이 겹치지 않음
+            if h is None:
+                for offset in offsets:
+                    neighbor = cell + offset
+                    step = cost[neighbor]
+                    if step and g + step < dist.get(neighbor, unvisited):
+                        ng = g + step
+                        dist[neighbor] = ng
+                        parent[neighbor] = cell
+                        buckets[ng % num_buckets].append(neighbor)
+                        pending += 1
+            else:
+                for offset in offsets:
+                    neighbor = cell + offset
+                    step = cost[neighbor]
+                    estimate = h[neighbor]  # 목표에 닿을 수 없는 칸은 -1
+                    if step and estimate >= 0 and g + step < dist.get(neighbor, unvisited):
+                        ng = g + step
+                        dist[neighbor] = ng
+                        parent[neighbor] = cell
+                        buckets[(ng + scale * estimate) % num_buckets].append(neighbor)
+                        pending += 1
+        if goal is not None:
+            break
+        current += 1
+
+    if track:
+        pushes = expanded + stale + pending
+        report.search('dial-astar' if h is not None else 'dial', expanded=expanded, pushes=pushes,
+                      re_pushes=pushes - len(parent),
+                      stale_pops=stale, max_open=max_open)
+
+    return goal, (dist[goal] if goal is not None else None), parent
+
+
+def _restore_path(grid, start, goal, parent):
+    path = []
+    node = goal
+    while node != start:
+        path.append(grid.coord(node))
+        node = parent[node]
+    path.append(grid.coord(start))
+    path.reverse()
+    return path
+
+
+def weighted_shortest_path(start_pos, target_positions, grid, costs, use_heuristic=False, field=None):
+    """
+    이동 비용 합이 가장 작은 목표까지의 경로를 찾습니다.
+
+    Arguments:
+        costs: cell_costs / costs_from_column으로 만든 비용 배열, 또는 그것으로 만든 CostTable
+               (같은 지도에서 여러 번 탐색하면 CostTable을 넘겨 변환을 한 번만 하도록 함)
+        use_heuristic: True이면 역방향 BFS 거리장 x 최소 비용을 휴리스틱으로 쓰는 A*
+        field: 휴리스틱에 쓸 target_positions까지의 거리장 (없으면 cached_field로 불러오거나 만듦)
+
+    Returns:
+        (path, target) - bfs_shortest_path와 같은 형식
+    """
+    start = grid.cell_id(*start_pos)
+    if start < 0:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+    targets = {grid.cell_id(*pos) for pos in target_positions}
+    table = costs if isinstance(costs, CostTable) else CostTable(grid, costs)
+
+    heuristic, scale = None, 0
+    if use_heuristic:
+        if field is None:
+            field = cached_field(grid, target_positions)
+        if field.dist[start] >= 0:
+            heuristic = table.heuristic(field)
+            scale = table.min_cost
+        elif grid.passable[start]:
+            # 이동 가능한 칸에서 목표까지 BFS로 닿지 않으면 비용 경로도 없음
+            report.info('경로를 찾을 수 없습니다.')
+            return None, None
+        # 공사장 위 출발점은 거리장에 없고, 이웃 칸들의 거리 차이가 커서 휴리스틱이 일관되지 않으므로
+        # heuristic 없이 'dial'과 같이 탐색
+
+    goal, total, parent = _bucket_search(start, targets, grid, table, heuristic, scale)
+    if goal is None:
+        report.info('경로를 찾을 수 없습니다.')
+        return None, None
+
+    path = _restore_path(grid, start, goal, parent)
+    report.count('path_cost', total)
+    report.info(f'최소 비용 경로 발견! 길이: {len(path)} 단계, 비용: {total}')
+    return path, grid.coord(goal)
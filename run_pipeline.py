@@ -0,0 +1,95 @@
+"""
+Stage 1~3 파이프라인 실행기
+
+세 Stage를 한 프로세스에서 차례로 실행합니다. Stage 1이 만든 통합 데이터는
+CSV를 다시 읽지 않고 메모리의 격자((grid, rows))로 Stage 2와 Stage 3에 바로 전달합니다.
+Stage 1을 건너뛰면 Stage 2/3은 단독 실행 때와 같이 번들이나 CSV를 읽습니다.
+"""
+
+import argparse
+import sys
+import time
+
+from caffee_map import CHUNK_SIZE, analyze_data
+from map_direct_save import ENGINES, main as find_path
+from map_draw import RENDERERS, create_map_visualization
+from map_report import add_report_arguments, report
+
+
+STAGES = ('1', '2', '3')
+
+
+def run_pipeline(stages=STAGES, engine='bfs', streaming=False, chunksize=CHUNK_SIZE, bundle=False,
+                 force=False, renderer='patches'):
+    """
+    선택한 Stage들을 순서대로 실행합니다.
+
+    Arguments:
+        stages: 실행할 Stage 번호들 ('1', '2', '3')
+        engine: Stage 3 경로 탐색 엔진
+        renderer: Stage 2/3 지도 그리기 방식 (map_draw.RENDERERS)
+        streaming, chunksize, bundle, force: Stage 1 옵션 (caffee_map.analyze_data 참고)
+
+    Returns:
+        Stage별 실행 시간(초) 딕셔너리
+    """
+    timings = {}
+    map_bundle = None  # Stage 1 결과 (grid, rows)
+
+    if '1' in stages:
+        started = time.perf_counter()
+        # 변경이 없어 Stage 1을 건너뛰었으면 None이 돌아오고 Stage 2/3은 기존 파일을 읽음
+        _, map_bundle = analyze_data(streaming=streaming, chunksize=chunksize,
+                                     bundle=bundle, return_bundle=True, force=force)
+        timings['1'] = time.perf_counter() - started
+
+    if '2' in stages:
+        started = time.perf_counter()
+        create_map_visualization(map_bundle, renderer)
+        report.info('\n Stage 2 완료: map.png 파일이 생성되었습니다.')
+        timings['2'] = time.perf_counter() - started
+
+    if '3' in stages:
+        started = time.perf_counter()
+        find_path(engine=engine, bundle=map_bundle, renderer=renderer)
+        timings['3'] = time.perf_counter() - started
+
+    return timings
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Stage 1~3 파이프라인 한 번에 실행')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='실행할 Stage 번호 (기본값: 1 2 3)')
+    parser.add_argument('--engine', choices=ENGINES, default='bfs',
+                        help='Stage 3 경로 탐색 엔진 (기본값: bfs)')
+    parser.add_argument('--renderer', choices=RENDERERS, default='patches',
+                        help='Stage 2/3 지도 그리기 방식 (기본값: patches)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stage 1에서 입력 CSV를 나누어 읽기')
+    parser.add_argument('--chunksize', type=int, default=CHUNK_SIZE,
+                        help=f'스트리밍 모드에서 한 번에 읽는 행 수 (기본값: {CHUNK_SIZE})')
+    parser.add_argument('--bundle', action='store_true',
+                        help='Stage 1에서 격자 번들도 저장 (다음 단독 실행용)')
+    parser.add_argument('--force', action='store_true',
+                        help='입력 파일이 바뀌지 않았어도 Stage 1을 다시 실행')
+    add_report_arguments(parser)
+    args = parser.parse_args()
+    report.configure(args)
+
+    try:
+        timings = run_pipeline(stages=args.stages, engine=args.engine, streaming=args.stream,
+                               chunksize=args.chunksize, bundle=args.bundle,
+                               force=args.force, renderer=args.renderer)
+
+        report.info('\n=== 파이프라인 완료 ===')
+        for stage, seconds in timings.items():
+            report.info(f'  - Stage {stage}: {seconds:.2f}초')
+        report.write(args.report)
+
+    except KeyboardInterrupt:
+        print('\n\n사용자에 의해 중단되었습니다.')
+        sys.exit(1)
+    except Exception as e:
+        print(f'\n프로그램 실행 중 오류 발생: {e}')
+        sys.exit(1)
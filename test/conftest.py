@@ -0,0 +1,64 @@
+"""
+테스트 공용 fixture
+
+지도는 문자열 행으로 적습니다. (x = 열 번호 + 1, y = 행 번호 + 1)
+    . 빈 칸   # 공사장   H 내 집   C 반달곰 커피
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from map_grid import STRUCT_CODES, Grid  # noqa: E402
+from map_report import report  # noqa: E402
+
+
+SYMBOLS = {'.': 'Empty', '#': 'Empty', 'H': 'MyHome', 'C': 'BandalgomCoffee'}
+
+
+def build_grid(rows):
+    """문자열 행 리스트로 Grid를 만듭니다."""
+    height, width = len(rows), len(rows[0])
+    xs = np.repeat(np.arange(1, width + 1), height)
+    ys = np.tile(np.arange(1, height + 1), width)
+    symbols = np.array([rows[y - 1][x - 1] for x, y in zip(xs, ys)])
+    construction = symbols == '#'
+    struct = np.array([STRUCT_CODES[SYMBOLS[s]] for s in symbols], dtype=np.int8)
+    return Grid.from_columns(xs, ys, construction, struct, np.zeros(len(xs), dtype=np.int16))
+
+
+def random_grid(width, height, density, seed):
+    """공사장이 density 비율로 흩어진 지도"""
+    rng = np.random.default_rng(seed)
+    rows = [''.join('#' if rng.random() < density else '.' for _ in range(width)) for _ in range(height)]
+    return build_grid(rows)
+
+
+def free_cells(grid):
+    """이동 가능한 칸의 좌표 리스트"""
+    return [grid.coord(int(cell)) for cell in np.flatnonzero(grid.passable)]
+
+
+@pytest.fixture(autouse=True)
+def quiet_workdir(tmp_path, monkeypatch):
+    """거리장 캐시(.map_cache)와 출력 파일이 임시 폴더에 생기도록 하고 콘솔 출력을 줄입니다."""
+    monkeypatch.chdir(tmp_path)
+    report.set_verbosity('quiet')
+    yield
+    report.set_verbosity('verbose')
+
+
+@pytest.fixture
+def make_grid():
+    return build_grid
+
+
+@pytest.fixture(params=[0, 1, 2])
+def maze(request):
+    """(grid, 이동 가능한 칸 좌표 리스트, 난수 생성기) - 공사장이 30%인 30x20 지도"""
+    grid = random_grid(30, 20, 0.3, request.param)
+    return grid, free_cells(grid), np.random.default_rng(request.param)
@@ -0,0 +1,133 @@
+"""Stage 1: 스트리밍 CSV 읽기, 매니페스트로 건너뛰기, cell id 병합을 확인합니다."""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from caffee_map import AREA_MAP_DTYPES, INPUT_FILES, analyze_data, merge_all_datasets, read_csv_in_chunks
+from map_grid import MAP_BUNDLE, MAP_CSV
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+
+def write_csv(text):
+    with open('area_map.csv', 'w') as f:
+        f.write(text)
+    return 'area_map.csv'
+
+
+@pytest.mark.parametrize('chunksize', [1, 2, 100])
+def test_read_csv_in_chunks(chunksize):
+    path = write_csv('x,y,ConstructionSite,note\n1,2,0,a\n3,,1,b\n5,6,1,c\n')
+    df = read_csv_in_chunks(path, AREA_MAP_DTYPES, chunksize)
+    assert list(df.columns) == ['x', 'y', 'ConstructionSite']  # 필요한 컬럼만 남김
+    assert df['x'].tolist() == [1, 3, 5] and df['x'].dtype == 'int16'
+    assert df['y'].isnull().tolist() == [False, True, False] and str(df['y'].dtype) == 'Int16'
+    assert df['ConstructionSite'].dtype == 'int8'
+
+
+@pytest.mark.parametrize('text', [
+    'x,y,ConstructionSite\n1,2,0\n3,4.5,1\n',  # 정수가 아님 (astype이면 4로 잘림)
+    'x,y,ConstructionSite\n1,2,0\n3,abc,1\n',  # 숫자가 아님
+    'x,y,ConstructionSite\n1,2,300\n',  # int8 범위 밖
+    'x,y\n1,2\n',  # 필수 컬럼 누락
+])
+def test_read_csv_in_chunks_fails_loudly(text):
+    with pytest.raises(ValueError):
+        read_csv_in_chunks(write_csv(text), AREA_MAP_DTYPES, 1)
+
+
+@pytest.fixture
+def inputs():
+    """저장소의 입력 CSV 세 개를 임시 작업 폴더의 data/로 복사"""
+    os.makedirs('data')
+    for path in INPUT_FILES.values():
+        shutil.copy(os.path.join(DATA_DIR, os.path.basename(path)), path)
+    return INPUT_FILES
+
+
+def test_unchanged_inputs_skip_stage1(inputs):
+    assert analyze_data() is not None
+    written = os.path.getmtime(MAP_CSV)
+    assert analyze_data() is None
+    assert os.path.getmtime(MAP_CSV) == written
+
+    # 내용이 같으면 수정 시각만 바뀌어도 건너뜀
+    os.utime(inputs['area_map'], None)
+    assert analyze_data() is None
+
+
+def test_force_and_changed_input_rerun_stage1(inputs):
+    first = analyze_data()
+    pd.testing.assert_frame_equal(analyze_data(force=True), first)
+
+    with open(inputs['area_map'], 'a') as f:
+        f.write('16,1,1\n')
+    assert analyze_data() is not None
+    assert len(pd.read_csv(MAP_CSV)) == len(pd.read_csv(os.path.join(DATA_DIR, 'complete_map_data.csv'))) + 1
+
+
+def test_missing_bundle_is_rebuilt_without_rerun(inputs):
+    analyze_data(bundle=True)
+    os.remove(MAP_BUNDLE)
+    assert analyze_data(bundle=True) is None
+    assert os.path.exists(MAP_BUNDLE)
+
+
+def reference_merge(area_map_df, area_struct_df):
+    """기존 방식: pd.merge(how='outer') 후 area로 안정 정렬"""
+    merged = pd.merge(area_map_df, area_struct_df, on=['x', 'y'], how='outer')
+    return merged.sort_values(by='area', kind='stable').reset_index(drop=True)
+
+
+def make_frames(coords_map, coords_struct, seed=0):
+    rng = np.random.default_rng(seed)
+    area_map_df = pd.DataFrame({'x': [x for x, _ in coords_map], 'y': [y for _, y in coords_map],
+                                'ConstructionSite': rng.integers(0, 2, len(coords_map))})
+    area_struct_df = pd.DataFrame({'x': [x for x, _ in coords_struct], 'y': [y for _, y in coords_struct],
+                                   'area': rng.integers(0, 4, len(coords_struct)),
+                                   'struct': rng.choice(['Empty', 'Apartment', 'MyHome'], len(coords_struct))})
+    return area_map_df, area_struct_df
+
+
+def shuffled(coords, seed):
+    coords = list(coords)
+    np.random.default_rng(seed).shuffle(coords)
+    return coords
+
+
+def assert_same_merge(area_map_df, area_struct_df):
+    result = merge_all_datasets(area_map_df, area_struct_df)
+    expected = reference_merge(area_map_df, area_struct_df)
+    pd.testing.assert_frame_equal(result[expected.columns], expected, check_dtype=False)
+
+
+def test_dense_grid_matches_pd_merge():
+    coords = [(x, y) for x in range(1, 16) for y in range(1, 11)]
+    assert_same_merge(*make_frames(shuffled(coords, 1), shuffled(coords, 2)))
+
+
+def test_sparse_coordinates_match_pd_merge():
+    rng = np.random.default_rng(3)
+    coords = list({(int(x), int(y)) for x, y in rng.integers(-5000, 5000, (200, 2))})
+    assert_same_merge(*make_frames(shuffled(coords, 4), shuffled(coords, 5)))
+
+
+def test_partial_overlap_fills_missing_values():
+    coords = [(x, y) for x in range(1, 8) for y in range(1, 6)]
+    area_map_df, area_struct_df = make_frames(coords[:-4], coords[3:])
+    assert_same_merge(area_map_df, area_struct_df)
+    merged = merge_all_datasets(area_map_df, area_struct_df)
+    assert len(merged) == len(coords)
+    assert merged['area'].isnull().sum() == 3  # area_map.csv에만 있는 좌표 (마지막으로 정렬됨)
+    assert merged['area'].tail(3).isnull().all()
+
+
+def test_duplicate_coordinates_fall_back_to_pd_merge():
+    coords = [(x, y) for x in range(1, 5) for y in range(1, 5)]
+    area_map_df, area_struct_df = make_frames(coords + coords[:2], coords)
+    assert_same_merge(area_map_df, area_struct_df)
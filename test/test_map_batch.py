@@ -0,0 +1,94 @@
+"""경로 이미지 일괄 렌더링: 캐시된 지도 래스터 위에 그린 경로 이미지가 단독으로 그린 것과 같은지 확인합니다."""
+
+import os
+import shutil
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from map_batch import base_raster_path, main, read_route_list, render_routes
+from map_cache import CACHE_DIR
+from map_direct_save import bfs_shortest_path
+from map_grid import MAP_CSV
+from map_path_io import read_paths
+from map_raster import save_raster
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+ROWS = ['H...#.',
+        '.##.#C',
+        '....#.',
+        'C.#...']
+
+
+def read_png(filename):
+    with Image.open(filename) as image:
+        return np.asarray(image.convert('RGB'))
+
+
+def test_routes_match_single_raster(make_grid):
+    grid = make_grid(ROWS)
+    routes = [bfs_shortest_path((1, 1), [cafe], grid) for cafe in [(1, 4), (6, 4)]]
+    filenames = render_routes(grid, routes, 'routes', workers=1, pixels_per_cell=16)
+    assert filenames == [os.path.join('routes', 'route_0000.png'), os.path.join('routes', 'route_0001.png')]
+    for filename, (path, target) in zip(filenames, routes):
+        expected = save_raster(grid, 'single.png', path, target, pixels_per_cell=16)
+        assert np.array_equal(read_png(filename), expected)
+
+
+def test_base_raster_is_cached(make_grid):
+    grid = make_grid(ROWS)
+    routes = [bfs_shortest_path((1, 1), [(1, 4)], grid)]
+    render_routes(grid, routes, 'routes', workers=1, pixels_per_cell=16)
+    cached = base_raster_path(grid, 16)
+    assert os.listdir(CACHE_DIR) == [os.path.basename(cached)]
+
+    # 캐시를 다른 그림으로 바꿔 두면 다음 실행은 그 그림 위에 경로를 그림
+    base = np.load(cached)
+    np.save(cached, np.zeros_like(base))
+    render_routes(grid, routes, 'routes', workers=1, pixels_per_cell=16)
+    assert read_png(os.path.join('routes', 'route_0000.png'))[0, 0].tolist() == [0, 0, 0]
+
+    # 지도가 바뀌면 다른 캐시 키
+    assert base_raster_path(make_grid(['#' + ROWS[0][1:]] + ROWS[1:]), 16) != cached
+
+
+def test_worker_processes_match_single_process(make_grid):
+    grid = make_grid(ROWS)
+    routes = [bfs_shortest_path(start, [(6, 4)], grid) for start in [(1, 1), (1, 4), (4, 3)]]
+    single = render_routes(grid, routes, 'single', workers=1, pixels_per_cell=16)
+    pool = render_routes(grid, routes, 'pool', workers=2, pixels_per_cell=16)
+    for a, b in zip(single, pool):
+        assert np.array_equal(read_png(a), read_png(b))
+
+
+def test_read_route_list():
+    with open('routes.csv', 'w') as f:
+        f.write('start_x,start_y,goal_x,goal_y\n1,1,6,4\n2,3,1,4\n')
+    assert read_route_list('routes.csv') == [((1, 1), (6, 4)), ((2, 3), (1, 4))]
+
+    with open('bad.csv', 'w') as f:
+        f.write('start_x,start_y,goal_x\n1,1,6\n')
+    with pytest.raises(ValueError):
+        read_route_list('bad.csv')
+
+
+@pytest.mark.parametrize('engine', ['bfs', 'jps', 'hpa'])
+def test_main_skips_unreachable_routes(engine):
+    os.makedirs('data')
+    shutil.copy(os.path.join(DATA_DIR, os.path.basename(MAP_CSV)), MAP_CSV)
+    with open('routes.csv', 'w') as f:
+        # 지도 밖 목표는 닿을 수 없으므로 경고만 남기고 건너뜀
+        f.write('start_x,start_y,goal_x,goal_y\n1,1,2,2\n1,1,99,99\n')
+    filenames = main('routes.csv', 'routes', engine, workers=1)
+    assert filenames == [os.path.join('routes', 'route_0000.png')]
+
+
+def test_main_writes_found_paths():
+    os.makedirs('data')
+    shutil.copy(os.path.join(DATA_DIR, os.path.basename(MAP_CSV)), MAP_CSV)
+    with open('routes.csv', 'w') as f:
+        f.write('start_x,start_y,goal_x,goal_y\n1,1,2,2\n1,1,99,99\n1,1,1,3\n')
+    main('routes.csv', 'routes', workers=1, paths_file='paths.rle')
+    assert [list(path) for path in read_paths('paths.rle')] == [[(1, 1), (1, 2), (2, 2)], [(1, 1), (1, 2), (1, 3)]]
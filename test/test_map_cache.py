@@ -0,0 +1,69 @@
+"""거리장 디스크 캐시: 저장/불러오기, 지도 해시, 오래된 항목 정리를 확인합니다."""
+
+import os
+
+import numpy as np
+
+from map_cache import CACHE_DIR, cached_field, evict_stale, load_field, map_digest, save_field
+from map_cafe_field import NearestCafeField
+
+
+ROWS = ['H...C',
+        '.##..',
+        'C....']
+CAFES = [(5, 1), (1, 3)]
+
+
+def cache_keys(cache_dir=CACHE_DIR):
+    return {filename.split('.', 1)[0] for filename in os.listdir(cache_dir)}
+
+
+def test_cold_start_saves_and_warm_start_loads(make_grid):
+    grid = make_grid(ROWS)
+    assert load_field(grid, CAFES) is None
+
+    built = cached_field(grid, CAFES)
+    assert cache_keys() == {map_digest(grid, CAFES)}
+
+    loaded = load_field(grid, CAFES)
+    assert isinstance(loaded.dist, np.memmap)
+    for name in ('dist', 'label', 'step'):
+        assert np.array_equal(getattr(loaded, name), getattr(built, name))
+    assert loaded.route((1, 1)) == built.route((1, 1))
+
+
+def test_digest_depends_on_map_content(make_grid):
+    grid = make_grid(ROWS)
+    digest = map_digest(grid, CAFES)
+    assert map_digest(make_grid(ROWS), CAFES) == digest
+    assert map_digest(grid, CAFES[:1]) != digest
+    assert map_digest(make_grid(['H...C',
+                                 '.#...',
+                                 'C....']), CAFES) != digest
+
+
+def test_changed_map_is_not_loaded(make_grid):
+    save_field(NearestCafeField.build(make_grid(ROWS), CAFES))
+    assert load_field(make_grid(['H...C',
+                                 '.###.',
+                                 'C....']), CAFES) is None
+
+
+def test_evict_stale_keeps_recent_entries(make_grid):
+    grid = make_grid(ROWS)
+    keys = []
+    for i, cafe in enumerate([(5, 1), (1, 3), (5, 3), (1, 2)]):
+        keys.append(save_field(NearestCafeField.build(grid, [cafe]), max_entries=10))
+        for filename in os.listdir(CACHE_DIR):
+            if filename.startswith(keys[-1]):
+                os.utime(os.path.join(CACHE_DIR, filename), (1000 + i, 1000 + i))
+
+    assert evict_stale(max_entries=2, keep=keys[0]) == sorted(keys[1:3])
+    assert cache_keys() == {keys[0], keys[3]}
+
+
+def test_save_field_evicts_beyond_max_entries(make_grid):
+    grid = make_grid(ROWS)
+    for cafe in [(5, 1), (1, 3), (5, 3)]:
+        key = save_field(NearestCafeField.build(grid, [cafe]), max_entries=2)
+    assert len(cache_keys()) == 2 and key in cache_keys()
@@ -0,0 +1,71 @@
+"""가장 가까운 카페 거리장: 거리, Voronoi label, 경로 복원이 BFS와 같은지 확인합니다."""
+
+from map_cafe_field import NearestCafeField, routes_from_structures
+from map_direct_save import bfs_shortest_path
+
+
+def test_distances_match_bfs(maze):
+    grid, cells, rng = maze
+    cafes = [cells[i] for i in rng.choice(len(cells), 3, replace=False)]
+    field = NearestCafeField.build(grid, cafes)
+    for start in (cells[i] for i in rng.choice(len(cells), 40, replace=False)):
+        path, _ = bfs_shortest_path(start, cafes, grid)
+        cafe, distance = field.nearest(start)
+        if path is None:
+            assert cafe is None and field.dist[grid.cell_id(*start)] == -1
+            continue
+        assert distance == len(path) - 1
+        # 거리가 같은 카페가 여럿이면 다른 카페를 고를 수 있으므로 그 카페까지의 거리로 확인
+        assert len(bfs_shortest_path(start, [cafe], grid)[0]) == len(path)
+
+
+def test_route_follows_field(maze):
+    grid, cells, rng = maze
+    cafes = [cells[i] for i in rng.choice(len(cells), 2, replace=False)]
+    field = NearestCafeField.build(grid, cafes)
+    for start in (cells[i] for i in rng.choice(len(cells), 20, replace=False)):
+        path, target = field.route(start)
+        if path is None:
+            assert field.nearest(start) == (None, None)
+            continue
+        assert path[0] == start and path[-1] == target and target in cafes
+        assert len(path) - 1 == field.nearest(start)[1]
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            assert abs(x1 - x0) + abs(y1 - y0) == 1 and grid.is_passable(x1, y1)
+
+
+def test_voronoi_labels(make_grid):
+    grid = make_grid(['C....',
+                      '.....',
+                      '....C'])
+    field = NearestCafeField.build(grid, [(1, 1), (5, 3)])
+    assert field.nearest((2, 1)) == ((1, 1), 1)
+    assert field.nearest((4, 3)) == ((5, 3), 1)
+    assert field.label[grid.cell_id(1, 3)] == 0 and field.label[grid.cell_id(5, 1)] == 1
+
+
+def test_start_on_construction_goes_through_neighbor(make_grid):
+    grid = make_grid(['H#..C',
+                      '.#.#.',
+                      '.....'])
+    path, target = NearestCafeField.build(grid, [(5, 1)]).route((2, 2))
+    assert path[0] == (2, 2) and target == (5, 1)
+    assert len(path) == len(bfs_shortest_path((2, 2), [(5, 1)], grid)[0])
+
+
+def test_unreachable_and_outside(make_grid):
+    grid = make_grid(['H#C',
+                      '##.'])
+    field = NearestCafeField.build(grid, [(3, 1)])
+    assert field.route((1, 1)) == (None, None)
+    assert field.nearest((9, 9)) == (None, None)
+
+
+def test_routes_from_structures(make_grid):
+    grid = make_grid(['H...C',
+                      '.##..',
+                      'C....'])
+    routes = routes_from_structures(NearestCafeField.build(grid, [(5, 1), (1, 3)]))
+    assert list(routes) == [(1, 1)]
+    path, target = routes[(1, 1)]
+    assert target == (1, 3) and len(path) == 3
@@ -0,0 +1,35 @@
+"""Stage 3 실행: 경로만 저장할 때 matplotlib/pandas/Pillow를 import하지 않는지 확인합니다."""
+
+import os
+import shutil
+import subprocess
+import sys
+
+from map_grid import MAP_CSV
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('matplotlib', 'pandas', 'PIL')
+
+
+def loaded_modules(code):
+    """새 인터프리터에서 code를 실행한 뒤 무거운 모듈 중 import된 것"""
+    check = f'import sys\n{code}\nprint(",".join(m for m in {HEAVY_MODULES!r} if m in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', check], capture_output=True, text=True, check=True,
+                            env=dict(os.environ, PYTHONPATH=ROOT))
+    return [name for name in result.stdout.rstrip('\n').split('\n')[-1].split(',') if name]
+
+
+def test_import_is_lazy():
+    assert loaded_modules('import map_direct_save') == []
+
+
+def test_no_render_writes_path_only():
+    os.makedirs('data')
+    shutil.copy(os.path.join(ROOT, MAP_CSV), MAP_CSV)
+    code = ('from map_report import report\nreport.set_verbosity("quiet")\n'
+            'import map_direct_save\nmap_direct_save.main(render=False)')
+    assert loaded_modules(code) == []
+    assert os.path.exists('home_to_cafe.csv') and not os.path.exists('map_final.png')
+    with open('home_to_cafe.csv', encoding='utf-8-sig') as f:
+        assert f.readline().strip() == 'step,x,y,type'
@@ -0,0 +1,49 @@
+"""Stage 2 matplotlib 그리기: collection renderer가 칸마다 patch를 그린 것과 같은 지도를 만드는지 확인합니다."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from map_draw import draw_base_map
+from map_grid import STRUCT_CODES
+
+
+ROWS = ['H..#.C',
+        '.##...',
+        'C.#..#']
+
+
+def render(grid, renderer):
+    fig, ax, _, counts = draw_base_map(None, grid, renderer)
+    fig.set_dpi(40)
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba()).astype(int)
+    plt.close(fig)
+    return image, counts, ax
+
+
+def test_collection_matches_patches(make_grid):
+    grid = make_grid(ROWS)
+    grid.struct[grid.cell_id(5, 2)] = STRUCT_CODES['Apartment']
+    grid.struct[grid.cell_id(2, 3)] = STRUCT_CODES['Building']
+    patches_image, patches_counts, _ = render(grid, 'patches')
+    collection_image, collection_counts, _ = render(grid, 'collection')
+
+    assert collection_counts == patches_counts
+    assert patches_counts == {'Apartment': 1, 'Building': 1, 'BandalgomCoffee': 2, 'MyHome': 1,
+                              'ConstructionSite': 5}
+    # 안티앨리어싱 경계 픽셀만 조금 다름
+    assert patches_image.shape == collection_image.shape
+    assert np.mean(np.abs(patches_image - collection_image) > 32) < 0.01
+
+
+def test_collection_uses_few_artists(make_grid):
+    grid = make_grid(ROWS * 10)
+    _, _, ax = render(grid, 'collection')
+    assert len(ax.patches) == 0 and len(ax.lines) == 0
+    assert len(ax.collections) <= 6  # 격자선 1 + 구조물 종류별 1
+
+
+def test_unknown_renderer(make_grid):
+    with pytest.raises(ValueError):
+        draw_base_map(None, make_grid(ROWS), 'svg')
@@ -0,0 +1,88 @@
+"""격자 번들(.npz): 저장/불러오기 왕복, CSV보다 오래된 번들 판별, pandas 없이 CSV 읽기를 확인합니다."""
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from map_grid import (BUNDLE_VERSION, build_bundle, bundle_is_fresh, extract_bundle_locations,
+                      extract_key_locations, load_bundle, read_map_csv, save_bundle)
+
+
+def complete_frame():
+    """complete_map_data.csv 형식의 작은 지도 (결측치와 공사장 포함, 행 순서는 area 기준)"""
+    return pd.DataFrame({
+        'x': [3, 1, 2, 1, 2, 3],
+        'y': [2, 1, 1, 2, 2, 1],
+        'ConstructionSite': [0, 0, 1, 0, 0, np.nan],
+        'area': [0, 0, 1, 1, 1, np.nan],
+        'struct': ['BandalgomCoffee', 'MyHome', 'Empty', 'BandalgomCoffee', 'Apartment', np.nan],
+    })
+
+
+def assert_same_grid(a, b):
+    assert (a.x_min, a.y_min, a.width, a.height) == (b.x_min, b.y_min, b.width, b.height)
+    for name in ('passable', 'construction', 'struct', 'area'):
+        assert np.array_equal(getattr(a, name), getattr(b, name)), name
+
+
+def test_bundle_round_trip():
+    df = complete_frame()
+    save_bundle(df, 'map.npz')
+    home, cafes, blocked, grid = extract_key_locations(df)
+
+    loaded = extract_bundle_locations(*load_bundle('map.npz'))
+    assert loaded[:2] == (home, cafes)  # 카페 순서도 CSV 행 순서와 같음
+    assert np.array_equal(loaded[2], blocked)
+    assert_same_grid(loaded[3], grid)
+
+
+def test_bundle_rejects_other_version():
+    save_bundle(complete_frame(), 'map.npz')
+    with np.load('map.npz') as bundle:
+        arrays = dict(bundle)
+    header = json.loads(str(arrays['header']))
+    header['version'] = BUNDLE_VERSION + 1
+    arrays['header'] = np.array(json.dumps(header))
+    np.savez('map.npz', **arrays)
+    with pytest.raises(ValueError):
+        load_bundle('map.npz')
+
+
+def test_bundle_is_fresh():
+    assert not bundle_is_fresh('map.npz', 'map.csv')
+
+    complete_frame().to_csv('map.csv', index=False)
+    save_bundle(complete_frame(), 'map.npz')
+    assert bundle_is_fresh('map.npz', 'map.csv')
+
+    # CSV만 다시 만들어지면 번들은 무시
+    later = os.path.getmtime('map.npz') + 10
+    os.utime('map.csv', (later, later))
+    assert not bundle_is_fresh('map.npz', 'map.csv')
+
+    os.remove('map.csv')
+    assert bundle_is_fresh('map.npz', 'map.csv')
+
+
+def test_read_map_csv_matches_build_bundle():
+    df = complete_frame()
+    df.to_csv('map.csv', index=False)
+    grid, rows = read_map_csv('map.csv')
+    expected_grid, expected_rows = build_bundle(pd.read_csv('map.csv'))
+    assert_same_grid(grid, expected_grid)
+    assert np.array_equal(rows, expected_rows)
+    assert extract_bundle_locations(grid, rows)[:2] == extract_key_locations(df)[:2]
+
+
+def test_read_map_csv_rejects_empty_or_missing_columns():
+    with open('empty.csv', 'w') as f:
+        f.write('x,y,ConstructionSite,area,struct\n')
+    with pytest.raises(ValueError):
+        read_map_csv('empty.csv')
+
+    complete_frame().drop(columns='struct').to_csv('map.csv', index=False)
+    with pytest.raises(ValueError):
+        read_map_csv('map.csv')
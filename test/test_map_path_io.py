@@ -0,0 +1,75 @@
+"""경로 파일 형식(csv, rle, bin)의 쓰기/읽기 왕복을 확인합니다."""
+
+import pytest
+
+from map_direct_save import save_path
+from map_path_io import PATH_FORMATS, PathWriter, decode_moves, encode_moves, read_paths, write_paths
+
+
+PATHS = [
+    [(14, 2), (14, 3), (13, 3), (12, 3), (11, 3), (11, 4), (11, 5)],
+    [(1, 1)],  # 시작점이 곧 목표
+    [(5, 5), (6, 5), (6, 4), (6, 3), (5, 3), (4, 3), (4, 4), (4, 5), (4, 6)],
+]
+
+
+def test_encode_moves():
+    assert encode_moves(PATHS[0]) == 'DL3D2'
+    assert encode_moves(PATHS[1]) == ''
+    assert decode_moves((14, 2), 'DL3D2') == PATHS[0]
+
+
+def test_encode_moves_rejects_jumps():
+    with pytest.raises(ValueError):
+        encode_moves([(1, 1), (3, 1)])
+
+
+def test_decode_moves_rejects_garbage():
+    with pytest.raises(ValueError):
+        decode_moves((1, 1), 'D2X')
+
+
+@pytest.mark.parametrize('fmt', PATH_FORMATS)
+def test_round_trip(fmt):
+    filename = f'paths.{fmt}'
+    assert write_paths(filename, PATHS) == len(PATHS)
+    assert [list(path) for path in read_paths(filename)] == PATHS
+
+
+@pytest.mark.parametrize('fmt', ['rle', 'bin'])
+def test_compact_format_converts_back_to_same_csv(fmt):
+    write_paths('original.csv', PATHS)
+    write_paths(f'paths.{fmt}', PATHS)
+    write_paths('converted.csv', read_paths(f'paths.{fmt}'))
+    with open('original.csv', 'rb') as a, open('converted.csv', 'rb') as b:
+        assert a.read() == b.read()
+
+
+@pytest.mark.parametrize('fmt', PATH_FORMATS)
+def test_empty_path_is_rejected(fmt):
+    with PathWriter(f'empty.{fmt}') as writer:
+        with pytest.raises(ValueError):
+            writer.write([])
+
+
+def test_bin_rejects_truncated_file():
+    write_paths('paths.bin', PATHS)
+    with open('paths.bin', 'rb') as f:
+        data = f.read()
+    with open('paths.bin', 'wb') as f:
+        f.write(data[:-4])
+    with pytest.raises(ValueError):
+        list(read_paths('paths.bin'))
+
+
+def test_unknown_extension():
+    with pytest.raises(ValueError):
+        write_paths('paths.txt', PATHS)
+
+
+@pytest.mark.parametrize('fmt', PATH_FORMATS)
+def test_save_path_returns_csv_rows(fmt):
+    rows = save_path(PATHS[2], PATHS[2][-1], f'tour.{fmt}', stops=[4])
+    assert [row['type'] for row in rows] == ['Start', 'Path', 'Path', 'Path', 'Stop', 'Path', 'Path', 'Path', 'End']
+    assert [(row['x'], row['y']) for row in rows] == PATHS[2]
+    assert [row['step'] for row in rows] == list(range(1, 10))
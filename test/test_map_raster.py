@@ -0,0 +1,72 @@
+"""래스터 renderer: 칸 종류별 색, 이미지 크기, PNG 저장을 확인합니다."""
+
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from PIL import Image
+
+from map_draw import draw_base_map
+from map_grid import STRUCT_CODES
+from map_raster import (COLORS, MAX_IMAGE_SIDE, count_structures, default_pixels_per_cell, pixel_center,
+                        render_map, save_raster)
+
+
+ROWS = ['H..#.C',
+        '.##...',
+        'C.#..#']
+SIZE = 32
+
+
+@pytest.fixture
+def grid(make_grid):
+    grid = make_grid(ROWS)
+    grid.struct[grid.cell_id(5, 2)] = STRUCT_CODES['Apartment']
+    grid.struct[grid.cell_id(2, 3)] = STRUCT_CODES['Building']
+    return grid
+
+
+def color_at(image, grid, pos):
+    """칸 중심에서 격자선을 살짝 벗어난 픽셀의 색"""
+    col, row = pixel_center(grid, pos, SIZE)
+    return tuple(int(c) for c in image[row + 5, col + 5])
+
+
+def over_white(color, alpha):
+    return tuple(round(c * alpha + 255 * (1 - alpha)) for c in color)
+
+
+def test_image_size(grid):
+    image = render_map(grid, SIZE)
+    assert image.shape == ((grid.height + 1) * SIZE, (grid.width + 1) * SIZE, 3) and image.dtype == np.uint8
+
+
+def test_structures_are_drawn_at_cell_centers(grid):
+    image = render_map(grid, SIZE)
+    assert color_at(image, grid, (4, 1)) == over_white(COLORS['gray'], 0.8)  # 공사장
+    assert color_at(image, grid, (6, 1)) == over_white(COLORS['green'], 0.9)  # 반달곰 커피
+    assert color_at(image, grid, (1, 1)) == over_white(COLORS['green'], 0.9)  # 내 집
+    assert color_at(image, grid, (5, 2)) == COLORS['saddlebrown']  # 아파트
+    assert color_at(image, grid, (2, 3)) == COLORS['saddlebrown']  # 빌딩
+    assert color_at(image, grid, (2, 1)) == COLORS['white']  # 빈 칸
+
+
+def test_count_structures_matches_draw_structures(grid):
+    fig, _, _, counts = draw_base_map(None, grid, 'patches')
+    plt.close(fig)
+    assert count_structures(grid) == counts
+
+
+def test_pixels_per_cell(grid, make_grid):
+    with pytest.raises(ValueError):
+        render_map(grid, 7)
+    assert default_pixels_per_cell(grid) == SIZE
+    big = make_grid(['.' * 2000] * 3)
+    assert (big.width + 1) * default_pixels_per_cell(big) <= MAX_IMAGE_SIDE
+
+
+def test_save_raster_writes_png(grid):
+    image = save_raster(grid, 'map.png', path=[(1, 1), (1, 2), (1, 3)], target=(1, 3), pixels_per_cell=SIZE)
+    with Image.open('map.png') as saved:
+        assert np.array_equal(np.asarray(saved.convert('RGB')), image)
+    plain = save_raster(grid, 'plain.png', pixels_per_cell=SIZE, legend=False)
+    assert np.array_equal(plain, render_map(grid, SIZE))
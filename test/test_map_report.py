@@ -0,0 +1,129 @@
+"""실행 보고서: 출력 수준별 콘솔 출력, JSON 보고서, 계측(메모리, 탐색 카운터)을 확인합니다."""
+
+import argparse
+import json
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+from map_direct_save import bfs_shortest_path
+from map_jps import jump_point_search
+from map_report import RunReport, add_report_arguments, report
+
+
+TABLE = pd.DataFrame({'x': [1, 2, 3]})
+
+
+@pytest.mark.parametrize('verbosity, shown', [
+    ('quiet', []),
+    ('normal', ['진행 메시지', '경고 메시지']),
+    ('verbose', ['진행 메시지', '경고 메시지', '표 제목', str(TABLE)]),
+])
+def test_verbosity_filters_console_output(capsys, verbosity, shown):
+    run = RunReport(verbosity)
+    run.info('진행 메시지')
+    run.warn('경고 메시지')
+    run.frame('table', TABLE, '표 제목')
+    assert capsys.readouterr().out == ''.join(line + '\n' for line in shown)
+
+    # 출력 수준과 관계없이 보고서에는 남음
+    assert run.data['rows'] == {'table': 3}
+    assert run.data['warnings'] == ['경고 메시지']
+
+
+def test_unknown_verbosity():
+    with pytest.raises(ValueError):
+        RunReport('silent')
+    with pytest.raises(ValueError):
+        report.set_verbosity(0)
+
+
+def test_write_json_report(capsys):
+    run = RunReport('quiet')
+    run.stage('stage1')
+    run.count('rows', pd.Series([1, 2]).sum())  # NumPy 정수도 JSON으로 저장
+    with run.timed('stage1.load'):
+        pass
+
+    text = run.write('report.json')
+    assert capsys.readouterr().out == ''
+    with open('report.json', encoding='utf-8') as f:
+        saved = json.load(f)
+    assert saved == json.loads(text)
+    assert saved['stages'] == ['stage1'] and saved['counts'] == {'rows': 3}
+    assert saved['timings']['stage1.load'] >= 0 and saved['total_seconds'] >= 0
+
+    # 경로가 없으면 quiet 모드에서만 표준 출력으로 한 줄 JSON
+    run.write()
+    assert json.loads(capsys.readouterr().out)['stages'] == ['stage1']
+    RunReport('normal').write()
+    assert capsys.readouterr().out == ''
+
+
+def test_report_arguments():
+    parser = argparse.ArgumentParser()
+    add_report_arguments(parser)
+    args = parser.parse_args(['--verbosity', 'normal', '--report', 'out.json'])
+    assert (args.verbosity, args.report) == ('normal', 'out.json')
+    assert parser.parse_args([]).verbosity == 'verbose'
+
+
+@pytest.fixture
+def tracing():
+    """계측 테스트가 켠 tracemalloc을 끝나면 끔"""
+    yield
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def test_nested_timed_blocks_record_peak_memory(tracing):
+    run = RunReport('quiet')
+    run.enable_instrumentation()
+    with run.timed('outer'):
+        with run.timed('inner'):
+            block = bytearray(4 << 20)
+            del block
+        with run.timed('small'):
+            pass
+    memory = run.data['memory']
+    assert memory['inner'] >= 4 << 20
+    assert memory['small'] < 1 << 20
+    assert memory['outer'] >= memory['inner']  # 안쪽 블록의 최대값이 바깥 블록에도 반영됨
+
+
+def test_timings_without_instrumentation_skip_memory():
+    run = RunReport('quiet')
+    with run.timed('stage'):
+        pass
+    assert 'stage' in run.data['timings'] and run.data['memory'] == {}
+
+
+def test_hooks_receive_timings_and_search_counters():
+    run = RunReport('quiet')
+    events = []
+    run.add_hook(lambda kind, name, values: events.append((kind, name, sorted(values))))
+    with run.timed('stage3.search'):
+        run.search('bfs', expanded=3, pushes=4)
+    assert events == [('search', 'bfs', ['expanded', 'pushes']), ('timing', 'stage3.search', ['seconds'])]
+
+
+def test_configure_instrument_option(tracing):
+    parser = argparse.ArgumentParser()
+    add_report_arguments(parser)
+    run = RunReport()
+    run.configure(parser.parse_args(['--verbosity', 'quiet', '--instrument']))
+    assert run.verbosity == 'quiet' and run.instrumenting and tracemalloc.is_tracing()
+
+
+def test_search_engines_report_counters(make_grid, monkeypatch):
+    monkeypatch.setattr(report, 'instrumenting', True)
+    monkeypatch.setattr(report, 'data', {'search': {}})
+    grid = make_grid(['H...#',
+                      '.##.#',
+                      '....C'])
+    bfs_shortest_path((1, 1), [(5, 3)], grid)
+    jump_point_search((1, 1), [(5, 3)], grid)
+    assert set(report.data['search']) == {'bfs', 'jps'}
+    assert report.data['search']['bfs']['expanded'] > 0 and report.data['search']['bfs']['max_queue'] >= 1
+    assert report.data['search']['jps']['expanded'] > 0
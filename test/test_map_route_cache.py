@@ -0,0 +1,108 @@
+"""RouteCache의 부분 경로 재사용과 지도 변경 시 선택적 무효화 규칙을 확인합니다."""
+
+from map_direct_save import bfs_shortest_path
+from map_route_cache import RouteCache
+
+
+# 내 집(1, 1)에서 카페(1, 3)까지는 (4, 2)를 지나 돌아가야 함 (9칸)
+ROWS = ['H....',
+        '###.#',
+        'C....']
+HOME, CAFE = (1, 1), (1, 3)
+
+
+def cached(make_grid, rows=ROWS, engine='bfs'):
+    grid = make_grid(rows)
+    cache = RouteCache(grid)
+    path, target = bfs_shortest_path(HOME, [CAFE], grid)
+    cache.put(HOME, [CAFE], engine, path, target, cache.version)
+    return cache, path
+
+
+def test_hit_and_subpath_hit(make_grid):
+    cache, path = cached(make_grid)
+    assert len(path) == 9
+    assert cache.lookup(HOME, [CAFE])[:3] == (True, path, CAFE)
+
+    # 캐시된 경로 위의 칸에서 출발하면 그 뒷부분을 돌려줌
+    found, subpath, target, _ = cache.lookup((4, 2), [CAFE])
+    assert found and subpath == path[path.index((4, 2)):] and target == CAFE
+    assert cache.stats['hits'] == 1 and cache.stats['subpath_hits'] == 1
+
+
+def test_subpath_only_for_exact_engines(make_grid):
+    cache, _ = cached(make_grid, engine='hpa')
+    assert cache.lookup(HOME, [CAFE], 'hpa')[0]
+    assert not cache.lookup((4, 2), [CAFE], 'hpa')[0]
+
+
+def test_blocked_cell_on_path_drops_route(make_grid):
+    cache, _ = cached(make_grid)
+    assert cache.update_map(make_grid(['H....',
+                                       '#####',
+                                       'C....'])) == 1
+    assert len(cache) == 0
+    assert not cache.lookup((4, 2), [CAFE])[0]  # 부분 경로 색인도 함께 지워짐
+
+
+def test_blocked_cell_off_path_keeps_route(make_grid):
+    cache, path = cached(make_grid)
+    assert cache.update_map(make_grid(['H...#',
+                                       '###.#',
+                                       'C....'])) == 0
+    assert cache.version == 2
+    assert cache.lookup(HOME, [CAFE], version=2)[:2] == (True, path)
+
+
+def test_opened_cell_drops_only_routes_it_can_shorten(make_grid):
+    # (1, 2)가 열리면 2칸 만에 갈 수 있으므로 버림
+    cache, _ = cached(make_grid)
+    assert cache.update_map(make_grid(['H....',
+                                       '.##.#',
+                                       'C....'])) == 1
+
+    # (5, 2)를 거치는 경로는 맨해튼 거리로도 지금 경로보다 길므로 유지
+    cache, path = cached(make_grid)
+    assert cache.update_map(make_grid(['H....',
+                                       '###..',
+                                       'C....'])) == 0
+    assert cache.lookup(HOME, [CAFE])[1] == path
+
+
+def test_opened_cell_drops_unreachable_and_inexact_entries(make_grid):
+    rows = ['H....',
+            '#####',
+            'C....']
+    grid = make_grid(rows)
+    cache = RouteCache(grid)
+    cache.put(HOME, [CAFE], 'bfs', None, None, cache.version)  # 닿을 수 없음
+    cache.put(HOME, [CAFE], 'hpa', [HOME], HOME, cache.version)
+    assert len(cache) == 2
+    assert cache.update_map(make_grid(['H....',
+                                       '####.',
+                                       'C....'])) == 2
+
+
+def test_shape_change_clears_everything(make_grid):
+    cache, _ = cached(make_grid)
+    assert cache.update_map(make_grid([row + '.' for row in ROWS])) == 1
+    assert len(cache) == 0
+
+
+def test_put_for_old_version_is_ignored(make_grid):
+    grid = make_grid(ROWS)
+    cache = RouteCache(grid)
+    _, _, _, version = cache.lookup(HOME, [CAFE])
+    cache.update_map(grid)  # 탐색하는 동안 지도가 바뀜
+    path, target = bfs_shortest_path(HOME, [CAFE], grid)
+    cache.put(HOME, [CAFE], 'bfs', path, target, version)
+    assert len(cache) == 0
+
+
+def test_lru_eviction(make_grid):
+    grid = make_grid(ROWS)
+    cache = RouteCache(grid, max_entries=2)
+    for start in [(2, 1), (3, 1), (4, 1)]:
+        cache.put(start, [CAFE], 'hpa', [start], start, cache.version)
+    assert len(cache) == 2 and cache.stats['evicted'] == 1
+    assert not cache.lookup((2, 1), [CAFE], 'hpa')[0]
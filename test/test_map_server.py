@@ -0,0 +1,142 @@
+"""경로 질의 서버: 요청 처리, 잘못된 요청, 지도 파일이 바뀌었을 때 다시 읽기를 확인합니다."""
+
+import json
+import os
+import time
+
+import pytest
+
+from map_direct_save import ENGINES, bfs_shortest_path
+from map_grid import MAP_CSV
+from map_server import RouteService
+
+
+SYMBOLS = {'.': (0, 'Empty'), '#': (1, 'Empty'), 'H': (0, 'MyHome'), 'C': (0, 'BandalgomCoffee')}
+
+# 내 집(1, 1)에서 카페(1, 3)까지는 (4, 2)를 지나 돌아가야 함 (9칸)
+ROWS = ['H....',
+        '###.#',
+        'C....']
+BLOCKED = ['H....',
+           '#####',
+           'C....']
+OPENED = ['H....',
+          '.##.#',
+          'C....']
+
+
+def write_map(rows):
+    """문자열 행 지도를 complete_map_data.csv 형식으로 저장"""
+    os.makedirs(os.path.dirname(MAP_CSV), exist_ok=True)
+    lines = ['x,y,ConstructionSite,area,struct']
+    for y, row in enumerate(rows, 1):
+        for x, symbol in enumerate(row, 1):
+            construction, struct = SYMBOLS[symbol]
+            lines.append(f'{x},{y},{construction},0,{struct}')
+    with open(MAP_CSV, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+
+def replace_map(rows):
+    """지도 파일을 바꾸고 수정 시각도 확실히 달라지도록 함"""
+    mtime = os.stat(MAP_CSV).st_mtime + 1
+    write_map(rows)
+    os.utime(MAP_CSV, (mtime, mtime))
+
+
+@pytest.fixture
+def service():
+    write_map(ROWS)
+    service = RouteService()
+    yield service
+    service.stop()
+
+
+def route(service, **request):
+    response = service.handle(dict(request, op='route'))
+    assert response['ok'], response
+    return response
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_route_to_nearest_cafe(service, engine):
+    response = route(service, id=7, engine=engine)
+    assert response['id'] == 7 and response['version'] == 1
+    assert response['target'] == [1, 3] and response['length'] == 9
+    assert response['path'][0] == [1, 1] and response['path'][-1] == [1, 3]
+
+
+def test_route_with_start_and_targets(service, make_grid):
+    expected, _ = bfs_shortest_path((5, 1), [(5, 3)], make_grid(ROWS))
+    response = route(service, start=[5, 1], targets=[[5, 3]])
+    assert response['path'] == [list(pos) for pos in expected]
+    assert route(service, start=[1, 1], targets=[[9, 9]])['path'] is None  # 닿을 수 없음
+
+
+@pytest.mark.parametrize('line', [
+    '{"op": "route", "start": [1, 1',  # JSON 형식 오류
+    '[1, 2]',  # 객체가 아님
+    '{"id": 3, "op": "jump"}',
+    '{"id": 3, "engine": "astar"}',
+    '{"id": 3, "targets": []}',
+    '{"id": 3, "start": [1]}',
+    '{"id": 3, "start": ["a", 1]}',
+])
+def test_bad_requests(service, line):
+    response = json.loads(service.handle_line(line))
+    assert response['ok'] is False and response['error']
+    assert response['id'] == (3 if '"id"' in line else None)
+    # 오류 뒤에도 계속 처리
+    assert route(service)['length'] == 9
+
+
+def test_info_and_ping(service):
+    info = service.handle({'op': 'info'})
+    assert info['ok'] and (info['width'], info['height']) == (5, 3)
+    assert info['home'] == [1, 1] and info['cafes'] == [[1, 3]]
+    assert service.handle({'op': 'ping'})['ok']
+
+
+def test_reload_only_when_map_changes(service):
+    assert not service.reload()
+    replace_map(OPENED)
+    assert service.reload()
+    assert service.state.version == 2
+    response = route(service)
+    assert response['version'] == 2 and response['length'] == 3
+    assert not service.reload()
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+def test_reloaded_map_replaces_engine_structures(service, engine):
+    assert route(service, engine=engine)['length'] == 9  # 엔진 전처리를 이전 지도로 만들어 둠
+    replace_map(BLOCKED)
+    assert service.handle({'op': 'reload'})['reloaded']
+    assert route(service, engine=engine)['path'] is None
+
+
+def test_request_keeps_map_it_started_with(service):
+    old_state = service.state
+    replace_map(BLOCKED)
+    service.reload()
+    # 교체 전에 상태를 잡은 요청은 이전 지도로 끝까지 처리됨
+    assert old_state.route((1, 1))[1] == (1, 3)
+    assert service.state.route((1, 1)) == (None, None)
+
+
+def test_failed_reload_keeps_previous_map(service):
+    with open(MAP_CSV, 'w') as f:
+        f.write('x,y\n')
+    response = service.handle({'op': 'reload'})
+    assert response['ok'] is False
+    assert service.state.version == 1 and route(service)['length'] == 9
+
+
+def test_watcher_reloads_changed_map(service):
+    service.poll = 0.01
+    service.start_watching()
+    replace_map(OPENED)
+    deadline = time.monotonic() + 5
+    while service.state.version == 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert route(service)['length'] == 3
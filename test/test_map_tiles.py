@@ -0,0 +1,72 @@
+"""지도 타일 피라미드: 타일을 이어 붙이면 전체 래스터와 같은지, 바뀐 타일만 다시 그리는지 확인합니다."""
+
+import os
+
+import numpy as np
+from PIL import Image
+
+from map_raster import COLORS, render_map
+from map_tiles import TILE_SIZE, pyramid_shape, render_tile_pyramid, tile_path
+
+
+SIZE = 32
+
+
+def read_tile(z, x, y, out_dir='tiles'):
+    with Image.open(tile_path(out_dir, z, x, y)) as tile:
+        return np.asarray(tile.convert('RGB'))
+
+
+def test_base_tiles_match_full_raster(maze):
+    grid, _, _ = maze
+    summary = render_tile_pyramid(grid, 'tiles', SIZE, workers=1)
+    columns, rows, zoom_levels = pyramid_shape(grid, SIZE)
+    assert summary['zoom_levels'] == zoom_levels and summary['rendered'] == summary['tiles']
+
+    z = zoom_levels - 1
+    mosaic = np.concatenate([np.concatenate([read_tile(z, x, y) for x in range(columns)], axis=1)
+                             for y in range(rows)], axis=0)
+    image = render_map(grid, SIZE)
+    height, width = image.shape[:2]
+    assert np.array_equal(mosaic[:height, :width], image)
+    assert (mosaic[height:] == COLORS['white']).all() and (mosaic[:, width:] == COLORS['white']).all()
+
+    top = read_tile(0, 0, 0)
+    assert top.shape == (TILE_SIZE, TILE_SIZE, 3)
+    assert not (top == COLORS['white']).all()
+
+
+def test_rerun_renders_only_changed_tiles(make_grid):
+    rows = ['.' * 40] * 30
+    render_tile_pyramid(make_grid(rows), 'tiles', SIZE, workers=1)
+    assert render_tile_pyramid(make_grid(rows), 'tiles', SIZE, workers=1)['rendered'] == 0
+
+    # 왼쪽 위 칸 하나가 공사장이 되면 그 칸이 걸친 z_max 타일과 상위 타일들만 다시 그림
+    changed = make_grid(['#' + '.' * 39] + rows[1:])
+    summary = render_tile_pyramid(changed, 'tiles', SIZE, workers=1)
+    assert 0 < summary['rendered'] <= 2 * summary['zoom_levels']
+    assert summary['rendered'] < summary['tiles']
+    assert render_tile_pyramid(changed, 'tiles', SIZE, workers=1, force=True)['rendered'] == summary['tiles']
+
+
+def test_missing_tile_is_redrawn(make_grid):
+    grid = make_grid(['.' * 20] * 10)
+    render_tile_pyramid(grid, 'tiles', SIZE, workers=1)
+    os.remove(tile_path('tiles', 0, 0, 0))
+    assert render_tile_pyramid(grid, 'tiles', SIZE, workers=1)['rendered'] == 1
+
+
+def test_smaller_map_removes_stale_tiles(make_grid):
+    render_tile_pyramid(make_grid(['.' * 40] * 30), 'tiles', SIZE, workers=1)
+    summary = render_tile_pyramid(make_grid(['.' * 5] * 5), 'tiles', SIZE, workers=1)
+    assert summary['tiles'] == 1 and summary['removed'] > 0
+    pngs = [name for _, _, names in os.walk('tiles') for name in names if name.endswith('.png')]
+    assert len(pngs) == 1 and os.path.exists(tile_path('tiles', 0, 0, 0))
+
+
+def test_worker_processes_match_single_process(maze):
+    grid, _, _ = maze
+    render_tile_pyramid(grid, 'single', SIZE, workers=1)
+    render_tile_pyramid(grid, 'pool', SIZE, workers=2)
+    for z, x, y in [(0, 0, 0), (pyramid_shape(grid, SIZE)[2] - 1, 1, 0)]:
+        assert np.array_equal(read_tile(z, x, y, 'single'), read_tile(z, x, y, 'pool'))
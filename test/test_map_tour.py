@@ -0,0 +1,112 @@
+"""여러 카페를 들르는 경로: 방문 순서 풀이와 경로 계획을 확인합니다."""
+
+from itertools import permutations
+
+import numpy as np
+import pytest
+
+from map_direct_save import bfs_shortest_path
+from map_tour import (UNREACHABLE, distance_matrix, held_karp, improve_tour, nearest_neighbor, plan_tour,
+                      solve_tour, tour_length)
+
+
+def brute_force(matrix, return_home):
+    """모든 순서를 확인한 가장 짧은 tour 길이"""
+    n = len(matrix)
+    best = None
+    for middle in permutations(range(1, n)):
+        order = [0, *middle] + ([0] if return_home else [])
+        length = tour_length(order, matrix)
+        best = length if best is None else min(best, length)
+    return best
+
+
+def random_matrix(n, seed, symmetric=True):
+    """격자 위 점들 사이의 맨해튼 거리 (symmetric=False이면 임의의 양수 거리)"""
+    rng = np.random.default_rng(seed)
+    if not symmetric:
+        matrix = rng.integers(1, 50, (n, n))
+        np.fill_diagonal(matrix, 0)
+        return matrix
+    points = rng.integers(0, 30, (n, 2))
+    return np.abs(points[:, None, :] - points[None, :, :]).sum(axis=2)
+
+
+def assert_visits_all(order, n, return_home):
+    assert order[0] == 0
+    assert sorted(order[1:len(order) - return_home]) == list(range(1, n))
+    if return_home:
+        assert order[-1] == 0
+
+
+@pytest.mark.parametrize('return_home', [False, True])
+@pytest.mark.parametrize('symmetric', [True, False])
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 7])
+def test_held_karp_matches_brute_force(n, symmetric, return_home):
+    for seed in range(5):
+        matrix = random_matrix(n, seed, symmetric)
+        order = held_karp(matrix, return_home)
+        if n > 1:
+            assert_visits_all(order, n, return_home)
+        assert tour_length(order, matrix) == brute_force(matrix, return_home)
+
+
+@pytest.mark.parametrize('return_home', [False, True])
+def test_improve_tour_is_valid_and_not_worse_than_nearest_neighbor(return_home):
+    for seed in range(5):
+        matrix = random_matrix(9, seed)
+        start = nearest_neighbor(matrix)
+        order = improve_tour(start, matrix, return_home)
+        assert_visits_all(order, 9, return_home)
+        baseline = start + ([0] if return_home else [])
+        assert brute_force(matrix, return_home) <= tour_length(order, matrix) <= tour_length(baseline, matrix)
+
+
+def test_solve_tour_rejects_unreachable():
+    matrix = np.array([[0, 3, UNREACHABLE], [3, 0, 4], [UNREACHABLE, 4, 0]])
+    with pytest.raises(ValueError):
+        solve_tour(matrix)
+
+
+def test_distance_matrix_matches_bfs(maze):
+    grid, cells, rng = maze
+    locations = [cells[i] for i in rng.choice(len(cells), 5, replace=False)]
+    matrix = distance_matrix(grid, locations, workers=1)
+    for i, a in enumerate(locations):
+        for j, b in enumerate(locations):
+            path, _ = bfs_shortest_path(a, [b], grid)
+            assert matrix[i, j] == (len(path) - 1 if path else UNREACHABLE)
+
+
+@pytest.mark.parametrize('return_home', [False, True])
+def test_plan_tour_path(make_grid, return_home):
+    grid = make_grid(['C...#..C',
+                      '.##.#.#.',
+                      '...H....',
+                      '.#.##.#C'])
+    cafes = [(1, 1), (8, 1), (8, 4)]
+    path, stops, length = plan_tour(grid, (4, 3), cafes, return_home, workers=1)
+    assert path[0] == (4, 3) and len(path) == length + 1
+    assert {path[i] for i in stops} >= set(cafes)
+    assert (path[-1] == (4, 3)) == return_home
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert abs(x1 - x0) + abs(y1 - y0) == 1 and grid.is_passable(x1, y1)
+
+
+def test_plan_tour_drops_cafes_unreachable_from_home(make_grid):
+    grid = make_grid(['H.#C',
+                      '..##',
+                      'C...'])
+    path, stops, _ = plan_tour(grid, (1, 1), [(4, 1), (1, 3)], workers=1)
+    assert [path[i] for i in stops] == [(1, 3)]
+
+
+def test_plan_tour_rejects_return_to_home_on_construction(make_grid):
+    grid = make_grid(['C....',
+                      '..#..',
+                      '....C'])
+    home = (3, 2)  # 공사장 위의 내 집: 나갈 수는 있지만 돌아올 수 없음
+    path, _, _ = plan_tour(grid, home, [(1, 1), (5, 3)], workers=1)
+    assert path[0] == home
+    with pytest.raises(ValueError):
+        plan_tour(grid, home, [(1, 1), (5, 3)], return_home=True, workers=1)
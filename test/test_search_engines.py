@@ -0,0 +1,168 @@
+"""탐색 엔진들이 BFS(칸 수)나 Dijkstra(비용)와 같은 최단 거리를 찾는지 확인합니다."""
+
+import copy
+import heapq
+
+import pytest
+
+from map_cafe_field import NearestCafeField
+from map_direct_save import bfs_path, bfs_shortest_path, find_route, prepare_engine
+from map_hpa import hpa_search
+from map_jps import jump_point_search
+from map_replan import DStarLitePlanner
+from map_weighted import CostTable, cell_costs, weighted_shortest_path
+
+
+def sample_queries(cells, rng, count=25):
+    """(출발 좌표, 목표 좌표 리스트) 질의들"""
+    queries = []
+    for _ in range(count):
+        start = cells[rng.integers(len(cells))]
+        targets = [cells[i] for i in rng.choice(len(cells), size=rng.integers(1, 4), replace=False)]
+        queries.append((start, targets))
+    return queries
+
+
+def assert_valid_path(grid, path, start, targets):
+    """시작점에서 목표 중 하나까지 이동 가능한 칸만 한 칸씩 지나는 경로인지 확인"""
+    assert path[0] == tuple(start)
+    assert path[-1] in {tuple(t) for t in targets}
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        assert abs(x1 - x0) + abs(y1 - y0) == 1
+        assert grid.is_passable(x1, y1)
+
+
+def dijkstra_cost(grid, costs, start, targets):
+    """칸에 들어갈 때 costs[칸]을 내는 최소 비용 (닿지 못하면 None)"""
+    start = grid.cell_id(*start)
+    goals = {grid.cell_id(*t) for t in targets}
+    best = {start: 0}
+    heap = [(0, start)]
+    while heap:
+        cost, cell = heapq.heappop(heap)
+        if cost > best[cell]:
+            continue
+        if cell in goals:
+            return cost
+        for nb in grid.neighbors(cell):
+            if grid.passable[nb] and cost + int(costs[nb]) < best.get(nb, float('inf')):
+                best[nb] = cost + int(costs[nb])
+                heapq.heappush(heap, (best[nb], nb))
+    return None
+
+
+def path_cost(grid, costs, path):
+    return sum(int(costs[grid.cell_id(x, y)]) for x, y in path[1:])
+
+
+def bfs_length(grid, start, targets):
+    path, _ = bfs_shortest_path(start, targets, grid)
+    return len(path) if path else None
+
+
+def test_bfs_path_matches_bfs_shortest_path(maze):
+    grid, cells, rng = maze
+    for start, targets in sample_queries(cells, rng):
+        assert bfs_path(start, targets, grid) == bfs_shortest_path(start, targets, grid)
+
+
+def test_bfs_from_construction_cell(make_grid):
+    grid = make_grid(['H#.C',
+                      '.#..',
+                      '....'])
+    path, target = bfs_shortest_path((2, 2), [(4, 1)], grid)
+    assert path[0] == (2, 2) and target == (4, 1)
+    assert len(path) == 4
+
+
+def test_jps_matches_bfs_length(maze):
+    grid, cells, rng = maze
+    for start, targets in sample_queries(cells, rng):
+        path, _ = jump_point_search(start, targets, grid)
+        assert (len(path) if path else None) == bfs_length(grid, start, targets)
+        if path:
+            assert_valid_path(grid, path, start, targets)
+
+
+def test_hpa_returns_valid_paths(maze):
+    grid, cells, rng = maze
+    for start, targets in sample_queries(cells, rng):
+        path, _ = hpa_search(start, targets, grid)
+        expected = bfs_length(grid, start, targets)
+        assert (path is None) == (expected is None)
+        if path:
+            assert_valid_path(grid, path, start, targets)
+            assert len(path) >= expected
+
+
+def test_dstar_lite_matches_bfs_after_changes(maze):
+    grid, cells, rng = maze
+    for start, targets in sample_queries(cells, rng, count=8):
+        planner = DStarLitePlanner(grid, start, targets)
+        path, _ = planner.plan()
+        assert (len(path) if path else None) == bfs_length(grid, start, targets)
+
+        # 공사장 몇 칸이 생기고 없어진 지도에서도 다시 계산한 BFS와 같아야 함
+        changed = copy.deepcopy(grid)
+        blocked = [c for c in (cells[i] for i in rng.choice(len(cells), 15, replace=False))
+                   if c != start and c not in targets]
+        unblocked = [grid.coord(int(cell)) for cell in rng.choice(
+            [cell for cell in range(grid.size) if grid.construction[cell]], 15, replace=False)]
+        for positions, value in ((blocked, False), (unblocked, True)):
+            for x, y in positions:
+                cell = grid.cell_id(x, y)
+                changed.passable[cell] = value
+                changed.construction[cell] = not value
+
+        path, _ = planner.update_cells(blocked, unblocked)
+        assert (len(path) if path else None) == bfs_length(changed, start, targets)
+        if path:
+            assert_valid_path(changed, path, start, targets)
+
+
+@pytest.mark.parametrize('near_construction', [0, 3])
+@pytest.mark.parametrize('use_heuristic', [False, True])
+def test_dial_matches_dijkstra(maze, near_construction, use_heuristic):
+    grid, cells, rng = maze
+    costs = cell_costs(grid, near_construction=near_construction)
+    for start, targets in sample_queries(cells, rng):
+        path, _ = weighted_shortest_path(start, targets, grid, costs, use_heuristic)
+        expected = dijkstra_cost(grid, costs, start, targets)
+        assert (path_cost(grid, costs, path) if path else None) == expected
+        if path:
+            assert_valid_path(grid, path, start, targets)
+
+
+def test_dial_astar_starts_on_construction(make_grid):
+    grid = make_grid(['....C',
+                      '.###.',
+                      '.#H#.',
+                      '.....'])
+    home = grid.cell_id(3, 3)
+    grid.passable[home], grid.construction[home] = False, True  # 공사장 위의 내 집
+    costs = cell_costs(grid)
+    plain, _ = weighted_shortest_path((3, 3), [(5, 1)], grid, costs)
+    astar, _ = weighted_shortest_path((3, 3), [(5, 1)], grid, costs, use_heuristic=True)
+    assert plain is not None and astar is not None
+    assert path_cost(grid, costs, astar) == path_cost(grid, costs, plain)
+
+
+@pytest.mark.parametrize('engine', ['jps', 'hpa', 'dial', 'dial-astar'])
+def test_find_route_with_prepared_engine(maze, engine):
+    grid, cells, rng = maze
+    prepared = prepare_engine(grid, engine)
+    for start, targets in sample_queries(cells, rng, count=10):
+        assert find_route(start, targets, grid, engine, **prepared) == find_route(start, targets, grid, engine)
+
+
+def test_cost_table_is_reused_across_queries(maze):
+    grid, cells, rng = maze
+    costs = cell_costs(grid, near_construction=2)
+    table = CostTable(grid, costs)
+    targets = [cells[i] for i in rng.choice(len(cells), 2, replace=False)]
+    field = NearestCafeField.build(grid, targets)
+    for start, _ in sample_queries(cells, rng, count=10):
+        for use_heuristic in (False, True):
+            assert (weighted_shortest_path(start, targets, grid, table, use_heuristic, field)
+                    == weighted_shortest_path(start, targets, grid, costs, use_heuristic, field))
+    assert table.heuristic(field) is table.heuristic(field)  # 같은 거리장은 한 번만 변환